@@ -0,0 +1,56 @@
+"""Measure the import time of pygeodata entry points in fresh interpreters.
+
+Usage: python benchmarks/import_time.py [--repeat N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = [
+    'import pygeodata',
+    'from pygeodata import DataLoader, set_config',
+    'from pygeodata.processors import Reprojector',
+    'from pygeodata.processors import Rasterizer',
+    'from pygeodata.drivers import RioXArrayDriver',
+]
+
+HEAVY_MODULES = ['rasterio', 'pyproj', 'numpy', 'pandas', 'xarray', 'rioxarray', 'geopandas']
+
+SCRIPT = """
+import sys, time
+t = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - t
+print(elapsed)
+print(','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(statement: str, repeat: int) -> tuple[list[float], str]:
+    timings = []
+    modules = ''
+    for _ in range(repeat):
+        script = SCRIPT.format(statement=statement, heavy=HEAVY_MODULES)
+        out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+        elapsed, modules = out.splitlines()
+        timings.append(float(elapsed))
+    return timings, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"statement":<50} {"median [ms]":>12} {"min [ms]":>10}  heavy modules loaded')
+    for statement in STATEMENTS:
+        timings, modules = measure(statement, args.repeat)
+        print(
+            f'{statement:<50} {statistics.median(timings) * 1e3:>12.1f} {min(timings) * 1e3:>10.1f}  {modules or "-"}'
+        )
+
+
+if __name__ == '__main__':
+    main()
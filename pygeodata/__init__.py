@@ -1,10 +1,39 @@
-from pygeodata.base import load, process
-from pygeodata.config import set_config
-from pygeodata.loader import DataLoader
+from typing import TYPE_CHECKING
+
+from pygeodata.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from pygeodata.base import load, process
+    from pygeodata.cluster import process_distributed
+    from pygeodata.config import bind_config, set_config
+    from pygeodata.graph import process_graph
+    from pygeodata.loader import DataLoader
+    from pygeodata.planning import plan
+    from pygeodata.stack import load_stack
 
 __all__ = [
     'DataLoader',
+    'bind_config',
     'load',
+    'load_stack',
+    'plan',
     'process',
+    'process_distributed',
+    'process_graph',
     'set_config',
 ]
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        'DataLoader': 'pygeodata.loader',
+        'bind_config': 'pygeodata.config',
+        'load': 'pygeodata.base',
+        'load_stack': 'pygeodata.stack',
+        'plan': 'pygeodata.planning',
+        'process': 'pygeodata.base',
+        'process_distributed': 'pygeodata.cluster',
+        'process_graph': 'pygeodata.graph',
+        'set_config': 'pygeodata.config',
+    },
+)
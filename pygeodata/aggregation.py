@@ -0,0 +1,212 @@
+from typing import Any
+
+import numpy as np
+from affine import Affine
+
+AGGREGATION_METHODS = ('mean', 'sum', 'mode', 'min', 'max')
+
+
+def _as_integer(value: float, tol: float = 1e-6) -> int | None:
+    rounded = round(value)
+    if abs(value - rounded) > tol:
+        return None
+    return int(rounded)
+
+
+def aggregation_factors(src_transform: Affine, dst_transform: Affine) -> tuple[int, int, int, int] | None:
+    """Detect an integer-ratio aggregation between two grids.
+
+    Returns ``(fy, fx, row_off, col_off)`` when every destination pixel covers exactly ``fy`` by ``fx`` source
+    pixels and the destination origin falls on a source pixel corner, ``row_off`` and ``col_off`` being the
+    position of that corner in the source grid. Returns None otherwise.
+    """
+    if src_transform.b != 0 or src_transform.d != 0 or dst_transform.b != 0 or dst_transform.d != 0:
+        return None
+
+    fx = _as_integer(dst_transform.a / src_transform.a)
+    fy = _as_integer(dst_transform.e / src_transform.e)
+    if fx is None or fy is None or fx < 1 or fy < 1:
+        return None
+
+    col_off = _as_integer((dst_transform.c - src_transform.c) / src_transform.a)
+    row_off = _as_integer((dst_transform.f - src_transform.f) / src_transform.e)
+    if col_off is None or row_off is None:
+        return None
+
+    return fy, fx, row_off, col_off
+
+
+def valid_mask(data: np.ndarray, nodata: float | None) -> np.ndarray:
+    """Mask of the pixels in `data` that hold data, treating NaN as nodata for floating point arrays."""
+    valid = np.ones(data.shape, dtype=bool)
+    if np.issubdtype(data.dtype, np.floating):
+        valid &= ~np.isnan(data)
+    if nodata is not None and not np.isnan(nodata):
+        valid &= data != nodata
+    return valid
+
+
+def read_padded(
+    src: Any,
+    indexes: tuple[int, ...],
+    row_off: int,
+    col_off: int,
+    height: int,
+    width: int,
+    nodata: float | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Read a window from an open rasterio dataset, padding the parts that fall outside the dataset.
+
+    Returns the data, shaped ``(len(indexes), height, width)``, and a mask of the valid pixels. Padded pixels and
+    pixels equal to `nodata` are marked invalid.
+    """
+    data = np.zeros((len(indexes), height, width), dtype=src.dtypes[indexes[0] - 1])
+    valid = np.zeros(data.shape, dtype=bool)
+
+    r0, r1 = max(row_off, 0), min(row_off + height, src.height)
+    c0, c1 = max(col_off, 0), min(col_off + width, src.width)
+    if r0 >= r1 or c0 >= c1:
+        return data, valid
+
+    window = ((r0, r1), (c0, c1))
+    inner = src.read(indexes, window=window)
+    target = (slice(None), slice(r0 - row_off, r1 - row_off), slice(c0 - col_off, c1 - col_off))
+    data[target] = inner
+    valid[target] = valid_mask(inner, nodata)
+    return data, valid
+
+
+def _block_mode(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    # Sort every block with the invalid pixels last, then find the longest run of equal valid values.
+    order = np.lexsort((values, ~valid), axis=-1)
+    values = np.take_along_axis(values, order, axis=-1)
+    valid = np.take_along_axis(valid, order, axis=-1)
+
+    k = values.shape[-1]
+    idx = np.arange(k)
+
+    start = np.ones(values.shape, dtype=bool)
+    start[..., 1:] = (values[..., 1:] != values[..., :-1]) | (valid[..., 1:] != valid[..., :-1])
+    end = np.ones(values.shape, dtype=bool)
+    end[..., :-1] = start[..., 1:]
+
+    run_start = np.maximum.accumulate(np.where(start, idx, 0), axis=-1)
+    run_end = np.flip(np.minimum.accumulate(np.flip(np.where(end, idx, k - 1), axis=-1), axis=-1), axis=-1)
+    length = np.where(valid, run_end - run_start + 1, 0)
+
+    first = np.argmax(length, axis=-1)[..., np.newaxis]
+    return np.take_along_axis(values, first, axis=-1)[..., 0]
+
+
+def block_reduce(
+    data: np.ndarray,
+    valid: np.ndarray,
+    factors: tuple[int, int],
+    method: str,
+    fill: float,
+) -> np.ndarray:
+    """Aggregate non-overlapping ``fy`` by ``fx`` blocks over the last two axes of `data`.
+
+    Invalid pixels are ignored. Blocks without any valid pixel are set to `fill`. 'mean' and 'sum' return
+    float64, the other methods keep the dtype of `data`. Ties in 'mode' resolve to the smallest value.
+    """
+    if method not in AGGREGATION_METHODS:
+        raise ValueError(f'Unknown aggregation method: {method}. Use one of {AGGREGATION_METHODS}')
+
+    fy, fx = factors
+    *lead, height, width = data.shape
+    if height % fy or width % fx:
+        raise ValueError(f'Data shape {data.shape} is not a multiple of the aggregation factors {factors}')
+
+    blocked_shape = (*lead, height // fy, fy, width // fx, fx)
+    blocks = data.reshape(blocked_shape)
+    mask = valid.reshape(blocked_shape)
+    axes = (-3, -1)
+
+    count = mask.sum(axis=axes)
+
+    if method in ('mean', 'sum'):
+        result = np.where(mask, blocks, 0).sum(axis=axes, dtype=np.float64)
+        if method == 'mean':
+            result /= np.maximum(count, 1)
+    elif method in ('min', 'max'):
+        info = np.finfo if np.issubdtype(data.dtype, np.floating) else np.iinfo
+        neutral = info(data.dtype).max if method == 'min' else info(data.dtype).min
+        reduce = np.min if method == 'min' else np.max
+        result = reduce(np.where(mask, blocks, neutral), axis=axes)
+    else:
+        n = len(lead)
+        order = (*range(n), n, n + 2, n + 1, n + 3)
+        flat_shape = (*lead, height // fy, width // fx, fy * fx)
+        result = _block_mode(
+            blocks.transpose(order).reshape(flat_shape),
+            mask.transpose(order).reshape(flat_shape),
+        )
+
+    return np.where(count > 0, result, fill)
+
+
+POINT_STATISTICS = ('count', 'sum', 'mean', 'min', 'max')
+
+
+class PointAccumulator:
+    """Accumulate point values into the cells of a grid with bincount-style reductions.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of the grid.
+    statistic : str
+        One of 'count', 'sum', 'mean', 'min' or 'max'.
+    """
+
+    def __init__(self, shape: tuple[int, int], statistic: str):
+        if statistic not in POINT_STATISTICS:
+            raise ValueError(f'Unknown point statistic: {statistic}. Use one of {POINT_STATISTICS}')
+
+        self.shape = shape
+        self.statistic = statistic
+
+        size = shape[0] * shape[1]
+        self.count = np.zeros(size, dtype=np.int64)
+        if statistic in ('sum', 'mean'):
+            self.total = np.zeros(size, dtype=np.float64)
+        elif statistic == 'min':
+            self.extreme = np.full(size, np.inf)
+        elif statistic == 'max':
+            self.extreme = np.full(size, -np.inf)
+
+    def add(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray | None = None) -> None:
+        """Add points at integer grid positions. Points outside the grid and NaN values are skipped."""
+        height, width = self.shape
+        keep = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+        if values is not None:
+            values = np.asarray(values, dtype=np.float64)
+            keep &= ~np.isnan(values)
+            values = values[keep]
+
+        cells = rows[keep] * width + cols[keep]
+
+        self.count += np.bincount(cells, minlength=self.count.size)
+        if self.statistic in ('sum', 'mean'):
+            self.total += np.bincount(cells, weights=values, minlength=self.count.size)
+        elif self.statistic == 'min':
+            np.minimum.at(self.extreme, cells, values)
+        elif self.statistic == 'max':
+            np.maximum.at(self.extreme, cells, values)
+
+    def result(self, fill: float) -> np.ndarray:
+        """The accumulated statistic on the grid, with `fill` in cells without points."""
+        if self.statistic == 'count':
+            result = self.count
+        elif self.statistic == 'sum':
+            result = self.total
+        elif self.statistic == 'mean':
+            result = self.total / np.maximum(self.count, 1)
+        else:
+            result = self.extreme
+
+        if self.statistic != 'count':
+            result = np.where(self.count > 0, result, fill)
+
+        return result.reshape(self.shape)
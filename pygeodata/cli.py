@@ -0,0 +1,248 @@
+"""Command line batch runner, installed as the ``pygeodata`` console script.
+
+Example::
+
+    pygeodata mypackage.loaders --crs EPSG:4326 --transform 0.1 0 -180 0 -0.1 90 --shape 1800 3600 -j 4
+"""
+
+import argparse
+import importlib
+import importlib.util
+import json
+import sys
+import time
+import traceback
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from types import ModuleType
+
+from pygeodata.config import Config, get_config, set_config, use_config
+from pygeodata.loader import DataLoader
+from pygeodata.types import SpatialSpec
+
+MB = 2**20
+
+
+def parse_spec(crs: str, transform: Sequence[float], shape: Sequence[int]) -> SpatialSpec:
+    from affine import Affine
+    from pyproj import CRS
+
+    if len(transform) != 6:
+        raise ValueError(f'Expected 6 transform coefficients (a, b, c, d, e, f), got {len(transform)}.')
+    if len(shape) != 2:
+        raise ValueError(f'Expected a shape of (height, width), got {shape}.')
+    return SpatialSpec(crs=CRS.from_user_input(crs), transform=Affine(*transform), shape=tuple(int(n) for n in shape))
+
+
+def read_specs(path: str | Path) -> list[SpatialSpec]:
+    """Read specs from a JSON file with one or a list of ``{"crs": ..., "transform": [...], "shape": [...]}``."""
+    content = json.loads(Path(path).read_text())
+    if isinstance(content, dict):
+        content = [content]
+    return [parse_spec(spec['crs'], spec['transform'], spec['shape']) for spec in content]
+
+
+@cache
+def import_loaders(reference: str) -> list[DataLoader]:
+    """Loaders of ``module``, ``module:attribute`` or ``path/to/file.py[:attribute]``.
+
+    The attribute may be a loader or a list of loaders. Without it, the ``LOADERS`` list of the module is used if
+    it exists, and otherwise all loaders defined at module level, in order of definition.
+    """
+    target, _, attribute = reference.partition(':')
+
+    module: ModuleType
+    if target.endswith('.py'):
+        path = Path(target).resolve()
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f'Cannot import {path}')
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(target)
+
+    if not attribute and hasattr(module, 'LOADERS'):
+        attribute = 'LOADERS'
+
+    if attribute:
+        loaders = getattr(module, attribute)
+        loaders = [loaders] if isinstance(loaders, DataLoader) else list(loaders)
+    else:
+        loaders = [value for value in vars(module).values() if isinstance(value, DataLoader)]
+
+    if not loaders:
+        raise ValueError(f'No loaders found in {reference}')
+    return loaders
+
+
+@dataclass
+class Result:
+    """Outcome of processing one loader for one spec."""
+
+    description: str
+    seconds: float
+    pixels: int
+    bytes: int
+    error: str | None = None
+
+    def __str__(self) -> str:
+        if self.error is not None:
+            return f'Failed: {self.description} after {self.seconds:.1f} s\n{self.error}'
+        seconds = max(self.seconds, 1e-9)
+        return (
+            f'Done: {self.description} in {self.seconds:.1f} s '
+            f'({self.pixels / seconds / 1e6:.2f} Mpixel/s, {self.bytes / MB / seconds:.2f} MB/s)'
+        )
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+    return path.stat().st_size if path.exists() else 0
+
+
+def run_task(reference: str, index: int, spec: SpatialSpec, config: Config) -> Result:
+    """Process loader `index` of `reference` for `spec` with `config`, in a worker process."""
+    loader = import_loaders(reference)[index]
+    description = f'{loader} {spec}'
+    start = time.perf_counter()
+    with use_config(config):
+        try:
+            loader.process(spec)
+        except Exception:
+            return Result(description, time.perf_counter() - start, 0, 0, traceback.format_exc())
+
+        return Result(
+            description,
+            time.perf_counter() - start,
+            spec.shape[0] * spec.shape[1],
+            _size(loader.get_processed_path(spec)),
+        )
+
+
+def _run_local(reference: str, tasks: list[tuple[int, SpatialSpec]], workers: int) -> Iterator[Result]:
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_task, reference, index, spec, get_config()) for index, spec in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _run_distributed(
+    reference: str,
+    tasks: list[tuple[int, SpatialSpec]],
+    scheduler: str,
+    workers: int,
+) -> Iterator[Result]:
+    import distributed
+
+    from pygeodata.cluster import product_key
+
+    loaders = import_loaders(reference)
+    if scheduler == 'local':
+        client = distributed.Client(n_workers=workers, threads_per_worker=1)
+    else:
+        client = distributed.Client(scheduler)
+
+    with client:
+        futures = [
+            client.submit(
+                run_task,
+                reference,
+                index,
+                spec,
+                get_config(),
+                key=product_key(loaders[index], spec, name='cli'),
+            )
+            for index, spec in tasks
+        ]
+        for future in distributed.as_completed(futures):
+            yield future.result()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='pygeodata', description='Process pygeodata loaders for a set of specs.')
+    parser.add_argument(
+        'loaders',
+        help="Loaders to process, as 'module', 'module:attribute' or 'path/to/file.py[:attribute]'",
+    )
+    parser.add_argument('--spec-file', type=Path, help='JSON file with a spec or a list of specs')
+    parser.add_argument('--crs', help="CRS of the spec, e.g. 'EPSG:4326'")
+    parser.add_argument('--transform', type=float, nargs=6, metavar='N', help='Affine coefficients a b c d e f')
+    parser.add_argument('--shape', type=int, nargs=2, metavar=('HEIGHT', 'WIDTH'), help='Shape of the spec')
+    parser.add_argument('-j', '--workers', type=int, default=1, help='Number of worker processes (default: 1)')
+    parser.add_argument(
+        '--scheduler',
+        help="Address of a dask.distributed scheduler to process on, or 'local' for a LocalCluster of -j workers",
+    )
+    parser.add_argument('--data-dir', type=Path, help='Directory of the processed data (path_data_processed)')
+    parser.add_argument('--dry-run', action='store_true', help='Print the plan without processing')
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    specs = []
+    if args.spec_file is not None:
+        specs.extend(read_specs(args.spec_file))
+    if any(value is not None for value in (args.crs, args.transform, args.shape)):
+        if None in (args.crs, args.transform, args.shape):
+            parser.error('--crs, --transform and --shape must be given together')
+        specs.append(parse_spec(args.crs, args.transform, args.shape))
+    if not specs:
+        parser.error('Give a --spec-file or --crs, --transform and --shape')
+
+    overrides = {} if args.data_dir is None else {'path_data_processed': args.data_dir}
+    with set_config(**overrides):
+        return _run(args, specs)
+
+
+def _run(args: argparse.Namespace, specs: list[SpatialSpec]) -> int:
+    loaders = import_loaders(args.loaders)
+
+    if args.dry_run:
+        from pygeodata.planning import plan
+
+        print(plan([(loader, spec) for spec in specs for loader in loaders], workers=args.workers))
+        return 0
+
+    tasks = []
+    skipped = 0
+    for spec in specs:
+        for index, loader in enumerate(loaders):
+            if loader.is_processed(spec):
+                skipped += 1
+                print(f'Skipping: {loader} {spec} is processed')
+                continue
+            tasks.append((index, spec))
+
+    where = f'{args.workers} workers' if args.scheduler in (None, 'local') else args.scheduler
+    print(f'Processing {len(tasks)} tasks on {where}, {skipped} already processed')
+
+    start = time.perf_counter()
+    if args.scheduler is None:
+        run = _run_local(args.loaders, tasks, args.workers)
+    else:
+        run = _run_distributed(args.loaders, tasks, args.scheduler, args.workers)
+
+    results = []
+    for result in run:
+        results.append(result)
+        print(result, flush=True)
+
+    failed = sum(result.error is not None for result in results)
+    total_bytes = sum(result.bytes for result in results)
+    print(
+        f'Finished {len(results) - failed} of {len(tasks)} tasks in {time.perf_counter() - start:.1f} s, '
+        f'{failed} failed, {skipped} skipped, {total_bytes / MB:.1f} MB written'
+    )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
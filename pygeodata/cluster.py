@@ -0,0 +1,106 @@
+"""Processing on a ``dask.distributed`` cluster.
+
+Requires the optional ``distributed`` package. Every product is one task, keyed by its processed path, so that a
+product submitted twice, also by different clients of the same scheduler, is processed only once::
+
+    from distributed import Client, LocalCluster
+
+    with Client(LocalCluster(n_workers=4, threads_per_worker=1)) as client:
+        for loader in process_distributed(loaders, spec, client=client):
+            print(f'Processed {loader}')
+
+The workers must see the same filesystem as the client, and be able to import the loaders.
+"""
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from distributed import Client, Future, as_completed, get_client
+
+from pygeodata.config import Config, get_config, use_config
+from pygeodata.graph import Node, resolve_graph
+from pygeodata.loader import DataLoader
+from pygeodata.types import SpatialSpec
+
+
+def product_key(loader: DataLoader, spec: SpatialSpec, config: Config | None = None, name: str = 'process') -> str:
+    """Key of the task `name` for `loader` and `spec`, unique to its product."""
+    with use_config(config or get_config()):
+        path = loader.get_processed_path(spec, mkdir=False)
+    return f'pygeodata-{name}-{path.absolute()}'
+
+
+def _process(loader: DataLoader, spec: SpatialSpec, config: Config, *inputs: Path) -> Path:
+    # `inputs` are the results of the upstream tasks, only passed to make dask wait for them
+    with use_config(config):
+        if not loader.is_processed(spec):
+            loader.process(spec)
+        return loader.get_processed_path(spec)
+
+
+def submit_graph(client: Client, loaders: Iterable[DataLoader], spec: SpatialSpec) -> dict[Path, Future]:
+    """Submit loaders and their upstream loaders for `spec`, each task depending on the tasks of its inputs.
+
+    Products that are already processed are skipped by the workers.
+
+    Returns
+    -------
+    dict of Path to Future
+        The futures of all products in the graph, in topological order. Their results are the processed paths.
+    """
+    return _submit_nodes(client, resolve_graph(loaders, spec), spec)
+
+
+def _submit_nodes(client: Client, graph: dict[Path, Node], spec: SpatialSpec) -> dict[Path, Future]:
+    config = get_config()
+    futures: dict[Path, Future] = {}
+    for path, node in graph.items():
+        futures[path] = client.submit(
+            _process,
+            node.loader,
+            spec,
+            config,
+            *(futures[upstream] for upstream in node.inputs),
+            key=product_key(node.loader, spec, config),
+        )
+    return futures
+
+
+def process_distributed(
+    loaders: Iterable[DataLoader],
+    spec: SpatialSpec | None = None,
+    client: Client | None = None,
+) -> Iterator[DataLoader]:
+    """Process loaders and their upstream loaders on a dask cluster, yielding them as they finish.
+
+    Parameters
+    ----------
+    loaders : iterable of DataLoader
+        Loaders to process. Their `inputs` are resolved recursively.
+    spec : SpatialSpec, optional
+        Spatial specification. Defaults to the spec in the config.
+    client : Client, optional
+        Client of the cluster. Defaults to the current client, see `distributed.get_client`.
+
+    Yields
+    ------
+    DataLoader
+        The loaders of the graph, including those that were already processed, in the order they finish.
+
+    Raises
+    ------
+    Exception
+        The error of the first product that fails. Products that do not depend on it keep running on the cluster.
+    """
+    spec = spec or get_config().spec
+    if spec is None:
+        raise ValueError('No spatial specification (spec) provided or present in config')
+    client = client or get_client()
+
+    graph = resolve_graph(loaders, spec)
+    futures = _submit_nodes(client, graph, spec)
+    paths = {future.key: path for path, future in futures.items()}
+
+    for future in as_completed(futures.values()):
+        future.result()
+        yield graph[paths[future.key]].loader
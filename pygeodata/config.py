@@ -1,20 +1,39 @@
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator
 from contextlib import contextmanager
-from dataclasses import dataclass, field, fields
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field, replace
+from functools import wraps
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Literal, ParamSpec, TypeVar
 
-from pygeodata.options import RasterCreationOptions
+from pygeodata.options import GDALOptions, RasterCreationOptions
 from pygeodata.types import SpatialSpec
 
+if TYPE_CHECKING:
+    from pygeodata.pyramid import Pyramid
+    from pygeodata.source_cache import SourceCache
+
+P = ParamSpec('P')
+R = TypeVar('R')
+
 
 @dataclass
 class Config:
     path_data_processed: Path = Path('data_processed')
-    num_threads: int = 1
-    warp_mem_limit: int = 0  # GDAL default, indicates 64 MB
+    num_threads: int | Literal['auto'] = 1
+    warp_mem_limit: int | Literal['auto'] = 0  # GDAL default, indicates 64 MB
     spec: SpatialSpec | None = None
     raster_creation_options: RasterCreationOptions = field(default_factory=RasterCreationOptions)
+    gdal_options: GDALOptions = field(default_factory=GDALOptions)
+    # Where products are written before being moved into place: None for the system temporary directory, 'sibling'
+    # for a hidden directory next to each product, so that publishing is a rename on the same filesystem, or a path
+    scratch_dir: Path | Literal['sibling'] | None = None
+    # Load products that are not processed yet without caching them, see `DataLoader.__call__`
+    ephemeral: bool = False
+    # Process all levels of the pyramid, of which the coarser are aggregated, when any of them is processed
+    pyramid: 'Pyramid | None' = None
+    # Local copies of the sources of processors, for sources on slow or remote storage
+    source_cache: 'SourceCache | None' = None
 
     def update(self, **kwargs):
         for key, value in kwargs.items():
@@ -23,18 +42,50 @@ class Config:
             setattr(self, key, value)
 
 
+# Process-wide defaults, used by every thread and task that has not entered `set_config`
 CONFIG = Config()
 
+_CONFIG: ContextVar[Config] = ContextVar('pygeodata_config', default=CONFIG)
+
 
 def get_config() -> Config:
-    return CONFIG
+    return _CONFIG.get()
 
 
 @contextmanager
 def set_config(**overrides: Any) -> Iterator[Config]:
-    old_values = {k.name: getattr(CONFIG, k.name) for k in fields(CONFIG)}
-    CONFIG.update(**overrides)
+    """Override the configuration for the current thread or asyncio task.
+
+    The overrides apply to a copy of the active configuration, so concurrent threads and tasks do not see each
+    other's settings. Tasks created inside the block inherit them, threads only when their target is wrapped
+    with `bind_config`.
+    """
+    config = replace(get_config())
+    config.update(**overrides)
+    with use_config(config):
+        yield config
+
+
+@contextmanager
+def use_config(config: Config) -> Iterator[Config]:
+    """Activate `config` for the current thread or asyncio task, e.g. one received from another process."""
+    token = _CONFIG.set(config)
     try:
-        yield CONFIG
+        yield config
     finally:
-        CONFIG.update(**old_values)
+        _CONFIG.reset(token)
+
+
+def bind_config(func: Callable[P, R]) -> Callable[P, R]:
+    """Bind `func` to the configuration active at the time of binding.
+
+    Use this to hand work to threads, e.g. ``executor.submit(bind_config(loader.process), spec)``, which would
+    otherwise run with the process-wide defaults.
+    """
+    context = copy_context()
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
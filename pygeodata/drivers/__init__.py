@@ -1,3 +1,23 @@
-from pygeodata.drivers.rioxarray import RioXArrayDriver
+from typing import TYPE_CHECKING
 
-__all__ = ['RioXArrayDriver']
+from pygeodata.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from pygeodata.drivers.dataset import DatasetDriver
+    from pygeodata.drivers.geoparquet import GeoParquetDriver
+    from pygeodata.drivers.memmap import MemmapDriver
+    from pygeodata.drivers.parquet import ParquetDriver
+    from pygeodata.drivers.rioxarray import RioXArrayDriver
+
+__all__ = ['DatasetDriver', 'GeoParquetDriver', 'MemmapDriver', 'ParquetDriver', 'RioXArrayDriver']
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        'DatasetDriver': 'pygeodata.drivers.dataset',
+        'GeoParquetDriver': 'pygeodata.drivers.geoparquet',
+        'MemmapDriver': 'pygeodata.drivers.memmap',
+        'ParquetDriver': 'pygeodata.drivers.parquet',
+        'RioXArrayDriver': 'pygeodata.drivers.rioxarray',
+    },
+)
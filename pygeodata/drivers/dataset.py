@@ -0,0 +1,87 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pygeodata.env import with_gdal_env
+
+if TYPE_CHECKING:
+    import xarray as xr
+
+
+@dataclass
+class DatasetDriver:
+    """Load a multi-variable product lazily as an `xr.Dataset`.
+
+    Reads either a Zarr store or a directory with a GeoTIFF per variable, as written by `SubdatasetReprojector`.
+    The data is backed by dask arrays and only read when computed.
+
+    Parameters
+    ----------
+    variables : sequence of str, optional
+        Variables to load. If None, loads all variables
+    mask_and_scale : bool, optional
+        Whether to mask and scale, by default True
+    flatten : bool, optional
+        Whether to remove the band dimension of variables with a single band, by default True
+    chunks : dict or bool or str, optional
+        Dask chunks, by default 'auto'
+    open_kw : dict, optional
+        Additional keyword arguments to pass to rioxarray.open_rasterio or xarray.open_zarr
+    """
+
+    variables: Sequence[str] | None = None
+    mask_and_scale: bool = True
+    flatten: bool = True
+    chunks: dict[str, int] | bool | str = 'auto'
+    open_kw: dict[str, Any] = field(default_factory=dict)
+
+    def _open_directory(self, path: Path) -> 'xr.Dataset':
+        import rioxarray as rxr
+        import xarray as xr
+
+        paths = {p.stem: p for p in sorted(path.glob('*.tif'))}
+        if self.variables is not None:
+            paths = {variable: paths[variable] for variable in self.variables}
+
+        data_vars = {}
+        for variable, variable_path in paths.items():
+            da = rxr.open_rasterio(
+                variable_path,
+                chunks=self.chunks,
+                mask_and_scale=self.mask_and_scale,
+                **self.open_kw,
+            )
+            if self.flatten and da.sizes['band'] == 1:
+                da = da.isel(band=0).drop_vars('band')
+            data_vars[variable] = da
+
+        band_sizes = {da.sizes.get('band') for da in data_vars.values()}
+        if len(band_sizes) > 1:
+            raise ValueError(f'Variables in {path} have different numbers of bands and cannot form a Dataset.')
+
+        return xr.Dataset(data_vars)
+
+    @with_gdal_env
+    def __call__(self, path: str | Path) -> 'xr.Dataset':
+        # Imported here so that processors using this driver by default do not import xarray
+        import xarray as xr
+
+        path = Path(path)
+
+        is_zarr = any((path / name).exists() for name in ('zarr.json', '.zgroup'))
+        if path.is_dir() and not is_zarr:
+            return self._open_directory(path)
+
+        ds = xr.open_zarr(
+            path,
+            chunks=self.chunks,
+            mask_and_scale=self.mask_and_scale,
+            decode_coords='all',
+            **self.open_kw,
+        )
+        if self.variables is not None:
+            ds = ds[list(self.variables)]
+        return ds
+
+    default_ext = 'zarr'
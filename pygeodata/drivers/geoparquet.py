@@ -0,0 +1,30 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import geopandas as gpd
+
+
+@dataclass
+class GeoParquetDriver:
+    """Load a vector product from a GeoParquet file with geopandas.
+
+    Parameters
+    ----------
+    columns : sequence of str, optional
+        Attribute columns to read. If None, reads all columns. The 'geometry' column is always read.
+    bbox : tuple of float, optional
+        Only read the features intersecting ``(minx, miny, maxx, maxy)``, in the CRS of the product. Row groups
+        outside of it are skipped using the bounding box column written by `VectorClipper`.
+    """
+
+    columns: Sequence[str] | None = None
+    bbox: tuple[float, float, float, float] | None = None
+
+    def __call__(self, path: str | Path) -> gpd.GeoDataFrame:
+        columns = None
+        if self.columns is not None:
+            columns = [*self.columns, *(['geometry'] if 'geometry' not in self.columns else [])]
+        return gpd.read_parquet(path, columns=columns, bbox=self.bbox)
+
+    default_ext = 'parquet'
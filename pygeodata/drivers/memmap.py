@@ -0,0 +1,91 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import xarray as xr
+
+
+def sidecar_path(path: str | Path) -> Path:
+    """Path of the JSON file holding the georeferencing of a memory-mapped product."""
+    path = Path(path)
+    return path.with_name(f'{path.name}.json')
+
+
+def read_sidecar(path: str | Path) -> dict[str, Any]:
+    return json.loads(sidecar_path(path).read_text())
+
+
+@dataclass
+class MemmapDriver:
+    """Load a memory-mapped product, as written by `MemmapConverter`, without copying the data.
+
+    The raw array of the .npy file is mapped read-only into memory, so processes loading the same product share
+    the page cache instead of holding their own copies. The CRS, transform, nodata, scales and offsets are read
+    from the JSON sidecar next to it.
+
+    Parameters
+    ----------
+    flatten : bool, optional
+        By default 2D rasters will be returned as 3D, with a band dimension of size 1. If True, which is the
+        default, this dimension is removed.
+    mask_and_scale : bool, optional
+        Whether to mask the nodata values and apply the scales and offsets, by default False. This creates a copy
+        of the data in memory.
+    """
+
+    flatten: bool = True
+    mask_and_scale: bool = False
+
+    def __call__(self, path: str | Path) -> 'xr.DataArray':
+        # Imported here so that processors using this driver by default do not import xarray
+        import rioxarray  # noqa: F401
+        import xarray as xr
+        from affine import Affine
+
+        path = Path(path)
+        meta = read_sidecar(path)
+        data = np.load(path, mmap_mode='r')
+
+        count, height, width = data.shape
+        transform = Affine(*meta['transform'])
+        x = transform.c + (np.arange(width) + 0.5) * transform.a
+        y = transform.f + (np.arange(height) + 0.5) * transform.e
+
+        da = xr.DataArray(
+            data,
+            dims=('band', 'y', 'x'),
+            coords={'band': np.arange(1, count + 1), 'y': y, 'x': x},
+        )
+        da.rio.write_crs(meta['crs'], inplace=True)
+        da.rio.write_transform(transform, inplace=True)
+
+        nodata = meta['nodata']
+        scales = meta['scales']
+        offsets = meta['offsets']
+
+        if self.mask_and_scale:
+            da = da.astype(np.float64)
+            if nodata is not None and not np.isnan(nodata):
+                da = da.where(da != nodata)
+            da = da * xr.DataArray(scales, dims='band') + xr.DataArray(offsets, dims='band')
+            da.rio.write_nodata(np.nan, encoded=True, inplace=True)
+        else:
+            if nodata is not None:
+                da.rio.write_nodata(nodata, encoded=False, inplace=True)
+            if any(scale != 1 for scale in scales) or any(offset != 0 for offset in offsets):
+                da.attrs['scale_factor'] = scales[0] if count == 1 else tuple(scales)
+                da.attrs['add_offset'] = offsets[0] if count == 1 else tuple(offsets)
+
+        if any(meta.get('descriptions', ())):
+            da.attrs['long_name'] = tuple(meta['descriptions']) if count > 1 else meta['descriptions'][0]
+
+        if self.flatten and count == 1:
+            da = da.isel(band=0).drop_vars('band')
+
+        return da
+
+    default_ext = 'npy'
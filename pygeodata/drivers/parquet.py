@@ -0,0 +1,23 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+
+@dataclass
+class ParquetDriver:
+    """Load a table from a Parquet file with pandas.
+
+    Parameters
+    ----------
+    columns : sequence of str, optional
+        Columns to read. If None, reads all columns
+    """
+
+    columns: Sequence[str] | None = None
+
+    def __call__(self, path: str | Path) -> pd.DataFrame:
+        return pd.read_parquet(path, columns=self.columns)
+
+    default_ext = 'parquet'
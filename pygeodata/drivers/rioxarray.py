@@ -1,11 +1,14 @@
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import numpy as np
 import rasterio as rio
-import rioxarray as rxr
-import xarray as xr
-from rioxarray.exceptions import TooManyDimensions
+
+from pygeodata.env import with_gdal_env
+
+if TYPE_CHECKING:
+    import xarray as xr
 
 
 @dataclass
@@ -57,7 +60,13 @@ class RioXArrayDriver:
         with rio.open(path):
             pass
 
-    def __call__(self, path: str | Path) -> xr.DataArray:
+    @with_gdal_env
+    def __call__(self, path: str | Path) -> 'xr.DataArray':
+        # Imported here so that processors using this driver by default do not import xarray
+        import rioxarray as rxr
+        import xarray as xr
+        from rioxarray.exceptions import TooManyDimensions
+
         path = Path(path)
 
         self._assert_exists(path)
@@ -0,0 +1,186 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from pygeodata.aggregation import valid_mask
+
+# Smallest first, so that the first data type holding a range is the most compact
+INTEGER_DTYPES = tuple(np.dtype(t) for t in ('uint8', 'int8', 'uint16', 'int16', 'uint32', 'int32', 'int64'))
+
+# Data types for which the GeoTIFF driver supports NBITS
+NBITS_DTYPES = (np.dtype('uint8'), np.dtype('uint16'), np.dtype('uint32'))
+
+
+class ValueRange:
+    """Running minimum and maximum of the valid values of a band.
+
+    Also tracks whether all values are whole numbers and whether they are exactly representable as float32, which
+    decide whether a floating point band can be stored losslessly in a smaller data type.
+    """
+
+    def __init__(self):
+        self.min: float | None = None
+        self.max: float | None = None
+        self.integral = True
+        self.float32_exact = True
+
+    def add(self, data: np.ndarray, nodata: float | None) -> None:
+        values = data[valid_mask(data, nodata)]
+        if values.size == 0:
+            return
+
+        vmin, vmax = values.min().item(), values.max().item()
+        self.min = vmin if self.min is None else min(self.min, vmin)
+        self.max = vmax if self.max is None else max(self.max, vmax)
+
+        if np.issubdtype(values.dtype, np.floating):
+            self.integral &= bool(np.all(np.isfinite(values)) and np.all(np.mod(values, 1) == 0))
+            self.float32_exact &= bool(np.array_equal(values.astype(np.float32), values))
+
+
+def smallest_integer_dtype(vmin: float, vmax: float) -> np.dtype | None:
+    """Smallest integer data type holding all values from `vmin` to `vmax`, or None."""
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= vmin and vmax <= info.max:
+            return dtype
+    return None
+
+
+def _nbits(dtype: np.dtype, vmax: int) -> int | None:
+    bits = max(1, int(vmax).bit_length())
+    if dtype in NBITS_DTYPES and bits < dtype.itemsize * 8:
+        return bits
+    return None
+
+
+@dataclass
+class Encoding:
+    """How the bands of a raster are stored.
+
+    Bands share the data type, nodata value and number of bits. Quantized bands are stored as
+    ``round((value - offset) / scale)``, with their own scale and offset, which GDAL and rioxarray apply when
+    reading with masking and scaling.
+
+    Parameters
+    ----------
+    dtype : np.dtype
+        Storage data type
+    nodata : float, optional
+        Storage nodata value
+    nbits : int, optional
+        Number of bits per pixel, for unsigned data types
+    scales : tuple of float, optional
+        Scale of each band, if the bands are quantized
+    offsets : tuple of float, optional
+        Offset of each band, if the bands are quantized
+    valid_range : tuple of float, optional
+        Range of the stored values of valid pixels. Values outside of it are clipped, so that they neither wrap
+        around in the storage data type nor collide with the nodata value.
+    """
+
+    dtype: np.dtype
+    nodata: float | None = None
+    nbits: int | None = None
+    scales: tuple[float, ...] | None = None
+    offsets: tuple[float, ...] | None = None
+    valid_range: tuple[float, float] | None = None
+
+    def __str__(self) -> str:
+        parts = [f'dtype={self.dtype}', f'nodata={self.nodata}']
+        if self.nbits is not None:
+            parts.append(f'nbits={self.nbits}')
+        if self.scales is not None:
+            parts.append(f'scales={self.scales}, offsets={self.offsets}')
+        return ', '.join(parts)
+
+    def encode(self, data: np.ndarray, nodata: float | None, band: int | None = None) -> np.ndarray:
+        """Encode `data`, shaped ``(count, height, width)``, or the 2D data of band index `band` (0-indexed).
+
+        Pixels that are nodata in the input become the storage nodata value. Other pixels are clipped to the
+        valid range.
+        """
+        valid = valid_mask(data, nodata)
+
+        if self.scales is not None:
+            scales = np.asarray(self.scales if band is None else self.scales[band])
+            offsets = np.asarray(self.offsets if band is None else self.offsets[band])
+            if band is None:
+                scales = scales[:, np.newaxis, np.newaxis]
+                offsets = offsets[:, np.newaxis, np.newaxis]
+            data = np.rint((data - offsets) / scales)
+
+        if self.valid_range is not None:
+            data = np.clip(data, *self.valid_range)
+
+        if self.nodata is not None:
+            data = np.where(valid, data, self.nodata)
+
+        return data.astype(self.dtype)
+
+
+def _integer_encoding(vmin: float, vmax: float, nodata: float | None, dtype: np.dtype) -> Encoding | None:
+    candidates = [(vmin, vmax, None)] if nodata is None else []
+    if nodata is not None:
+        if np.isfinite(nodata) and float(nodata).is_integer():
+            candidates.append((min(vmin, nodata), max(vmax, nodata), nodata))
+        # Replacing a nodata value that cannot be stored, or that is far from the data, by the first value above it
+        candidates.append((vmin, vmax + 1, vmax + 1))
+
+    for lo, hi, stored_nodata in candidates:
+        int_dtype = smallest_integer_dtype(lo, hi)
+        if int_dtype is None:
+            continue
+        nbits = _nbits(int_dtype, hi) if lo >= 0 else None
+        if int_dtype.itemsize < dtype.itemsize or np.issubdtype(dtype, np.floating) or nbits is not None:
+            stored_nodata = int(stored_nodata) if stored_nodata is not None else None
+            return Encoding(int_dtype, stored_nodata, nbits, valid_range=(vmin, vmax))
+
+    return None
+
+
+def choose_encoding(
+    ranges: Sequence[ValueRange],
+    dtype: DTypeLike,
+    nodata: float | None,
+    quantize: float | None = None,
+) -> Encoding:
+    """Choose the most compact encoding of bands with the given value ranges.
+
+    Whole numbers are stored losslessly in the smallest integer data type holding them and the nodata value.
+    Other floating point bands are quantized to integers with an absolute error of at most `quantize`, if given,
+    or stored as float32 when that is exact. A nodata value that cannot be stored, such as NaN in an integer band,
+    is replaced by the first value above the data. If nothing is gained, `dtype` and `nodata` are kept.
+    """
+    dtype = np.dtype(dtype)
+    nonempty = [r for r in ranges if r.min is not None]
+
+    if all(r.integral for r in nonempty):
+        vmin = min((r.min for r in nonempty), default=0)
+        vmax = max((r.max for r in nonempty), default=0)
+        encoding = _integer_encoding(vmin, vmax, nodata, dtype)
+        if encoding is not None:
+            return encoding
+
+    if quantize is not None and np.issubdtype(dtype, np.floating):
+        scale = 2 * quantize
+        # Bands without data are not quantized, so their offset is irrelevant
+        offsets = tuple(r.min if r.min is not None else 0.0 for r in ranges)
+        vmax = max((round((r.max - r.min) / scale) for r in nonempty), default=0)
+        valid_range = (0, vmax)
+        stored_nodata = None
+        if nodata is not None:
+            stored_nodata = vmax = vmax + 1
+
+        int_dtype = smallest_integer_dtype(0, vmax)
+        if int_dtype is not None and int_dtype.itemsize < dtype.itemsize:
+            nbits = _nbits(int_dtype, vmax)
+            return Encoding(int_dtype, stored_nodata, nbits, (scale,) * len(ranges), offsets, valid_range)
+
+    if dtype == np.float64 and all(r.float32_exact for r in nonempty):
+        if nodata is None or np.isnan(nodata) or np.float32(nodata) == nodata:
+            return Encoding(np.dtype(np.float32), nodata)
+
+    return Encoding(dtype, nodata)
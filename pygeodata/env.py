@@ -0,0 +1,30 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from typing import ParamSpec, TypeVar
+
+from pygeodata.config import get_config
+
+P = ParamSpec('P')
+R = TypeVar('R')
+
+
+@contextmanager
+def gdal_env() -> Iterator[None]:
+    """Apply the GDAL options of the active configuration."""
+    # Imported here to keep rasterio out of `import pygeodata`
+    import rasterio as rio
+
+    with rio.Env(**get_config().gdal_options.to_dict()):
+        yield
+
+
+def with_gdal_env(func: Callable[P, R]) -> Callable[P, R]:
+    """Run `func` within `gdal_env`."""
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        with gdal_env():
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,117 @@
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pygeodata.config import bind_config, get_config
+from pygeodata.loader import DataLoader
+from pygeodata.types import SpatialSpec
+from pygeodata.utils import remove_path
+
+
+@dataclass
+class Node:
+    """A loader in the dependency graph, identified by its processed path."""
+
+    loader: DataLoader
+    path: Path
+    inputs: list[Path] = field(default_factory=list)
+
+
+def resolve_graph(loaders: Iterable[DataLoader], spec: SpatialSpec) -> dict[Path, Node]:
+    """Collect `loaders` and all their upstream loaders, in topological order (inputs first).
+
+    Raises
+    ------
+    ValueError
+        If the loaders depend on each other in a cycle.
+    """
+    graph: dict[Path, Node] = {}
+    visiting: set[Path] = set()
+
+    def visit(loader: DataLoader) -> Path:
+        path = loader.get_processed_path(spec)
+        if path in graph:
+            return path
+        if path in visiting:
+            raise ValueError(f'Cyclic dependency on {loader}')
+
+        visiting.add(path)
+        inputs = [visit(upstream) for upstream in loader.inputs]
+        visiting.remove(path)
+
+        graph[path] = Node(loader, path, inputs)
+        return path
+
+    for loader in loaders:
+        visit(loader)
+
+    return graph
+
+
+def _is_outdated(node: Node, spec: SpatialSpec, rebuilt: set[Path]) -> bool:
+    if not node.loader.is_processed(spec):
+        return True
+    mtime = node.path.stat().st_mtime
+    return any(path in rebuilt or path.stat().st_mtime > mtime for path in node.inputs)
+
+
+def process_graph(
+    loaders: Iterable[DataLoader],
+    spec: SpatialSpec | None = None,
+    max_workers: int | None = None,
+) -> list[DataLoader]:
+    """Process loaders and their upstream loaders, running independent branches in parallel.
+
+    A product is (re)built when it is missing, when one of its inputs is rebuilt or when one of its inputs is
+    newer than the product. Products that are up to date are left untouched.
+
+    Parameters
+    ----------
+    loaders : iterable of DataLoader
+        Loaders to process. Their `inputs` are resolved recursively.
+    spec : SpatialSpec, optional
+        Spatial specification. Defaults to the spec in the config.
+    max_workers : int, optional
+        Number of loaders processed concurrently. Defaults to the ThreadPoolExecutor default.
+
+    Returns
+    -------
+    list of DataLoader
+        The loaders that were processed, in the order they finished.
+    """
+    spec = spec or get_config().spec
+    if spec is None:
+        raise ValueError('No spatial specification (spec) provided or present in config')
+
+    graph = resolve_graph(loaders, spec)
+    pending = dict(graph)
+    done: set[Path] = set()
+    rebuilt: list[Path] = []
+    running: dict[Future, Node] = {}
+
+    def submit_ready(executor: ThreadPoolExecutor) -> None:
+        # The graph is in topological order, so up-to-date nodes release their dependents within the same pass
+        for path, node in list(pending.items()):
+            if not all(upstream in done for upstream in node.inputs):
+                continue
+            del pending[path]
+            if not _is_outdated(node, spec, set(rebuilt)):
+                done.add(path)
+                continue
+            if node.path.exists() or node.path.is_symlink():
+                remove_path(node.path)
+            running[executor.submit(bind_config(node.loader.process), spec)] = node
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        submit_ready(executor)
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                node = running.pop(future)
+                future.result()
+                done.add(node.path)
+                rebuilt.append(node.path)
+            submit_ready(executor)
+
+    return [graph[path].loader for path in rebuilt]
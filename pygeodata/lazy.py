@@ -0,0 +1,28 @@
+import importlib
+from collections.abc import Callable
+from typing import Any
+
+
+def lazy_attributes(
+    module_name: str,
+    attributes: dict[str, str],
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Module-level ``__getattr__`` and ``__dir__`` (PEP 562) that import attributes on first access.
+
+    Parameters
+    ----------
+    module_name : str
+        Name of the module exposing the attributes, used in error messages.
+    attributes : dict
+        Mapping of attribute name to the module that defines it.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name not in attributes:
+            raise AttributeError(f'module {module_name!r} has no attribute {name!r}')
+        return getattr(importlib.import_module(attributes[name]), name)
+
+    def __dir__() -> list[str]:
+        return sorted(attributes)
+
+    return __getattr__, __dir__
@@ -1,10 +1,17 @@
 import re
+from collections.abc import Sequence
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from pygeodata.config import get_config
-from pygeodata.paths import generate_path
+from pygeodata.env import gdal_env
+from pygeodata.paths import generate_path, incomplete_marker_path
+from pygeodata.scratch import ephemeral_dir, lock_path
 from pygeodata.types import Driver, Processor, SpatialSpec
+from pygeodata.utils import file_lock, remove_path
+
+if TYPE_CHECKING:
+    from pygeodata.statistics import BandStatistics
 
 
 class DataLoader:
@@ -23,6 +30,17 @@ class DataLoader:
             raise AttributeError(f'Processor {processor} lacks default_driver and no driver is set')
         return getattr(processor, 'default_driver')
 
+    @property
+    def inputs(self) -> Sequence['DataLoader']:
+        """Upstream loaders whose products are read when processing this loader.
+
+        Defaults to the `inputs` of the processor, if any.
+        """
+        try:
+            return tuple(getattr(self.processor, 'inputs', ()))
+        except NotImplementedError:
+            return ()
+
     @property
     def class_name(self) -> str:
         return self.__class__.__name__.split('.')[-1].replace('Loader', '')
@@ -48,7 +66,7 @@ class DataLoader:
     def get_params(self) -> dict[str, Any]:
         params = {}
         for key in self.__dict__:
-            if key in ('name', 'class_name', 'processor', 'driver', 'process', 'load'):
+            if key in ('name', 'class_name', 'processor', 'driver', 'inputs', 'process', 'load'):
                 continue
             if key.startswith('_'):
                 continue
@@ -60,31 +78,103 @@ class DataLoader:
         parts = [f'{k}={v!r}' for k, v in sorted(params.items())]
         return f'{self.class_name}({", ".join(parts)})'
 
-    def get_processed_path(self, spec: SpatialSpec, ext: str | None = None) -> Path:
-        ext = ext or self.ext
-
-        path = generate_path(
+    def _generate_path(self, spec: SpatialSpec, base_dir: Path, ext: str | None = None) -> Path:
+        return generate_path(
             spec=spec,
             name=self.class_name,
             filename=self.name,
-            base_dir=get_config().path_data_processed,
-            ext=ext,
+            base_dir=base_dir,
+            ext=ext or self.ext,
             **self.get_params(),
         )
-        path.parent.mkdir(exist_ok=True, parents=True)
+
+    def get_processed_path(self, spec: SpatialSpec, ext: str | None = None, mkdir: bool = True) -> Path:
+        path = self._generate_path(spec, get_config().path_data_processed, ext)
+        if mkdir:
+            path.parent.mkdir(exist_ok=True, parents=True)
         return path
 
     def is_processed(self, spec: SpatialSpec) -> bool:
-        p = self.get_processed_path(spec)
-        return p.exists()
+        # Not created by checking, so that ephemeral loads leave no directories behind
+        p = self._generate_path(spec, get_config().path_data_processed)
+        return p.exists() and not incomplete_marker_path(p).exists()
 
     def process(self, spec: SpatialSpec) -> None:
-        self.processor(self.get_processed_path(spec), spec)
+        pyramid = get_config().pyramid
+        if pyramid is not None and spec in pyramid:
+            from pygeodata.pyramid import build_pyramid
+
+            build_pyramid(self, pyramid)
+            return
+
+        self._process(spec)
+
+    def _process(self, spec: SpatialSpec) -> None:
+        path = self.get_processed_path(spec)
+
+        # Processes building the same product take turns, so that none removes the marker of another
+        with file_lock(lock_path(path)):
+            if self.is_processed(spec):
+                return
+
+            # The marker outlives an interrupted run, so that a partially written product is never taken as done
+            marker = incomplete_marker_path(path)
+            if marker.exists() and (path.exists() or path.is_symlink()):
+                remove_path(path)
+            marker.touch()
+
+            with gdal_env():
+                self.processor(path, spec)
+
+            marker.unlink(missing_ok=True)
 
     def load(self, spec: SpatialSpec) -> Any:
-        return self.driver(self.get_processed_path(spec))
+        with gdal_env():
+            return self.driver(self.get_processed_path(spec))
+
+    def statistics(self, spec: SpatialSpec, scaled: bool = True) -> list['BandStatistics | None']:
+        """Statistics of the bands of the product, stored by the processor, see `read_statistics`.
+
+        The product is processed if needed, but none of its pixels are read.
+        """
+        from pygeodata.statistics import read_statistics
 
-    def __call__(self, spec: SpatialSpec) -> Any:
         if not self.is_processed(spec):
             self.process(spec)
+        return read_statistics(self.get_processed_path(spec), scaled)
+
+    def load_ephemeral(self, spec: SpatialSpec) -> Any:
+        """Process and load without keeping the product.
+
+        Processors with an `in_memory` attribute set to True write to a GDAL in-memory (/vsimem) file, others
+        to a temporary directory. The data is read into memory before the product is discarded, so the driver
+        result does not refer to the file.
+        """
+        processor = self.processor
+        in_memory = getattr(processor, 'in_memory', False)
+
+        with ephemeral_dir(in_memory) as base_dir, gdal_env():
+            path = self._generate_path(spec, base_dir)
+            if not in_memory:
+                path.parent.mkdir(parents=True)
+
+            try:
+                processor(path, spec)
+                data = self.driver(path)
+                if hasattr(data, 'load'):
+                    data = data.load()
+                if hasattr(data, 'close'):
+                    data.close()
+            finally:
+                if in_memory:
+                    remove_path(path, missing_ok=True)
+
+        return data
+
+    def __call__(self, spec: SpatialSpec) -> Any:
+        if self.is_processed(spec):
+            return self.load(spec)
+        if get_config().ephemeral:
+            return self.load_ephemeral(spec)
+        self.process(spec)
         return self.load(spec)
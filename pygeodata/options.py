@@ -1,6 +1,9 @@
-from dataclasses import asdict, dataclass
+import os
+from dataclasses import asdict, dataclass, field
 from typing import Any
 
+from pygeodata.utils import total_memory
+
 
 @dataclass
 class RasterCreationOptions:
@@ -43,3 +46,66 @@ class RasterCreationOptions:
 
     def to_dict(self) -> dict[str, Any]:
         return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+@dataclass
+class GDALOptions:
+    """GDAL configuration options, applied in a ``rasterio.Env`` around every processor and driver call.
+
+    Parameters
+    ----------
+    cachemax : int, optional
+        Size of the raster block cache in MB (GDAL_CACHEMAX)
+    num_threads : int | str, optional
+        Number of threads for compression and decompression, or 'ALL_CPUS' (GDAL_NUM_THREADS)
+    vsi_cache : bool, optional
+        Whether to cache reads of files opened through the virtual file system (VSI_CACHE)
+    vsi_cache_size : int, optional
+        Size of the VSI cache per file handle in bytes (VSI_CACHE_SIZE)
+    swath_size : int, optional
+        Size of the buffer used when copying rasters in bytes (GDAL_SWATH_SIZE)
+    disable_readdir_on_open : bool | str, optional
+        Whether to skip listing the directory of a file on opening, or 'EMPTY_DIR' (GDAL_DISABLE_READDIR_ON_OPEN)
+    extra : dict, optional
+        Any other GDAL configuration options, by their GDAL name
+    """
+
+    cachemax: int | None = None
+    num_threads: int | str | None = None
+    vsi_cache: bool | None = None
+    vsi_cache_size: int | None = None
+    swath_size: int | None = None
+    disable_readdir_on_open: bool | str | None = None
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def auto(cls, memory_fraction: float = 0.1, **kwargs: Any) -> 'GDALOptions':
+        """Preset sized from the memory and core count of the machine.
+
+        The block cache gets `memory_fraction` of the physical memory and compression uses all cores. Keyword
+        arguments override the preset.
+        """
+        memory = total_memory()
+        options = {
+            'num_threads': os.cpu_count() or 1,
+            'vsi_cache': True,
+            'vsi_cache_size': 128 * 2**20,
+            'disable_readdir_on_open': 'EMPTY_DIR',
+        }
+        if memory is not None:
+            options['cachemax'] = int(memory * memory_fraction / 2**20)
+            options['swath_size'] = min(int(memory * memory_fraction / 4), 2**30)
+        options.update(kwargs)
+        return cls(**options)
+
+    def to_dict(self) -> dict[str, Any]:
+        options = {
+            'GDAL_CACHEMAX': self.cachemax,
+            'GDAL_NUM_THREADS': self.num_threads,
+            'VSI_CACHE': self.vsi_cache,
+            'VSI_CACHE_SIZE': self.vsi_cache_size,
+            'GDAL_SWATH_SIZE': self.swath_size,
+            'GDAL_DISABLE_READDIR_ON_OPEN': self.disable_readdir_on_open,
+            **self.extra,
+        }
+        return {k: v for k, v in options.items() if v is not None}
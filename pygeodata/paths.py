@@ -31,3 +31,9 @@ def generate_path(
         *p,
         f'{filename}.{ext}',
     )
+
+
+def incomplete_marker_path(path: str | Path) -> Path:
+    """Marker that exists next to a product while it is being processed."""
+    path = Path(path)
+    return path.with_name(f'.{path.name}.incomplete')
@@ -0,0 +1,243 @@
+import heapq
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pygeodata.loader import DataLoader
+from pygeodata.types import Processor, SpatialSpec
+
+MB = 2**20
+
+# Assumed bytes per pixel of processors that do not estimate their cost
+DEFAULT_PIXEL_BYTES = 8
+
+
+@dataclass
+class Estimate:
+    """Estimated cost of processing a product.
+
+    Processors may provide it with an ``estimate(spec)`` method, which should only read headers.
+
+    Parameters
+    ----------
+    read_bytes : int
+        Bytes read from the sources
+    write_bytes : int
+        Bytes of the product, before compression
+    memory_bytes : int
+        Peak memory
+    """
+
+    read_bytes: int
+    write_bytes: int
+    memory_bytes: int
+
+
+@dataclass
+class Task:
+    """A loader and spec to process, with its product path and estimated cost."""
+
+    loader: DataLoader
+    spec: SpatialSpec
+    path: Path
+    processed: bool
+    pixels: int
+    estimate: Estimate
+
+    @property
+    def cost(self) -> int:
+        """Relative duration of the task, taken as the number of bytes it reads and writes."""
+        return self.estimate.read_bytes + self.estimate.write_bytes
+
+
+@dataclass
+class ScheduledTask:
+    """A task assigned to a worker, with its start and end in units of `Task.cost`."""
+
+    task: Task
+    worker: int
+    start: int
+    end: int
+
+
+@dataclass
+class Plan:
+    """Dry run of processing a batch of loaders and specs.
+
+    Parameters
+    ----------
+    tasks : list of Task
+        All tasks, including those that are already processed
+    schedule : list of ScheduledTask
+        The tasks to process, in the order they are started
+    workers : int
+        Number of workers the schedule is made for
+    memory_budget : int, optional
+        Memory budget in bytes the schedule is made for
+    """
+
+    tasks: list[Task]
+    schedule: list[ScheduledTask] = field(default_factory=list)
+    workers: int = 1
+    memory_budget: int | None = None
+
+    @property
+    def cached(self) -> list[Task]:
+        return [task for task in self.tasks if task.processed]
+
+    @property
+    def pending(self) -> list[Task]:
+        return [task for task in self.tasks if not task.processed]
+
+    @property
+    def over_budget(self) -> list[Task]:
+        """Tasks that need more memory than the budget on their own, and are scheduled to run alone."""
+        if self.memory_budget is None:
+            return []
+        return [task for task in self.pending if task.estimate.memory_bytes > self.memory_budget]
+
+    @property
+    def peak_memory(self) -> int:
+        """Largest estimated memory of the tasks running at the same time in the schedule."""
+        events = sorted(
+            [(s.start, s.task.estimate.memory_bytes) for s in self.schedule]
+            + [(s.end, -s.task.estimate.memory_bytes) for s in self.schedule],
+            # Ending before starting at the same time
+            key=lambda event: (event[0], event[1]),
+        )
+        peak = used = 0
+        for _, memory in events:
+            used += memory
+            peak = max(peak, used)
+        return peak
+
+    def worker_tasks(self, worker: int) -> list[Task]:
+        return [s.task for s in self.schedule if s.worker == worker]
+
+    def __str__(self) -> str:
+        pending = self.pending
+        lines = [
+            f'{len(self.tasks)} tasks: {len(self.cached)} processed, {len(pending)} to process',
+            f'Read {sum(t.estimate.read_bytes for t in pending) / MB:.0f} MB, '
+            f'write {sum(t.estimate.write_bytes for t in pending) / MB:.0f} MB, '
+            f'{sum(t.pixels for t in pending)} pixels',
+            f'Peak memory {self.peak_memory / MB:.0f} MB on {self.workers} workers'
+            + (f' (budget {self.memory_budget / MB:.0f} MB)' if self.memory_budget is not None else ''),
+        ]
+        for s in self.schedule:
+            lines.append(
+                f'  [{s.worker}] {s.task.loader} -> {s.task.path} '
+                f'(read {s.task.estimate.read_bytes / MB:.1f} MB, write {s.task.estimate.write_bytes / MB:.1f} MB, '
+                f'memory {s.task.estimate.memory_bytes / MB:.1f} MB)'
+            )
+        for task in self.over_budget:
+            lines.append(f'Over budget: {task.loader} needs {task.estimate.memory_bytes / MB:.0f} MB')
+        return '\n'.join(lines)
+
+
+def estimate_processor(processor: Processor, spec: SpatialSpec) -> Estimate:
+    """Estimate the cost of running `processor` for `spec` with its `estimate` method.
+
+    Processors without one are assumed to read nothing and to hold their product of `DEFAULT_PIXEL_BYTES` per
+    pixel in memory.
+    """
+    if hasattr(processor, 'estimate'):
+        return processor.estimate(spec)
+
+    write_bytes = spec.shape[0] * spec.shape[1] * DEFAULT_PIXEL_BYTES
+    return Estimate(read_bytes=0, write_bytes=write_bytes, memory_bytes=write_bytes)
+
+
+def estimate(loader: DataLoader, spec: SpatialSpec) -> Estimate:
+    """Estimate the cost of processing `loader` for `spec`, see `estimate_processor`."""
+    return estimate_processor(loader.processor, spec)
+
+
+def schedule_tasks(tasks: Iterable[Task], workers: int, memory_budget: int | None = None) -> list[ScheduledTask]:
+    """Schedule tasks on workers, largest first, without exceeding the memory budget.
+
+    Whenever a worker is free, it starts the largest waiting task that fits in the memory left by the running
+    tasks. A task that needs more than the whole budget is started once nothing else is running.
+    """
+    if workers < 1:
+        raise ValueError(f'Expected at least one worker, got {workers}')
+
+    waiting = sorted(tasks, key=lambda task: task.cost, reverse=True)
+    free_workers = list(range(workers))
+    running: list[tuple[int, int, int]] = []  # (end, worker, memory) heap
+    used = 0
+    time = 0
+    scheduled = []
+
+    while waiting:
+        for task in list(waiting):
+            if not free_workers:
+                break
+            memory = task.estimate.memory_bytes
+            fits = memory_budget is None or used + memory <= memory_budget
+            if not fits and running:
+                continue
+
+            worker = free_workers.pop(0)
+            end = time + max(task.cost, 1)
+            heapq.heappush(running, (end, worker, memory))
+            scheduled.append(ScheduledTask(task, worker, time, end))
+            waiting.remove(task)
+            used += memory
+
+        if waiting:
+            time, worker, memory = heapq.heappop(running)
+            free_workers.append(worker)
+            free_workers.sort()
+            used -= memory
+
+    return scheduled
+
+
+def plan(
+    pairs: Iterable[tuple[DataLoader, SpatialSpec]],
+    workers: int = 1,
+    memory_budget: int | None = None,
+) -> Plan:
+    """Plan processing pairs of loaders and specs without processing anything.
+
+    Resolves the product paths, checks which products are processed and estimates the cost of the others from
+    the headers of their sources. These are then scheduled on `workers`, largest first, such that the tasks
+    running at the same time fit in `memory_budget`.
+
+    Parameters
+    ----------
+    pairs : iterable of (DataLoader, SpatialSpec)
+        Loaders and the specs to process them for
+    workers : int, default=1
+        Number of workers
+    memory_budget : int, optional
+        Memory available to all workers together, in bytes
+
+    Returns
+    -------
+    Plan
+    """
+    tasks = []
+    seen = set()
+    for loader, spec in pairs:
+        # Planning leaves no directories behind
+        path = loader.get_processed_path(spec, mkdir=False)
+        if path in seen:
+            continue
+        seen.add(path)
+
+        processed = loader.is_processed(spec)
+        tasks.append(
+            Task(
+                loader=loader,
+                spec=spec,
+                path=path,
+                processed=processed,
+                pixels=spec.shape[0] * spec.shape[1],
+                estimate=Estimate(0, 0, 0) if processed else estimate(loader, spec),
+            )
+        )
+
+    schedule = schedule_tasks([task for task in tasks if not task.processed], workers, memory_budget)
+    return Plan(tasks, schedule, workers, memory_budget)
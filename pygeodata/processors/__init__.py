@@ -1,4 +1,25 @@
-from pygeodata.processors.rasterizer import Rasterizer
-from pygeodata.processors.reprojection import Reprojector
+from typing import TYPE_CHECKING
 
-__all__ = ['Rasterizer', 'Reprojector']
+from pygeodata.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from pygeodata.processors.geoparquet import VectorClipper
+    from pygeodata.processors.memmap import MemmapConverter
+    from pygeodata.processors.rasterizer import Rasterizer
+    from pygeodata.processors.reprojection import Reprojector
+    from pygeodata.processors.subdatasets import SubdatasetReprojector
+    from pygeodata.processors.zonal import ZonalStatistics
+
+__all__ = ['MemmapConverter', 'Rasterizer', 'Reprojector', 'SubdatasetReprojector', 'VectorClipper', 'ZonalStatistics']
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        'MemmapConverter': 'pygeodata.processors.memmap',
+        'Rasterizer': 'pygeodata.processors.rasterizer',
+        'Reprojector': 'pygeodata.processors.reprojection',
+        'SubdatasetReprojector': 'pygeodata.processors.subdatasets',
+        'VectorClipper': 'pygeodata.processors.geoparquet',
+        'ZonalStatistics': 'pygeodata.processors.zonal',
+    },
+)
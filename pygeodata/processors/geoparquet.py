@@ -0,0 +1,82 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from shapely.geometry import box
+
+from pygeodata.drivers.geoparquet import GeoParquetDriver
+from pygeodata.env import with_gdal_env
+from pygeodata.planning import Estimate
+from pygeodata.scratch import atomic_output
+from pygeodata.source_cache import cached_source
+from pygeodata.types import SpatialSpec
+from pygeodata.vector import read_vector
+
+
+@dataclass
+class VectorClipper:
+    """Clip a vector dataset to the bounds of a spec, reproject it and store it as GeoParquet.
+
+    Only the features within the bounds of `spec` are read, with `read_vector`, and reprojected to `spec.crs`.
+    The features are written in the order of the Hilbert curve through their centres, so that each row group
+    covers a compact area, with a bounding box column that `GeoParquetDriver` uses to skip row groups outside
+    of a bounding box.
+
+    Parameters
+    ----------
+    path : str | Path
+        Path to the vector dataset (e.g., shapefile, GeoPackage).
+    columns : sequence of str, optional
+        Attribute columns to keep. If None, keeps all columns. The feature ids are kept as index.
+    clip : bool, default=True
+        Whether to cut the geometries at the bounds of `spec`. Otherwise, the features intersecting the bounds
+        are kept whole.
+    row_group_size : int, default=65_536
+        Maximum number of features per row group.
+    read_kw : dict, optional
+        Additional keyword arguments passed to `read_vector`, e.g. the layer.
+    """
+
+    path: str | Path
+    columns: Sequence[str] | None = None
+    clip: bool = True
+    row_group_size: int = 65_536
+    read_kw: dict[str, Any] = field(default_factory=dict)
+
+    def estimate(self, spec: SpatialSpec) -> Estimate:
+        """Estimate the cost of clipping to `spec` from the size of the vector file."""
+        path = Path(self.path)
+        read_bytes = path.stat().st_size if path.is_file() else 0
+        # The features are held in memory, reprojected and clipped copies next to the ones read
+        return Estimate(read_bytes, read_bytes, 3 * read_bytes)
+
+    @with_gdal_env
+    def __call__(self, dst_path: str | Path, spec: SpatialSpec) -> None:
+        dst_path = Path(dst_path)
+        print(f'Clipping vector: {self.path} -> {dst_path}')
+
+        with cached_source(self.path) as path:
+            df = read_vector(path, spec, columns=self.columns, **self.read_kw)
+
+        # The bounding box filter of the reader works on the bounds of the features, in the source CRS, and keeps
+        # those that only touch the bounds
+        bounds = box(*spec.bounds)
+        df = df[df.intersects(bounds) & ~df.touches(bounds)]
+        if self.clip:
+            df = df.clip(bounds, keep_geom_type=True)
+
+        if len(df) > 0:
+            df = df.iloc[np.argsort(df.geometry.hilbert_distance(total_bounds=spec.bounds), kind='stable')]
+
+        with atomic_output(dst_path) as temp_path:
+            df.to_parquet(
+                temp_path,
+                write_covering_bbox=True,
+                schema_version='1.1.0',
+                row_group_size=self.row_group_size,
+            )
+
+    default_driver = GeoParquetDriver()
+    ext = 'parquet'
@@ -0,0 +1,97 @@
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import rasterio as rio
+from numpy.typing import DTypeLike
+
+from pygeodata.drivers.memmap import MemmapDriver, sidecar_path
+from pygeodata.env import with_gdal_env
+from pygeodata.planning import Estimate, estimate_processor
+from pygeodata.scratch import atomic_output
+from pygeodata.types import Processor, SpatialSpec
+from pygeodata.utils import remove_path
+
+
+@dataclass
+class MemmapConverter:
+    """Store the product of another processor as a raw, memory-mappable array.
+
+    The raster written by `processor` is converted in strips of rows to an uncompressed .npy file with
+    `np.lib.format.open_memmap`, whose data is aligned to 64 bytes, and a JSON sidecar with the CRS, transform,
+    nodata, scales and offsets. Load it with `MemmapDriver`, which maps the file instead of decoding it.
+
+    Parameters
+    ----------
+    processor : Processor
+        Processor writing a raster readable by rasterio, e.g. a `Reprojector`
+    dtype : DTypeLike, optional
+        Data type of the array. If None, uses the data type of the raster
+    strip_rows : int, optional
+        Number of rows converted at a time. By default, strips of about 64 MB are converted.
+    """
+
+    processor: Processor
+    dtype: DTypeLike | None = None
+    strip_rows: int | None = None
+
+    @property
+    def inputs(self) -> tuple:
+        return tuple(getattr(self.processor, 'inputs', ()))
+
+    def estimate(self, spec: SpatialSpec) -> Estimate:
+        """Estimate the cost of the processor and of converting its raster."""
+        inner = estimate_processor(self.processor, spec)
+        return Estimate(
+            read_bytes=inner.read_bytes + inner.write_bytes,
+            write_bytes=2 * inner.write_bytes,
+            memory_bytes=max(inner.memory_bytes, 64 * 2**20),
+        )
+
+    @with_gdal_env
+    def __call__(self, dst_path: str | Path, spec: SpatialSpec) -> None:
+        dst_path = Path(dst_path)
+
+        with atomic_output(dst_path) as temp_path:
+            src_path = temp_path.with_name(f'{temp_path.name}.{getattr(self.processor, "ext", "tif")}')
+            try:
+                self.processor(src_path, spec)
+                meta = self._convert(src_path, temp_path)
+            finally:
+                if src_path.exists():
+                    remove_path(src_path)
+
+            # Written before the array is published, so that a product never lacks its sidecar
+            sidecar = sidecar_path(dst_path)
+            temp_sidecar = sidecar.with_name(f'{sidecar.name}.tmp')
+            temp_sidecar.write_text(json.dumps(meta))
+            os.replace(temp_sidecar, sidecar)
+
+    def _convert(self, src_path: Path, dst_path: Path) -> dict:
+        print(f'Converting to memmap: {src_path} -> {dst_path}')
+
+        with rio.open(src_path) as src:
+            dtype = np.dtype(self.dtype if self.dtype is not None else src.dtypes[0])
+            data = np.lib.format.open_memmap(dst_path, mode='w+', dtype=dtype, shape=(src.count, *src.shape))
+
+            strip_rows = self.strip_rows or max(1, 64 * 2**20 // (src.count * src.width * dtype.itemsize))
+            for row in range(0, src.height, strip_rows):
+                rows = slice(row, min(row + strip_rows, src.height))
+                data[:, rows] = src.read(window=((rows.start, rows.stop), (0, src.width)), out_dtype=dtype)
+
+            data.flush()
+            del data
+
+            return {
+                'crs': src.crs.to_wkt() if src.crs is not None else None,
+                'transform': list(src.transform)[:6],
+                'nodata': src.nodata,
+                'scales': list(src.scales),
+                'offsets': list(src.offsets),
+                'descriptions': list(src.descriptions),
+            }
+
+    default_driver = MemmapDriver()
+    ext = 'npy'
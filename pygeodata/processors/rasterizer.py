@@ -1,77 +1,254 @@
-from collections.abc import Callable
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass, field
+from numbers import Number
 from pathlib import Path
 from typing import Any
 
 import geopandas as gpd
 import numpy as np
 import rasterio
+from affine import Affine
+from rasterio.enums import MergeAlg
 from rasterio.features import rasterize
+from shapely.geometry import box
 
+from pygeodata.aggregation import PointAccumulator, block_reduce
 from pygeodata.config import get_config
 from pygeodata.drivers import RioXArrayDriver
+from pygeodata.encoding import Encoding, ValueRange, choose_encoding
+from pygeodata.env import with_gdal_env
 from pygeodata.options import RasterCreationOptions
+from pygeodata.planning import Estimate
+from pygeodata.scratch import atomic_output
+from pygeodata.source_cache import cached_source
+from pygeodata.statistics import StatisticsAccumulator, write_statistics
 from pygeodata.types import SpatialSpec
+from pygeodata.vector import iter_vector, read_vector
+
+COVERAGE_MODES = ('fraction', 'mean', 'sum')
+
+# Bytes of the supersampled grid of a block in coverage mode, with the masks and intermediates of the reduction
+COVERAGE_BLOCK_BYTES = 64 * 2**20
+
+
+def _shared_nodata(fill_values: Sequence[float | None]) -> float | None:
+    """Nodata value of bands with the given fill values: the common value, NaN if they differ or None."""
+    if all(fill_value is None for fill_value in fill_values):
+        return None
+    first = fill_values[0]
+    if first is not None and all(
+        fill_value is not None and (fill_value == first or np.isnan(fill_value) and np.isnan(first))
+        for fill_value in fill_values
+    ):
+        return first
+    return np.nan
+
+
+def _free_nodata(ranges: Sequence[ValueRange], dtype: np.dtype) -> tuple[np.dtype, float]:
+    """Data type and nodata value outside of the value ranges of the bands, promoting integers if needed."""
+    if np.issubdtype(dtype, np.floating):
+        return dtype, np.nan
+
+    info = np.iinfo(dtype)
+    vmin = min((r.min for r in ranges if r.min is not None), default=0)
+    vmax = max((r.max for r in ranges if r.max is not None), default=0)
+    if vmax < info.max:
+        return dtype, vmax + 1
+    if vmin > info.min:
+        return dtype, vmin - 1
+    return np.dtype(np.float64), np.nan
 
 
 @dataclass
 class Rasterizer:
     """
-    Rasterize a vector dataset to a single-band raster.
+    Rasterize a vector dataset to a raster with one band per column.
 
     Parameters
     ----------
     path : Path
         Path to the vector dataset (e.g., shapefile, GeoPackage).
-    column : str
-        Name of the column to use as raster values (must be numeric).
+    column : str or sequence of str
+        Name of the column to use as raster values (must be numeric). If a sequence of columns is given, the
+        vector data is loaded once and each column is burned into its own band.
     load_df_func : Callable[[str | Path, SpatialSpec], gpd.GeoDataFrame], optional
-        Function to load the vector data. By default, reads with geopandas and reprojects to `spec.crs`.
+        Function to load the vector data. By default, reads only the columns of the features within the bounds
+        of `spec` with `read_vector` and reprojects them to `spec.crs`. The 'index' column holds the feature ids.
     all_touched : bool, default=True
         Whether to burn all pixels touched by geometries.
-    dtype : np.dtype, optional
-        Data type for raster. Defaults to the dtype of `column`.
-    fill_value : float, optional
-        Nodata value for raster. Defaults to `_NODATA_DTYPE_MAP` based on dtype.
+    dtype : np.dtype or sequence of np.dtype, optional
+        Data type for raster, or one per column. Defaults to the dtype of each column. Bands are burned in their
+        own data type and stored in the smallest data type that holds all of them.
+    fill_value : float or sequence of float, optional
+        Nodata value for raster, or one per column. Defaults to NaN for floating point and 0 for integer data.
+        As GeoTIFF stores one nodata value for all bands, different fill values are replaced by one that is not
+        in the data: NaN for floating point data, or the value above the largest value for integer data.
     rasterize_kw : dict, optional
         Additional keyword arguments passed to `rasterio.features.rasterize`.
     raster_creation_options : RasterCreationOptions, optional
         Optional raster creation profile (compression, tiling, etc.).
+    point_statistic : str, optional
+        Aggregate point data instead of burning geometries: one of 'count', 'sum', 'mean', 'min' or 'max' of the
+        values of the points in each pixel. Pixel indices are computed directly from the point coordinates and
+        the points are streamed in chunks. Defaults to uint32 for 'count', float64 for 'mean' and int64 or float64
+        for 'sum', depending on whether the column holds integers.
+    chunk_size : int, default=1_000_000
+        Number of points aggregated at a time in point mode.
+    downcast : bool, default=False
+        Whether to store the raster in the smallest data type that holds its values losslessly, using NBITS for
+        unsigned integers. The fill values become the nodata value.
+    quantize : float, optional
+        Maximum absolute error for storing floating point bands as integers with a scale and offset, which
+        `RioXArrayDriver` applies when masking and scaling. Implies `downcast`.
+    statistics : bool, default=True
+        Whether to compute the minimum, maximum, mean, standard deviation and valid percentage of each band while
+        writing, stored as GDAL ``STATISTICS_*`` metadata. Read them with `read_statistics`.
+    histogram_bins : sequence of float, optional
+        Bin edges of a histogram of each band, computed and stored along with the statistics.
+    coverage : str, optional
+        Burn the area of the pixels covered by polygons instead of whole pixels: 'fraction' of each pixel covered
+        by any feature, 'mean' of the values of the features covering it weighted by the area each covers, or
+        'sum' of the values weighted by the fraction of the pixel each feature covers. Overlapping features all
+        count. Pixels that are not covered are 0, or `fill_value` for 'mean'. The data type defaults to float64
+        and must be floating point for 'fraction' and 'mean'.
+    supersample : int, default=10
+        In coverage mode, each pixel is split in `supersample` by `supersample` cells, which count as covered
+        when their centre is. The grid is rasterized in blocks of rows, so that the supersampled grid of the
+        whole spec is never held in memory.
     """
 
     path: Path
-    column: str = 'index'
-    load_df_func: Callable[[str | Path, SpatialSpec], gpd.GeoDataFrame] = field(
-        default_factory=lambda: lambda path, spec: gpd.read_file(path).to_crs(spec.crs).reset_index(),
-    )
+    column: str | Sequence[str] = 'index'
+    load_df_func: Callable[[str | Path, SpatialSpec], gpd.GeoDataFrame] | None = None
     all_touched: bool = True
-    dtype: np.dtype | None = None
-    fill_value: float | None = None
+    dtype: np.dtype | Sequence[np.dtype] | None = None
+    fill_value: float | Sequence[float] | None = None
     rasterize_kw: dict[str, Any] = field(default_factory=dict)
     raster_creation_options: RasterCreationOptions | None = None
+    point_statistic: str | None = None
+    chunk_size: int = 1_000_000
+    downcast: bool = False
+    quantize: float | None = None
+    statistics: bool = True
+    histogram_bins: Sequence[float] | None = None
+    coverage: str | None = None
+    supersample: int = 10
 
-    def __call__(self, dst_path: str | Path, spec: SpatialSpec) -> None:
-        df = self.load_df_func(self.path, spec)
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return (self.column,) if isinstance(self.column, str) else tuple(self.column)
 
-        if df.crs != spec.crs:
-            raise ValueError(f'GeoDataFrame CRS ({df.crs}) does not match target spec CRS ({spec.crs}).')
+    def _per_band(self, value: Any, name: str) -> tuple[Any, ...]:
+        count = len(self.columns)
+        if value is None or isinstance(value, (str, Number, np.dtype, type)):
+            return (value,) * count
+        if len(value) != count:
+            raise ValueError(f'Expected {count} values for {name}, one per column, got {len(value)}.')
+        return tuple(value)
+
+    def _load_df(self, spec: SpatialSpec) -> gpd.GeoDataFrame:
+        with cached_source(self.path) as path:
+            if self.load_df_func is not None:
+                return self.load_df_func(path, spec)
+
+            columns = [column for column in self.columns if column != 'index']
+            return read_vector(path, spec, columns=columns).rename_axis('index').reset_index()
+
+    def _iter_point_chunks(self, spec: SpatialSpec) -> Iterator[gpd.GeoDataFrame]:
+        with cached_source(self.path) as path:
+            if self.load_df_func is not None:
+                df = self.load_df_func(path, spec)
+                for start in range(0, len(df), self.chunk_size):
+                    yield df.iloc[start : start + self.chunk_size]
+                return
+
+            columns = [] if self.point_statistic == 'count' else [c for c in self.columns if c != 'index']
+            for df in iter_vector(path, spec, columns=columns, batch_size=self.chunk_size):
+                if len(df) > 0:
+                    yield df.rename_axis('index').reset_index()
+
+    def _aggregate_points(self, spec: SpatialSpec) -> list[tuple[np.ndarray, float]]:
+        accumulators = [PointAccumulator(spec.shape, self.point_statistic) for _ in self.columns]
+        column_dtypes = {}
+        inverse = ~spec.transform
 
-        if self.column not in df.columns:
-            raise ValueError(f"Column '{self.column}' not found in GeoDataFrame.")
+        for df in self._iter_point_chunks(spec):
+            if df.crs != spec.crs:
+                raise ValueError(f'GeoDataFrame CRS ({df.crs}) does not match target spec CRS ({spec.crs}).')
 
-        dtype = self.dtype if self.dtype is not None else df[self.column].dtype
+            if not (df.geom_type == 'Point').all():
+                raise TypeError('Point aggregation requires Point geometries.')
+
+            cols, rows = inverse * (df.geometry.x.to_numpy(), df.geometry.y.to_numpy())
+            rows = np.floor(rows).astype(np.int64)
+            cols = np.floor(cols).astype(np.int64)
+
+            for column, accumulator in zip(self.columns, accumulators):
+                if self.point_statistic == 'count':
+                    accumulator.add(rows, cols)
+                    continue
+                if column not in df.columns:
+                    raise ValueError(f"Column '{column}' not found in GeoDataFrame.")
+                column_dtypes[column] = df[column].dtype
+                accumulator.add(rows, cols, df[column].to_numpy())
+
+        bands = []
+        for column, accumulator, dtype, fill_value in zip(
+            self.columns,
+            accumulators,
+            self._per_band(self.dtype, 'dtype'),
+            self._per_band(self.fill_value, 'fill_value'),
+        ):
+            if dtype is None:
+                if self.point_statistic == 'count':
+                    dtype = np.uint32
+                elif self.point_statistic == 'mean':
+                    dtype = np.float64
+                elif self.point_statistic == 'sum':
+                    # Sums of many small integers overflow the data type of the column
+                    column_dtype = column_dtypes.get(column, np.float64)
+                    dtype = np.int64 if np.issubdtype(column_dtype, np.integer) else np.float64
+                else:
+                    dtype = column_dtypes.get(column, np.float64)
+            dtype = np.dtype(dtype)
+
+            if not np.issubdtype(dtype, np.number):
+                raise TypeError(f"Column '{column}' must be numeric, got {dtype}.")
+
+            if fill_value is None:
+                fill_value = np.nan if np.issubdtype(dtype, np.floating) else 0
+
+            raster = accumulator.result(fill_value)
+            if np.issubdtype(dtype, np.integer) and not np.issubdtype(raster.dtype, np.integer):
+                raster = np.rint(raster)
+            bands.append((raster.astype(dtype), fill_value))
+
+        return bands
+
+    def _burn(
+        self,
+        df: gpd.GeoDataFrame,
+        column: str,
+        dtype: np.dtype | None,
+        fill_value: float | None,
+        spec: SpatialSpec,
+    ) -> tuple[np.ndarray, float]:
+        if column not in df.columns:
+            raise ValueError(f"Column '{column}' not found in GeoDataFrame.")
+
+        dtype = dtype if dtype is not None else df[column].dtype
 
         if not np.issubdtype(dtype, np.number):
-            raise TypeError(f"Column '{self.column}' must be numeric, got {dtype}.")
+            raise TypeError(f"Column '{column}' must be numeric, got {dtype}.")
 
         default_fill_value = np.nan if np.issubdtype(dtype, np.floating) else 0
-        fill_value = self.fill_value if self.fill_value is not None else default_fill_value
+        fill_value = fill_value if fill_value is not None else default_fill_value
 
-        if fill_value in df[self.column]:
+        if fill_value in df[column]:
             raise ValueError(f'Fill value {fill_value} is present in the data. Overwrite with a different value.')
 
         raster = rasterize(
-            ((row.geometry, row[self.column]) for i, row in df.iterrows()),
+            zip(df.geometry, df[column]),
             out_shape=spec.shape,
             transform=spec.transform,
             fill=fill_value,
@@ -79,22 +256,203 @@ class Rasterizer:
             dtype=dtype,
             **self.rasterize_kw,
         )
+        return raster, fill_value
+
+    def _coverage_block(
+        self,
+        df: gpd.GeoDataFrame,
+        values: np.ndarray,
+        transform: Affine,
+        shape: tuple[int, int],
+        fill_value: float,
+    ) -> np.ndarray:
+        """Coverage of the pixels of a block, rasterizing the features on a supersampled grid."""
+        s = self.supersample
+        sub_shape = (shape[0] * s, shape[1] * s)
+        sub_transform = transform * Affine.scale(1 / s)
+
+        everywhere = np.ones(sub_shape, dtype=bool)
+
+        if self.coverage == 'fraction':
+            covered = rasterize(
+                ((geometry, 1) for geometry in df.geometry),
+                out_shape=sub_shape,
+                transform=sub_transform,
+                fill=0,
+                dtype='uint8',
+            ).astype(bool)
+            return block_reduce(covered, everywhere, (s, s), 'mean', 0)
+
+        # Overlapping features add up, each weighted by the number of cells it covers
+        burned = rasterize(
+            zip(df.geometry, values),
+            out_shape=sub_shape,
+            transform=sub_transform,
+            fill=0,
+            dtype='float64',
+            merge_alg=MergeAlg.add,
+        )
+        total = block_reduce(burned, everywhere, (s, s), 'sum', 0)
+        if self.coverage == 'sum':
+            return total / s**2
+
+        counts = rasterize(
+            ((geometry, 1) for geometry in df.geometry),
+            out_shape=sub_shape,
+            transform=sub_transform,
+            fill=0,
+            dtype='uint16',
+            merge_alg=MergeAlg.add,
+        )
+        count = block_reduce(counts, everywhere, (s, s), 'sum', 0)
+        return np.where(count > 0, total / np.maximum(count, 1), fill_value)
+
+    def _rasterize_coverage(self, spec: SpatialSpec) -> list[tuple[np.ndarray, float | None]]:
+        if self.coverage not in COVERAGE_MODES:
+            raise ValueError(f'Unknown coverage mode: {self.coverage}. Use one of {COVERAGE_MODES}')
+
+        df = self._load_df(spec)
+
+        if df.crs != spec.crs:
+            raise ValueError(f'GeoDataFrame CRS ({df.crs}) does not match target spec CRS ({spec.crs}).')
+
+        height, width = spec.shape
+        block_rows = max(1, COVERAGE_BLOCK_BYTES // (width * self.supersample**2 * 24))
+
+        bands = []
+        for column, dtype, fill_value in zip(
+            self.columns,
+            self._per_band(self.dtype, 'dtype'),
+            self._per_band(self.fill_value, 'fill_value'),
+        ):
+            if column not in df.columns:
+                raise ValueError(f"Column '{column}' not found in GeoDataFrame.")
+
+            dtype = np.dtype(dtype if dtype is not None else np.float64)
+            if self.coverage in ('fraction', 'mean') and not np.issubdtype(dtype, np.floating):
+                raise TypeError(f"Coverage mode '{self.coverage}' requires a floating point dtype, got {dtype}.")
+            if fill_value is None:
+                fill_value = np.nan if np.issubdtype(dtype, np.floating) else 0
+
+            raster = np.full(spec.shape, fill_value if self.coverage == 'mean' else 0, dtype=np.float64)
+            values = df[column].to_numpy(dtype=np.float64)
+
+            for row in range(0, height, block_rows):
+                shape = (min(block_rows, height - row), width)
+                transform = spec.transform * Affine.translation(0, row)
+                (x0, x1), (y0, y1) = zip(transform * (0, 0), transform * (shape[1], shape[0]))
+                features = df.sindex.query(box(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)))
+                if len(features) == 0:
+                    continue
+
+                raster[row : row + shape[0]] = self._coverage_block(
+                    df.iloc[features], values[features], transform, shape, fill_value
+                )
+
+            if np.issubdtype(dtype, np.integer):
+                raster = np.rint(raster)
+            # Uncovered pixels have a fraction or sum of 0, which is data
+            bands.append((raster.astype(dtype), fill_value if self.coverage == 'mean' else None))
+
+        return bands
+
+    def _burn_geometries(self, spec: SpatialSpec) -> list[tuple[np.ndarray, float]]:
+        df = self._load_df(spec)
+
+        if df.crs != spec.crs:
+            raise ValueError(f'GeoDataFrame CRS ({df.crs}) does not match target spec CRS ({spec.crs}).')
+
+        return [
+            self._burn(df, column, dtype, fill_value, spec)
+            for column, dtype, fill_value in zip(
+                self.columns,
+                self._per_band(self.dtype, 'dtype'),
+                self._per_band(self.fill_value, 'fill_value'),
+            )
+        ]
+
+    def estimate(self, spec: SpatialSpec) -> Estimate:
+        """Estimate the cost of rasterizing to `spec` from the size of the vector file."""
+        path = Path(self.path)
+        read_bytes = path.stat().st_size if path.is_file() else 0
+        pixels = spec.shape[0] * spec.shape[1]
+        dtypes = self._per_band(self.dtype, 'dtype')
+        itemsizes = [np.dtype(dtype).itemsize if dtype is not None else 8 for dtype in dtypes]
+        write_bytes = pixels * max(itemsizes) * len(itemsizes)
+        # All bands and, in point mode, the accumulators are held in memory next to the vector data
+        return Estimate(read_bytes, write_bytes, 2 * pixels * 8 * len(itemsizes) + read_bytes)
+
+    @with_gdal_env
+    def __call__(self, dst_path: str | Path, spec: SpatialSpec) -> None:
+        if self.point_statistic is not None and self.coverage is not None:
+            raise ValueError('Point aggregation and coverage mode cannot be combined.')
+
+        if self.point_statistic is not None:
+            bands = self._aggregate_points(spec)
+        elif self.coverage is not None:
+            bands = self._rasterize_coverage(spec)
+        else:
+            bands = self._burn_geometries(spec)
+
+        rasters = [raster for raster, _ in bands]
+        fill_values = [fill_value for _, fill_value in bands]
+        dtype = np.result_type(*rasters)
+        nodata = _shared_nodata(fill_values)
+        profile = {}
+
+        encoding = None
+        if self.downcast or self.quantize is not None or (nodata is not None and np.isnan(nodata)):
+            ranges = [ValueRange() for _ in bands]
+            for value_range, (raster, fill_value) in zip(ranges, bands):
+                value_range.add(raster, fill_value)
+
+            if self.downcast or self.quantize is not None:
+                encoding = choose_encoding(ranges, dtype, nodata, self.quantize)
+                print(f'Encoding: {encoding}')
+            else:
+                # GeoTIFF has one nodata value for all bands, so different fill values are mapped to a free one
+                encoding = Encoding(*_free_nodata(ranges, dtype))
+            dtype = encoding.dtype
+            if encoding.nodata is not None:
+                profile['nodata'] = encoding.nodata
+            if encoding.nbits is not None:
+                profile['nbits'] = encoding.nbits
+        elif nodata is not None:
+            profile['nodata'] = nodata
 
         raster_creation_options = self.raster_creation_options or get_config().raster_creation_options
 
-        with rasterio.open(
-            dst_path,
+        with atomic_output(dst_path) as temp_path, rasterio.open(
+            temp_path,
             'w',
             driver='GTiff',
             height=spec.shape[0],
             width=spec.shape[1],
-            count=1,
+            count=len(bands),
             dtype=dtype,
             crs=spec.crs,
             transform=spec.transform,
+            **profile,
             **raster_creation_options.to_dict(),
         ) as dst:
-            dst.write(raster, 1)
+            stats = StatisticsAccumulator(len(bands), self.histogram_bins) if self.statistics else None
+            for i, (column, (raster, fill_value)) in enumerate(zip(self.columns, bands), start=1):
+                if encoding is not None:
+                    raster = encoding.encode(raster, fill_value, band=i - 1)
+                raster = raster.astype(dtype, copy=False)
+                dst.write(raster, i)
+                dst.set_band_description(i, column)
+                if stats is not None:
+                    stats.add_band(i - 1, raster, dst.nodata)
+
+            if encoding is not None and encoding.scales is not None:
+                dst.scales = encoding.scales
+                dst.offsets = encoding.offsets
+
+            if stats is not None:
+                write_statistics(dst, stats.result())
 
     default_driver = RioXArrayDriver()
     ext = 'tif'
+    # Written with GDAL only, so ephemeral products can stay in memory
+    in_memory = True
@@ -1,22 +1,68 @@
-import shutil
-import tempfile
+import math
 from collections.abc import Sequence
 from dataclasses import dataclass, field
 from numbers import Number
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import numpy as np
 import rasterio as rio
 import rasterio.warp
+from affine import Affine
 from numpy.typing import DTypeLike
 from rasterio import CRS, RasterioIOError
 from rasterio.enums import Resampling
+from rasterio.errors import CRSError
+from rasterio.windows import Window
 
+from pygeodata.aggregation import aggregation_factors, block_reduce, read_padded
 from pygeodata.config import get_config
 from pygeodata.drivers import RioXArrayDriver
+from pygeodata.encoding import Encoding, ValueRange, choose_encoding
+from pygeodata.env import with_gdal_env
 from pygeodata.options import RasterCreationOptions
+from pygeodata.planning import Estimate
+from pygeodata.scratch import Checkpoint, atomic_output
+from pygeodata.source_cache import cached_source, source_identity
+from pygeodata.statistics import StatisticsAccumulator, write_statistics
+from pygeodata.tuning import auto_warp_settings, source_window, source_window_bytes
 from pygeodata.types import SpatialSpec
+from pygeodata.utils import transform_to_str
+
+AGGREGATION_RESAMPLING = {
+    Resampling.average: 'mean',
+    Resampling.sum: 'sum',
+    Resampling.mode: 'mode',
+    Resampling.min: 'min',
+    Resampling.max: 'max',
+}
+
+# Resampling methods whose results lie within the range of the source values
+RANGE_PRESERVING_RESAMPLING = {
+    Resampling.nearest,
+    Resampling.bilinear,
+    Resampling.average,
+    Resampling.gauss,
+    Resampling.mode,
+    Resampling.min,
+    Resampling.max,
+    Resampling.med,
+    Resampling.q1,
+    Resampling.q3,
+}
+
+# Resampling methods that pick one of the source values
+SELECTING_RESAMPLING = {Resampling.nearest, Resampling.mode, Resampling.min, Resampling.max}
+
+# Radius in source pixels of the kernels of the GDAL warper beyond the destination pixel, when not downsampling.
+# Methods summarizing the footprint of a destination pixel also count the source pixels it partially covers.
+KERNEL_RADIUS = {
+    Resampling.nearest: 0,
+    Resampling.bilinear: 1,
+    Resampling.cubic: 2,
+    Resampling.cubic_spline: 2,
+    Resampling.lanczos: 3,
+}
 
 
 @dataclass
@@ -41,12 +87,36 @@ class Reprojector:
         Number of bits per pixel
     warp_kw : dict, optional
         Additional keyword arguments for rasterio.warp.reproject
+    warp_mem_limit : int or 'auto', optional
+        Warp memory limit in MB. 'auto' sizes it from the destination and source window and the available
+        memory. If None, uses the config value
+    num_threads : int or 'auto', optional
+        Number of warp threads. 'auto' chooses it from the size of the destination. If None, uses the config
+        value
     scales : float or sequence of floats, optional
         Scale factor for each band
     offsets : float or sequence of floats, optional
         Offset for each band
     raster_creation_options : RasterCreationOptions, optional
         GeoTIFF creation profile options. If None, uses defaults
+    aggregate : bool, default=True
+        Whether to bypass the GDAL warper when the target grid shares the source CRS and each target pixel
+        covers an exact block of source pixels. The blocks are then reduced directly with NumPy, which is
+        much faster and exact for the 'average', 'sum', 'mode', 'min' and 'max' resampling methods. Identical
+        grids are copied for every resampling method.
+    downcast : bool, default=False
+        Whether to store the output in the smallest data type that holds its values losslessly, using NBITS for
+        unsigned integers. The values are bounded by those of the source within the bounds of the spec and the
+        reach of the resampling kernel around them, which are read once more to find them. Only applies to
+        resampling methods that stay within the source values.
+    quantize : float, optional
+        Maximum absolute error for storing floating point output as integers with a scale and offset, which
+        `RioXArrayDriver` applies when masking and scaling. Implies `downcast`.
+    statistics : bool, default=True
+        Whether to compute the minimum, maximum, mean, standard deviation and valid percentage of each band while
+        writing, stored as GDAL ``STATISTICS_*`` metadata. Read them with `read_statistics`.
+    histogram_bins : sequence of float, optional
+        Bin edges of a histogram of each band, computed and stored along with the statistics.
     """
 
     src_path: str | Path
@@ -57,20 +127,186 @@ class Reprojector:
     dst_nodata: float | None = None
     nbits: int | None = None
     warp_kw: dict[str, Any] = field(default_factory=dict)
-    warp_mem_limit: int | None = None
-    num_threads: int | None = None
+    warp_mem_limit: int | Literal['auto'] | None = None
+    num_threads: int | Literal['auto'] | None = None
     scales: float | Sequence[float] | None = None
     offsets: float | Sequence[float] | None = None
     raster_creation_options: RasterCreationOptions | None = None
+    aggregate: bool = True
+    downcast: bool = False
+    quantize: float | None = None
+    statistics: bool = True
+    histogram_bins: Sequence[float] | None = None
 
     def __post_init__(self):
         if self.dst_dtype == np.bool_:
             self.dst_dtype = 'uint8'
             self.nbits = 1
 
+    def _aggregation(self, src_crs: CRS, src_transform: Affine, spec: SpatialSpec) -> tuple[int, int, int, int] | None:
+        """Aggregation factors and offsets of the fast path, or None if the GDAL warper is needed."""
+        if not self.aggregate or self.warp_kw:
+            return None
+
+        if CRS.from_user_input(spec.crs) != src_crs:
+            return None
+
+        aggregation = aggregation_factors(src_transform, spec.transform)
+        if aggregation is None:
+            return None
+
+        if aggregation[:2] != (1, 1) and self.resampling not in AGGREGATION_RESAMPLING:
+            return None
+
+        return aggregation
+
+    def _aggregate_window(
+        self,
+        src: rio.DatasetReader,
+        window: Window,
+        src_bands: tuple[int, ...],
+        aggregation: tuple[int, int, int, int],
+        src_nodata: float | None,
+        fill: float,
+    ) -> np.ndarray:
+        """Aggregate the blocks of source pixels covering a window of the destination."""
+        fy, fx, row_off, col_off = aggregation
+        # Reducing single pixel blocks is a copy, for which 'min' preserves the dtype
+        method = AGGREGATION_RESAMPLING.get(self.resampling, 'min') if (fy, fx) != (1, 1) else 'min'
+
+        data, valid = read_padded(
+            src,
+            src_bands,
+            row_off=row_off + window.row_off * fy,
+            col_off=col_off + window.col_off * fx,
+            height=window.height * fy,
+            width=window.width * fx,
+            nodata=src_nodata,
+        )
+        return block_reduce(data, valid, (fy, fx), method, fill)
+
+    def _kernel_window(self, src: rio.DatasetReader, src_crs: CRS, spec: SpatialSpec) -> Window:
+        """Window of the source pixels that the resampling kernels can read for the destination pixels of `spec`."""
+        try:
+            window = source_window(src, src_crs, spec)
+        except (ValueError, CRSError):
+            return Window(0, 0, src.width, src.height)
+
+        # Kernels are stretched over the footprint of a destination pixel when downsampling
+        ratio = max(1.0, window.width / spec.shape[1], window.height / spec.shape[0])
+        pad = math.ceil(KERNEL_RADIUS.get(self.resampling, 1) * ratio)
+        col_start, row_start = max(0, window.col_off - pad), max(0, window.row_off - pad)
+        col_stop = min(src.width, window.col_off + window.width + pad)
+        row_stop = min(src.height, window.row_off + window.height + pad)
+        return Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+
+    def _encoding(
+        self,
+        src: rio.DatasetReader,
+        src_crs: CRS,
+        spec: SpatialSpec,
+        src_bands: tuple[int, ...],
+        src_nodata: float | None,
+        dst_dtype: np.dtype,
+        dst_nodata: float | None,
+    ) -> Encoding | None:
+        """Most compact encoding of the destination, from the source values within the bounds of `spec`."""
+        if not self.downcast and self.quantize is None:
+            return None
+
+        if self.resampling not in RANGE_PRESERVING_RESAMPLING:
+            print(f'Not downcasting: {self.resampling.name} resampling can exceed the source values')
+            return None
+
+        window = self._kernel_window(src, src_crs, spec)
+
+        ranges = [ValueRange() for _ in src_bands]
+        row_bytes = max(1, window.width * len(src_bands) * np.dtype(src.dtypes[0]).itemsize)
+        strip_rows = max(1, 64 * 2**20 // row_bytes)
+        for row in range(window.row_off, window.row_off + window.height, strip_rows):
+            height = min(strip_rows, window.row_off + window.height - row)
+            data = src.read(src_bands, window=Window(window.col_off, row, window.width, height))
+            for value_range, band in zip(ranges, data):
+                value_range.add(band, src_nodata)
+
+        for value_range in ranges:
+            if value_range.min is not None and np.issubdtype(dst_dtype, np.integer):
+                value_range.min, value_range.max = np.floor(value_range.min), np.ceil(value_range.max)
+                value_range.integral = True
+            elif self.resampling not in SELECTING_RESAMPLING:
+                value_range.integral = value_range.float32_exact = False
+
+            if dst_nodata is None:
+                # Pixels outside the source are filled with zeros
+                value_range.add(np.zeros(1, dtype=dst_dtype), None)
+
+        return choose_encoding(ranges, dst_dtype, dst_nodata, self.quantize)
+
+    def _bands(self, src: rio.DatasetReader) -> tuple[int, ...]:
+        src_bands = src.indexes if self.bands is None else self.bands
+        if isinstance(src_bands, Number):
+            src_bands = (src_bands,)
+        return tuple(src_bands)
+
+    def _warp_settings(
+        self,
+        src: rio.DatasetReader,
+        src_crs: CRS,
+        spec: SpatialSpec,
+        count: int,
+        dst_dtype: np.dtype,
+        verbose: bool = False,
+    ) -> tuple[int, int]:
+        """Warp memory limit and number of threads, resolving 'auto' and the config defaults."""
+        warp_mem_limit = self.warp_mem_limit if self.warp_mem_limit is not None else get_config().warp_mem_limit
+        num_threads = self.num_threads if self.num_threads is not None else get_config().num_threads
+
+        if 'auto' in (warp_mem_limit, num_threads):
+            settings = auto_warp_settings(src, src_crs, spec, count, dst_dtype)
+            if verbose:
+                print(f'Auto warp settings: {settings}')
+            if warp_mem_limit == 'auto':
+                warp_mem_limit = settings.warp_mem_limit
+            if num_threads == 'auto':
+                num_threads = settings.num_threads
+
+        return warp_mem_limit, num_threads
+
+    def estimate(self, spec: SpatialSpec) -> Estimate:
+        """Estimate the cost of reprojecting to `spec` from the header of the source."""
+        with rio.open(self.src_path) as src:
+            src_crs = src.crs if src.crs is not None else self.src_crs
+            count = len(self._bands(src))
+            dst_dtype = np.dtype(src.dtypes[0] if self.dst_dtype is None else self.dst_dtype)
+
+            try:
+                read_bytes = source_window_bytes(src, src_crs, spec, count)
+            except (ValueError, CRSError):
+                read_bytes = src.width * src.height * count * np.dtype(src.dtypes[0]).itemsize
+
+            warp_mem_limit, _ = self._warp_settings(src, src_crs, spec, count, dst_dtype)
+
+        write_bytes = spec.shape[0] * spec.shape[1] * count * dst_dtype.itemsize
+        # A strip of the destination of about the warp memory limit, and the buffers of the warper
+        warp_bytes = (warp_mem_limit or 64) * 2**20
+        return Estimate(read_bytes, write_bytes, min(write_bytes, warp_bytes) + warp_bytes)
+
+    @staticmethod
+    def _windows(height: int, width: int, block_rows: int, row_bytes: int, warp_mem_limit: int) -> list[Window]:
+        """Strips of destination rows of about `warp_mem_limit` MB, aligned to the blocks of the destination."""
+        strip_rows = max(1, (warp_mem_limit or 64) * 2**20 // row_bytes)
+        if strip_rows > block_rows:
+            strip_rows -= strip_rows % block_rows
+        return [Window(0, row, width, min(strip_rows, height - row)) for row in range(0, height, strip_rows)]
+
+    @with_gdal_env
     def __call__(self, dst_path: str | Path, spec: SpatialSpec) -> None:
         """Reproject raster to specified spatial configuration.
 
+        The destination is written in strips of rows to a scratch file, which is moved to `dst_path` when
+        complete. Written strips are checkpointed, so that a run that is interrupted continues where it
+        stopped when it is restarted with the same settings.
+
         Parameters
         ----------
         dst_path : str | Path
@@ -85,64 +321,115 @@ class Reprojector:
 
         print(f'Reprojecting: {self.src_path} -> {dst_path}')
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            temp_path = Path(tmpdir) / f'~{"_".join(dst_path.parts[1:])}'
+        with (
+            atomic_output(dst_path, resumable=True) as temp_path,
+            cached_source(self.src_path) as src_path,
+            rio.open(src_path) as src,
+        ):
+            if len(src.subdatasets) > 1:
+                sub_str = '\n'.join(src.subdatasets)
+                raise RasterioIOError(
+                    f'Cannot reproject multi-variable dataset: {self.src_path}\nSubdatasets:\n{sub_str}',
+                )
 
-            with rio.open(self.src_path) as src:
-                if len(src.subdatasets) > 1:
-                    sub_str = '\n'.join(src.subdatasets)
-                    raise RasterioIOError(
-                        f'Cannot reproject multi-variable dataset: {self.src_path}\nSubdatasets:\n{sub_str}',
-                    )
+            src_crs = src.crs if src.crs is not None else self.src_crs
+
+            if src_crs is None:
+                raise ValueError(f'Cannot determine CRS for {self.src_path}. Provide src_crs parameter.')
+
+            src_dtype = src.dtypes[0]
+            src_transform = src.transform
+
+            src_nodata = src.nodata
+            if src_nodata is None and np.issubdtype(src_dtype, np.floating):
+                src_nodata = np.nan
 
-                src_crs = src.crs if src.crs is not None else self.src_crs
+            src_bands = self._bands(src)
+            count = len(src_bands)
 
-                if src_crs is None:
-                    raise ValueError(f'Cannot determine CRS for {self.src_path}. Provide src_crs parameter.')
+            dst_dtype = src_dtype if self.dst_dtype is None else self.dst_dtype
+            dst_nodata = src_nodata if self.dst_nodata is None else self.dst_nodata
 
-                src_dtype = src.dtypes[0]
-                src_transform = src.transform
+            raster_creation_options = self.raster_creation_options or get_config().raster_creation_options
 
-                src_nodata = src.nodata
-                if src_nodata is None and np.issubdtype(src_dtype, np.floating):
-                    src_nodata = np.nan
+            rio_profile = {
+                'driver': 'GTiff',
+                'height': spec.shape[0],
+                'width': spec.shape[1],
+                'dtype': dst_dtype,
+                'nodata': dst_nodata,
+                'count': count,
+                'crs': spec.crs,
+                'transform': spec.transform,
+                **raster_creation_options.to_dict(),
+            }
 
-                src_bands = src.indexes if self.bands is None else self.bands
-                if isinstance(src_bands, Number):
-                    src_bands = (src_bands,)
-                count = len(src_bands)
+            dst_dtype = np.dtype(dst_dtype)
+            encoding = self._encoding(src, src_crs, spec, src_bands, src_nodata, dst_dtype, dst_nodata)
+            if encoding is not None:
+                print(f'Encoding: {encoding}')
+                rio_profile.update(dtype=encoding.dtype, nodata=encoding.nodata)
+                if encoding.nbits is not None:
+                    rio_profile['nbits'] = encoding.nbits
 
-                dst_dtype = src_dtype if self.dst_dtype is None else self.dst_dtype
-                dst_nodata = src_nodata if self.dst_nodata is None else self.dst_nodata
+            if self.nbits is not None:
+                rio_profile['nbits'] = self.nbits
 
-                raster_creation_options = self.raster_creation_options or get_config().raster_creation_options
+            warp_mem_limit, num_threads = self._warp_settings(src, src_crs, spec, count, dst_dtype, verbose=True)
 
-                rio_profile = {
-                    'driver': 'GTiff',
-                    'height': spec.shape[0],
-                    'width': spec.shape[1],
-                    'dtype': dst_dtype,
-                    'nodata': dst_nodata,
-                    'count': count,
-                    'crs': spec.crs,
-                    'transform': spec.transform,
-                    **raster_creation_options.to_dict(),
-                }
+            aggregation = self._aggregation(src_crs, src_transform, spec)
 
-                if self.nbits is not None:
-                    rio_profile['nbits'] = self.nbits
+            # Rows of a source that changed since they were written, or of a file created with other options, must
+            # not be mixed with new ones. The windows may differ between runs, as the rows are checkpointed.
+            key = (
+                f'{self!r} {transform_to_str(spec.transform)} {spec.shape} {spec.crs.to_wkt()} '
+                f'{raster_creation_options.to_dict()} {source_identity(self.src_path)}'
+            )
+            checkpoint = Checkpoint(temp_path, key=key)
+            if checkpoint.resume():
+                print(f'Resuming: {checkpoint.rows} rows already written to {temp_path}')
+            else:
+                # Sparse, so that the blocks are only written once, when their window is processed
+                with rio.open(temp_path, 'w', **{'sparse_ok': True, **rio_profile}):
+                    pass
 
-                warp_mem_limit = self.warp_mem_limit if self.warp_mem_limit is not None else get_config().warp_mem_limit
-                num_threads = self.num_threads if self.num_threads is not None else get_config().num_threads
+            with rio.open(temp_path) as dst:
+                block_rows = dst.block_shapes[0][0]
 
-                with rio.open(temp_path, 'w', **rio_profile) as dst:
+            fill = dst_nodata if dst_nodata is not None else 0
+            if aggregation is not None:
+                # Source bytes per destination row, with headroom for the masks and intermediates of the reduction
+                fy, fx = aggregation[:2]
+                row_bytes = count * fy * spec.shape[1] * fx * (np.dtype(src_dtype).itemsize + 24)
+            else:
+                row_bytes = 2 * count * spec.shape[1] * dst_dtype.itemsize
+
+            windows = self._windows(spec.shape[0], spec.shape[1], block_rows, row_bytes, warp_mem_limit)
+
+            stats = StatisticsAccumulator(count, self.histogram_bins) if self.statistics else None
+
+            for window in windows:
+                rows = (window.row_off, window.row_off + window.height)
+                if rows in checkpoint:
+                    if stats is not None:
+                        with rio.open(temp_path) as dst:
+                            stats.add(dst.read(window=window), rio_profile['nodata'])
+                    continue
+
+                if aggregation is not None:
+                    data = self._aggregate_window(src, window, src_bands, aggregation, src_nodata, fill)
+                    if np.issubdtype(dst_dtype, np.integer) and not np.issubdtype(data.dtype, np.integer):
+                        data = np.rint(data)
+                    data = data.astype(dst_dtype)
+                else:
+                    data = np.full((count, window.height, window.width), fill, dtype=dst_dtype)
                     rasterio.warp.reproject(
                         source=rio.band(src, src_bands),
-                        destination=rio.band(dst, dst.indexes),
+                        destination=data,
                         src_crs=src_crs,
                         dst_crs=spec.crs,
                         src_transform=src_transform,
-                        dst_transform=spec.transform,
+                        dst_transform=rio.windows.transform(window, spec.transform),
                         src_nodata=src_nodata,
                         dst_nodata=dst_nodata,
                         resampling=self.resampling,
@@ -151,18 +438,46 @@ class Reprojector:
                         **self.warp_kw,
                     )
 
-                    scales = self.scales if self.scales is not None else tuple(src.scales[i - 1] for i in src_bands)
-                    offsets = self.offsets if self.offsets is not None else tuple(src.offsets[i - 1] for i in src_bands)
+                if encoding is not None:
+                    data = encoding.encode(data, dst_nodata)
+
+                if stats is not None:
+                    stats.add(data, rio_profile['nodata'])
+
+                # Reopened per window, so that the window is on disk before it is checkpointed
+                with rio.open(temp_path, 'r+') as dst:
+                    dst.write(data, window=window)
+                checkpoint.add(*rows)
+
+            with rio.open(temp_path, 'r+') as dst:
+                scales = self.scales if self.scales is not None else tuple(src.scales[i - 1] for i in src_bands)
+                offsets = self.offsets if self.offsets is not None else tuple(src.offsets[i - 1] for i in src_bands)
+
+                if scales is not None:
+                    scales = scales if isinstance(scales, Sequence) else [scales] * dst.count
+
+                if offsets is not None:
+                    offsets = offsets if isinstance(offsets, Sequence) else [offsets] * dst.count
+
+                if encoding is not None and encoding.scales is not None:
+                    # Quantized values are decoded before the scales and offsets of the source are applied
+                    scales = scales if scales is not None else [1.0] * dst.count
+                    offsets = offsets if offsets is not None else [0.0] * dst.count
+                    offsets = [o + s * enc_o for s, o, enc_o in zip(scales, offsets, encoding.offsets)]
+                    scales = [s * enc_s for s, enc_s in zip(scales, encoding.scales)]
+
+                if scales is not None:
+                    dst._set_all_scales(scales)
 
-                    if scales is not None:
-                        scales = scales if isinstance(scales, Sequence) else [scales] * dst.count
-                        dst._set_all_scales(scales)
+                if offsets is not None:
+                    dst._set_all_offsets(offsets)
 
-                    if offsets is not None:
-                        offsets = offsets if isinstance(offsets, Sequence) else [offsets] * dst.count
-                        dst._set_all_offsets(offsets)
+                if stats is not None:
+                    write_statistics(dst, stats.result())
 
-            shutil.move(temp_path, dst_path)
+            checkpoint.remove()
 
     default_driver = RioXArrayDriver()
     ext = 'tif'
+    # Written with GDAL only, so ephemeral products can stay in memory
+    in_memory = True
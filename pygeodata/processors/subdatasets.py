@@ -0,0 +1,129 @@
+import os
+import re
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import rasterio as rio
+
+from pygeodata.config import bind_config
+from pygeodata.drivers.dataset import DatasetDriver
+from pygeodata.env import with_gdal_env
+from pygeodata.planning import Estimate
+from pygeodata.processors.reprojection import Reprojector
+from pygeodata.scratch import atomic_output
+from pygeodata.source_cache import cached_source
+from pygeodata.types import SpatialSpec
+from pygeodata.utils import remove_path
+
+
+def subdataset_variable(subdataset: str) -> str:
+    """Variable name of a GDAL subdataset, e.g. 'primf' for 'netcdf:/data/luh2.nc:primf'."""
+    return re.sub(r'[^\w\-]', '_', subdataset.rsplit(':', 1)[-1].strip('/'))
+
+
+@dataclass
+class SubdatasetReprojector:
+    """Reproject the subdatasets of a multi-variable source, such as NetCDF or HDF, in parallel.
+
+    Each variable is reprojected by a `Reprojector` to a GeoTIFF named after the variable, in a directory that
+    forms the product. With `combine`, the variables are instead written to a single Zarr store. Load either with
+    `DatasetDriver`, which returns a lazy `xr.Dataset`.
+
+    Parameters
+    ----------
+    src_path : str | Path
+        Path to the source with subdatasets
+    variables : sequence of str, optional
+        Variables to reproject. If None, reprojects all subdatasets
+    reprojector_kw : dict, optional
+        Additional keyword arguments for the `Reprojector` of each variable, e.g. the resampling method
+    combine : bool, default=False
+        Whether to combine the variables in a Zarr store instead of a directory of GeoTIFFs. The variables then
+        need the same number of bands.
+    max_workers : int, optional
+        Number of variables reprojected concurrently. Defaults to the ThreadPoolExecutor default.
+    """
+
+    src_path: str | Path
+    variables: Sequence[str] | None = None
+    reprojector_kw: dict[str, Any] = field(default_factory=dict)
+    combine: bool = False
+    max_workers: int | None = None
+
+    @property
+    def ext(self) -> str:
+        return 'zarr' if self.combine else 'dir'
+
+    def _subdatasets(self, src_path: str | Path | None = None) -> dict[str, str]:
+        with rio.open(src_path or self.src_path) as src:
+            subdatasets = {subdataset_variable(subdataset): subdataset for subdataset in src.subdatasets}
+
+        if not subdatasets:
+            raise ValueError(f'No subdatasets found in {self.src_path}. Use Reprojector instead.')
+
+        if self.variables is None:
+            return subdatasets
+
+        missing = set(self.variables) - set(subdatasets)
+        if missing:
+            raise ValueError(f'Variables {sorted(missing)} not found in {self.src_path}. Found: {list(subdatasets)}')
+        return {variable: subdatasets[variable] for variable in self.variables}
+
+    def estimate(self, spec: SpatialSpec) -> Estimate:
+        """Estimate the cost of reprojecting the variables, of which `max_workers` run at the same time."""
+        estimates = [
+            Reprojector(subdataset, **self.reprojector_kw).estimate(spec) for subdataset in self._subdatasets().values()
+        ]
+        # The ThreadPoolExecutor default
+        workers = self.max_workers or min(32, (os.cpu_count() or 1) + 4)
+        memory = sorted((e.memory_bytes for e in estimates), reverse=True)[:workers]
+        return Estimate(
+            read_bytes=sum(e.read_bytes for e in estimates),
+            write_bytes=sum(e.write_bytes for e in estimates) * (2 if self.combine else 1),
+            memory_bytes=sum(memory),
+        )
+
+    def _reproject(self, dst_dir: Path, spec: SpatialSpec) -> None:
+        # Subdataset names refer to the container, so the container itself is read through the source cache
+        with cached_source(self.src_path) as src_path:
+            self._reproject_subdatasets(self._subdatasets(src_path), dst_dir, spec)
+
+    def _reproject_subdatasets(self, subdatasets: dict[str, str], dst_dir: Path, spec: SpatialSpec) -> None:
+        dst_dir.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = []
+            for variable, subdataset in subdatasets.items():
+                path = dst_dir / f'{variable}.tif'
+                # Variables of an interrupted run are complete once they exist
+                if path.exists():
+                    continue
+                reprojector = Reprojector(subdataset, **self.reprojector_kw)
+                futures.append(executor.submit(bind_config(reprojector), path, spec))
+
+            for future in futures:
+                future.result()
+
+    @with_gdal_env
+    def __call__(self, dst_path: str | Path, spec: SpatialSpec) -> None:
+        dst_path = Path(dst_path)
+
+        with atomic_output(dst_path, resumable=True) as temp_path:
+            if not self.combine:
+                self._reproject(temp_path, spec)
+                return
+
+            variables_dir = temp_path.with_name(f'{temp_path.name}.variables')
+            self._reproject(variables_dir, spec)
+
+            ds = DatasetDriver(mask_and_scale=False)(variables_dir)
+            if temp_path.exists():
+                remove_path(temp_path)
+            ds.to_zarr(temp_path, mode='w')
+            ds.close()
+            remove_path(variables_dir)
+
+    default_driver = DatasetDriver()
@@ -0,0 +1,128 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import rasterio as rio
+
+from pygeodata.aggregation import valid_mask
+from pygeodata.base import process
+from pygeodata.drivers import ParquetDriver
+from pygeodata.env import with_gdal_env
+from pygeodata.loader import DataLoader
+from pygeodata.scratch import atomic_output
+from pygeodata.types import SpatialSpec
+
+
+@dataclass
+class ZonalStatistics:
+    """Compute statistics of a value raster for each zone of a zone raster on the same grid.
+
+    Both rasters are streamed in strips of rows. Per zone, the count, sum, mean, minimum and maximum of the
+    valid values, and optionally a histogram, are accumulated with vectorized bincounts. The result is written
+    as a DataFrame indexed by zone.
+
+    Parameters
+    ----------
+    zones : DataLoader | str | Path
+        Raster with integer zone ids, e.g. the product of a `Rasterizer`. Loaders are processed for the spec
+        first. Pixels with the nodata value of the raster are not part of any zone.
+    values : DataLoader | str | Path
+        Raster with the values, e.g. the product of a `Reprojector`, on the same grid as `zones`.
+    zone_nodata : int, optional
+        Zone id of the pixels outside of any zone. Defaults to the nodata value of `zones`, which `Rasterizer`
+        products record as their fill value. Only needed for zone rasters without a nodata value.
+    zone_band : int, default=1
+        Band of `zones` holding the zone ids.
+    value_band : int, default=1
+        Band of `values` to summarize.
+    bins : sequence of float, optional
+        Histogram bin edges. If given, the histogram counts are added as columns 'hist_0', 'hist_1', etc.
+        Values outside the edges are not counted.
+    strip_rows : int, optional
+        Number of rows read at a time. By default, strips of about 64 MB of values are read.
+    """
+
+    zones: DataLoader | str | Path
+    values: DataLoader | str | Path
+    zone_nodata: int | None = None
+    zone_band: int = 1
+    value_band: int = 1
+    bins: Sequence[float] | None = None
+    strip_rows: int | None = None
+
+    @property
+    def inputs(self) -> tuple[DataLoader, ...]:
+        return tuple(source for source in (self.zones, self.values) if isinstance(source, DataLoader))
+
+    @staticmethod
+    def _resolve(source: DataLoader | str | Path, spec: SpatialSpec) -> Path:
+        if isinstance(source, DataLoader):
+            process(source, spec)
+            return source.get_processed_path(spec)
+        return Path(source)
+
+    def _strip_statistics(self, zones: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+        ids, inverse = np.unique(zones, return_inverse=True)
+        n = len(ids)
+
+        stats = {
+            'count': np.bincount(inverse, minlength=n),
+            'sum': np.bincount(inverse, weights=values, minlength=n),
+            'min': np.full(n, np.inf),
+            'max': np.full(n, -np.inf),
+        }
+        np.minimum.at(stats['min'], inverse, values)
+        np.maximum.at(stats['max'], inverse, values)
+
+        if self.bins is not None:
+            edges = np.asarray(self.bins, dtype=np.float64)
+            nbins = len(edges) - 1
+            bin_idx = np.digitize(values, edges) - 1
+            # Values equal to the last edge fall in the last bin, as in np.histogram
+            bin_idx[values == edges[-1]] = nbins - 1
+            inside = (bin_idx >= 0) & (bin_idx < nbins)
+            hist = np.bincount(inverse[inside] * nbins + bin_idx[inside], minlength=n * nbins).reshape(n, nbins)
+            for i in range(nbins):
+                stats[f'hist_{i}'] = hist[:, i]
+
+        return pd.DataFrame(stats, index=pd.Index(ids, name='zone'))
+
+    @with_gdal_env
+    def __call__(self, dst_path: str | Path, spec: SpatialSpec) -> None:
+        zones_path = self._resolve(self.zones, spec)
+        values_path = self._resolve(self.values, spec)
+
+        partials = []
+
+        with rio.open(zones_path) as zones_src, rio.open(values_path) as values_src:
+            if zones_src.shape != values_src.shape or zones_src.transform != values_src.transform:
+                raise ValueError(f'Zones ({zones_path}) and values ({values_path}) are not on the same grid.')
+
+            if not np.issubdtype(zones_src.dtypes[self.zone_band - 1], np.integer):
+                raise TypeError(f'Zones must be integers, got {zones_src.dtypes[self.zone_band - 1]}.')
+
+            zone_nodata = self.zone_nodata if self.zone_nodata is not None else zones_src.nodata
+            height, width = zones_src.shape
+            strip_rows = self.strip_rows or max(1, 64 * 2**20 // (width * 8))
+
+            for row in range(0, height, strip_rows):
+                window = ((row, min(row + strip_rows, height)), (0, width))
+                zones = zones_src.read(self.zone_band, window=window)
+                values = values_src.read(self.value_band, window=window).astype(np.float64)
+
+                valid = valid_mask(zones, zone_nodata) & valid_mask(values, values_src.nodata)
+                partials.append(self._strip_statistics(zones[valid], values[valid]))
+
+        df = pd.concat(partials)
+        aggregation = {column: 'sum' for column in df.columns}
+        aggregation.update({'min': 'min', 'max': 'max'})
+        df = df.groupby(level='zone').agg(aggregation)
+
+        df.insert(2, 'mean', df['sum'] / df['count'])
+        with atomic_output(dst_path) as temp_path:
+            df.to_parquet(temp_path)
+
+    default_driver = ParquetDriver()
+    ext = 'parquet'
@@ -0,0 +1,178 @@
+import math
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+import rasterio as rio
+from affine import Affine
+from rasterio.enums import Resampling
+
+from pygeodata.aggregation import AGGREGATION_METHODS, aggregation_factors, block_reduce, read_padded
+from pygeodata.scratch import atomic_output
+from pygeodata.statistics import StatisticsAccumulator, write_statistics
+from pygeodata.types import SpatialSpec
+
+if TYPE_CHECKING:
+    from pygeodata.loader import DataLoader
+
+# Bytes of the base level read at a time, with the masks and intermediates of the reductions
+STRIP_BYTES = 256 * 2**20
+
+
+@dataclass
+class Pyramid:
+    """Specs of one region at a base resolution and at coarser, integer multiples of it.
+
+    With ``set_config(pyramid=...)``, processing a loader for any level builds all levels: the base level with the
+    processor of the loader and the coarser levels by aggregating the base level in one pass. Each level is stored
+    as the regular product of its spec, so the loader serves all of them without further processing.
+
+    Parameters
+    ----------
+    base : SpatialSpec
+        The finest level
+    factors : sequence of int
+        Aggregation factors of the coarser levels relative to `base`. Levels that do not cover the base level with
+        a whole number of pixels extend beyond it, the extra pixels being nodata.
+    method : str, optional
+        Aggregation method, one of 'mean', 'sum', 'mode', 'min' or 'max'. If None, follows the resampling of the
+        processor: 'mean' for ``Resampling.average``, 'mode' for ``Resampling.nearest`` and ``Resampling.mode``,
+        etc. Required for processors without a matching resampling method.
+    """
+
+    base: SpatialSpec
+    factors: tuple[int, ...]
+    method: str | None = None
+
+    def __post_init__(self):
+        self.factors = tuple(sorted({int(f) for f in self.factors} - {1}))
+        if any(f < 1 for f in self.factors):
+            raise ValueError(f'Aggregation factors must be positive integers, got {self.factors}')
+        if self.method is not None and self.method not in AGGREGATION_METHODS:
+            raise ValueError(f'Unknown aggregation method: {self.method}. Use one of {AGGREGATION_METHODS}')
+
+    def level(self, factor: int) -> SpatialSpec:
+        """Spec of the level aggregating `factor` by `factor` pixels of the base level."""
+        height, width = self.base.shape
+        return SpatialSpec(
+            crs=self.base.crs,
+            transform=self.base.transform * Affine.scale(factor),
+            shape=(math.ceil(height / factor), math.ceil(width / factor)),
+        )
+
+    @property
+    def levels(self) -> list[SpatialSpec]:
+        """Specs of all levels, finest first."""
+        return [self.base] + [self.level(f) for f in self.factors]
+
+    def factor(self, spec: SpatialSpec) -> int | None:
+        """Factor of the level matching `spec`, or None if `spec` is not part of the pyramid."""
+        if spec.crs != self.base.crs:
+            return None
+        aggregation = aggregation_factors(self.base.transform, spec.transform)
+        if aggregation is None or aggregation[2:] != (0, 0) or aggregation[0] != aggregation[1]:
+            return None
+        factor = aggregation[0]
+        if factor != 1 and factor not in self.factors:
+            return None
+        if spec.shape != self.level(factor).shape:
+            return None
+        return factor
+
+    def __contains__(self, spec: SpatialSpec) -> bool:
+        return self.factor(spec) is not None
+
+
+def _method(pyramid: Pyramid, loader: 'DataLoader') -> str:
+    if pyramid.method is not None:
+        return pyramid.method
+
+    from pygeodata.processors.reprojection import AGGREGATION_RESAMPLING
+
+    resampling = getattr(loader.processor, 'resampling', None)
+    if resampling == Resampling.nearest:
+        # Nearest values are picked from the source, so categories must stay categories
+        return 'mode'
+    if resampling not in AGGREGATION_RESAMPLING:
+        raise ValueError(
+            f'{loader}: No aggregation method matches the processor {type(loader.processor).__name__}'
+            f"{f' with {resampling.name} resampling' if resampling is not None else ''}. Set Pyramid.method."
+        )
+    return AGGREGATION_RESAMPLING[resampling]
+
+
+def build_pyramid(loader: 'DataLoader', pyramid: Pyramid) -> list[SpatialSpec]:
+    """Process the levels of `pyramid` for `loader` that are not processed yet.
+
+    The base level is processed as usual and must be a raster readable by rasterio. The coarser levels are then
+    aggregated from it in strips of rows, writing all levels at once, such that the base level is read only once.
+
+    Returns
+    -------
+    list of SpatialSpec
+        The levels that were processed
+    """
+    built = []
+    if not loader.is_processed(pyramid.base):
+        loader._process(pyramid.base)
+        built.append(pyramid.base)
+
+    factors = [f for f in pyramid.factors if not loader.is_processed(pyramid.level(f))]
+    if not factors:
+        return built
+
+    method = _method(pyramid, loader)
+    base_path = loader.get_processed_path(pyramid.base)
+    print(f'Aggregating pyramid levels {factors} with {method}: {base_path}')
+
+    with rio.open(base_path) as src, ExitStack() as stack:
+        bands = tuple(range(1, src.count + 1))
+        dtype = np.dtype(src.dtypes[0])
+        fill = src.nodata if src.nodata is not None else 0
+
+        dsts = {}
+        for factor in factors:
+            spec = pyramid.level(factor)
+            temp_path = stack.enter_context(atomic_output(loader.get_processed_path(spec)))
+            profile = {**src.profile, 'height': spec.shape[0], 'width': spec.shape[1], 'transform': spec.transform}
+            dst = stack.enter_context(rio.open(temp_path, 'w', **profile))
+            dst._set_all_scales(src.scales)
+            dst._set_all_offsets(src.offsets)
+            for band, description in enumerate(src.descriptions, start=1):
+                if description is not None:
+                    dst.set_band_description(band, description)
+            dsts[factor] = dst
+
+        # Statistics follow the settings of the processor of the base level
+        stats = {}
+        if getattr(loader.processor, 'statistics', True):
+            bin_edges = getattr(loader.processor, 'histogram_bins', None)
+            stats = {factor: StatisticsAccumulator(src.count, bin_edges) for factor in factors}
+
+        # Strips span a whole number of blocks of every level, the width being padded accordingly
+        step = math.lcm(*factors)
+        width = math.ceil(src.width / step) * step
+        row_bytes = src.count * width * (dtype.itemsize + 24)
+        strip_rows = step * max(1, STRIP_BYTES // (row_bytes * step))
+
+        for row in range(0, src.height, strip_rows):
+            height = min(strip_rows, math.ceil((src.height - row) / step) * step)
+            data, valid = read_padded(src, bands, row, 0, height, width, src.nodata)
+
+            for factor, dst in dsts.items():
+                result = block_reduce(data, valid, (factor, factor), method, fill)
+                if np.issubdtype(dtype, np.integer) and not np.issubdtype(result.dtype, np.integer):
+                    result = np.rint(result)
+
+                rows = min(height // factor, dst.height - row // factor)
+                window = ((row // factor, row // factor + rows), (0, dst.width))
+                result = result[:, :rows, : dst.width].astype(dtype)
+                dst.write(result, window=window)
+                if factor in stats:
+                    stats[factor].add(result, src.nodata)
+
+        for factor, accumulator in stats.items():
+            write_statistics(dsts[factor], accumulator.result())
+
+    return built + [pyramid.level(f) for f in factors]
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from pygeodata.config import get_config
+from pygeodata.utils import is_vsimem, remove_path
+
+
+def scratch_dir(dst_path: Path) -> Path:
+    """Directory for the scratch output of `dst_path`, following the `scratch_dir` config option."""
+    option = get_config().scratch_dir
+    if option is None:
+        return Path(tempfile.gettempdir()) / 'pygeodata'
+    if option == 'sibling':
+        return dst_path.parent / '.scratch'
+    return Path(option)
+
+
+def scratch_path(dst_path: str | Path) -> Path:
+    """Deterministic scratch location of `dst_path`, so that an interrupted run can find its partial output."""
+    dst_path = Path(dst_path).absolute()
+    # Hashed, as the flattened directory structure can exceed the maximum file name length
+    digest = hashlib.sha1(str(dst_path).encode()).hexdigest()[:16]
+    return scratch_dir(dst_path) / f'~{digest}_{dst_path.name}'
+
+
+def lock_path(dst_path: str | Path) -> Path:
+    """Lock file held while `dst_path` is processed, next to its scratch output to keep product directories clean.
+
+    Processes only wait for each other if they share the scratch directory, see the `scratch_dir` config option.
+    """
+    path = scratch_path(dst_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.with_name(f'{path.name}.lock')
+
+
+@contextmanager
+def atomic_output(dst_path: str | Path, resumable: bool = False) -> Iterator[Path]:
+    """Write to a scratch path that is moved to `dst_path` once the block completes.
+
+    The move is an atomic rename when the scratch directory is on the same filesystem as `dst_path`, see the
+    `scratch_dir` config option, and a copy otherwise.
+
+    `dst_path` therefore only exists once it is complete. If the block raises, the scratch output and its
+    `Checkpoint` are removed, unless `resumable` is set and the run is interrupted (KeyboardInterrupt or
+    SystemExit), in which case they are left for the next run to continue from. Other errors would likely recur
+    when resuming, so their partial output is not kept.
+
+    GDAL in-memory (/vsimem) files are written in place, as they are never seen half-written by other processes.
+    """
+    dst_path = Path(dst_path)
+    if is_vsimem(dst_path):
+        try:
+            yield dst_path
+        except BaseException as e:
+            if not (resumable and isinstance(e, (KeyboardInterrupt, SystemExit))):
+                remove_path(dst_path)
+            raise
+        return
+
+    scratch = scratch_path(dst_path)
+    scratch.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        yield scratch
+    except BaseException as e:
+        if not (resumable and isinstance(e, (KeyboardInterrupt, SystemExit))):
+            if scratch.exists() or scratch.is_symlink():
+                remove_path(scratch)
+            checkpoint_record_path(scratch).unlink(missing_ok=True)
+        raise
+
+    shutil.move(scratch, dst_path)
+
+
+def checkpoint_record_path(path: str | Path) -> Path:
+    """Record of the `Checkpoint` of the partial output at `path`."""
+    path = Path(path)
+    return path.with_name(f'{path.name}.checkpoint.json')
+
+
+@contextmanager
+def ephemeral_dir(in_memory: bool) -> Iterator[Path]:
+    """Directory for products that are discarded after use.
+
+    With `in_memory` this is a unique GDAL in-memory (/vsimem) directory, which only GDAL can write to. Files
+    written to it must be removed by the caller. Otherwise a temporary directory is created and removed on exit.
+    """
+    if in_memory:
+        yield Path('/vsimem/pygeodata') / uuid.uuid4().hex
+        return
+
+    with tempfile.TemporaryDirectory(prefix='pygeodata-') as path:
+        yield Path(path)
+
+
+class Checkpoint:
+    """Record of the rows of a partial output that have been written.
+
+    The record is stored next to the partial output and tied to a `key` describing how the output is made, so
+    that a partial output of different settings is never continued. Rows rather than window indices are
+    recorded, so that a run splitting the output into other windows, e.g. with another memory limit, still
+    continues correctly. GDAL in-memory (/vsimem) outputs do not survive the process, so their rows are only
+    tracked in memory.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the partial output.
+    key : str
+        Description of the processor and spec producing the output.
+    """
+
+    def __init__(self, path: str | Path, key: str):
+        self.path = Path(path)
+        self.record_path = checkpoint_record_path(self.path)
+        self.key = key
+        # Sorted, disjoint ``(start, stop)`` ranges of written rows
+        self.done: list[tuple[int, int]] = []
+        self.persistent = not is_vsimem(self.path)
+
+    def resume(self) -> bool:
+        """Load the rows written by a previous run. Returns False if there is nothing to resume."""
+        if not self.persistent or not self.path.exists() or not self.record_path.exists():
+            return False
+
+        try:
+            record = json.loads(self.record_path.read_text())
+        except (OSError, ValueError):
+            return False
+
+        if record.get('key') != self.key:
+            return False
+
+        self.done = [tuple(rows) for rows in record['done']]
+        return True
+
+    @property
+    def rows(self) -> int:
+        """Number of rows written."""
+        return sum(stop - start for start, stop in self.done)
+
+    def __contains__(self, rows: tuple[int, int]) -> bool:
+        """Whether all rows from ``start`` to ``stop`` (exclusive) have been written."""
+        start, stop = rows
+        return any(done_start <= start and stop <= done_stop for done_start, done_stop in self.done)
+
+    def add(self, start: int, stop: int) -> None:
+        """Record the rows from `start` to `stop` (exclusive) as written. Call only once they are flushed to disk."""
+        merged = []
+        for done_start, done_stop in sorted([*self.done, (start, stop)]):
+            if merged and done_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], done_stop))
+            else:
+                merged.append((done_start, done_stop))
+        self.done = merged
+
+        if not self.persistent:
+            return
+        temp_path = self.record_path.with_name(f'{self.record_path.name}.tmp')
+        temp_path.write_text(json.dumps({'key': self.key, 'done': self.done}))
+        os.replace(temp_path, self.record_path)
+
+    def remove(self) -> None:
+        if not self.persistent:
+            return
+        self.record_path.unlink(missing_ok=True)
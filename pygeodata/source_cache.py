@@ -0,0 +1,185 @@
+import glob
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pygeodata.config import get_config
+from pygeodata.utils import remove_path
+
+# Sources are cached and evicted by one thread of the process at a time
+_LOCK = threading.Lock()
+
+
+# Files of a shapefile next to the .shp, sharing its stem
+SHAPEFILE_EXTENSIONS = ('.shx', '.dbf', '.prj', '.cpg', '.qix', '.sbn', '.sbx')
+
+
+def _source_files(path: Path) -> list[Path]:
+    # GDAL sidecars such as .aux.xml, .ovr or .msk extend the full name of the source
+    sidecars = set(path.parent.glob(f'{glob.escape(path.name)}.*'))
+    if path.suffix.lower() == '.shp':
+        siblings = path.parent.glob(f'{glob.escape(path.stem)}.*')
+        sidecars.update(p for p in siblings if p.suffix.lower() in SHAPEFILE_EXTENSIONS)
+    return [path] + sorted(p for p in sidecars if p != path and p.is_file())
+
+
+def source_identity(path: str | Path) -> str:
+    """Identity of the source at `path`, changing whenever it is modified, or `path` itself if it is not a file."""
+    source = Path(path)
+    if str(path).startswith('/vsi') or not source.exists():
+        return str(path)
+    source = source.absolute()
+    stat = source.stat()
+    return f'{source}:{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+    return path.stat().st_size
+
+
+@dataclass
+class SourceCache:
+    """Read-through cache of source files on fast local storage, for sources on slow or remote filesystems.
+
+    Processors read their sources through `cached_source`, which copies a source with its sidecars into
+    `directory` on first use. A cached copy is identified by the path, size and modification time of the
+    source, so a source that changes is copied again. Once the cache exceeds `max_bytes`, the least recently
+    used copies are evicted, except those that threads of this process are reading. Sources larger than
+    `max_bytes` and GDAL virtual paths, e.g. /vsis3/ or subdataset names, are read in place.
+
+    Parameters
+    ----------
+    directory : Path
+        Directory of the cached copies, preferably on a local SSD
+    max_bytes : int
+        Maximum size of the cache in bytes
+    """
+
+    directory: Path
+    max_bytes: int
+    # Number of readers of each entry in this process
+    _pins: Counter = field(default_factory=Counter, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.directory = Path(self.directory)
+
+    def key(self, path: str | Path) -> str:
+        """Identity of a source, changing whenever the source is modified."""
+        digest = hashlib.sha1(source_identity(path).encode()).hexdigest()[:16]
+        return f'{digest}_{Path(path).name}'
+
+    def entries(self) -> list[Path]:
+        """Cached sources, least recently used first."""
+        if not self.directory.exists():
+            return []
+        entries = [p for p in self.directory.iterdir() if p.is_dir() and not p.name.startswith('.')]
+        return sorted(entries, key=lambda p: p.stat().st_mtime)
+
+    @property
+    def size(self) -> int:
+        return sum(_size(entry) for entry in self.entries())
+
+    def evict(self, incoming: int = 0) -> None:
+        """Remove the least recently used sources until `incoming` bytes fit within `max_bytes`.
+
+        Sources in use, see `use`, are kept, and evicted once released if the cache is still too large.
+        """
+        entries = self.entries()
+        sizes = [_size(entry) for entry in entries]
+        total = sum(sizes)
+        for entry, size in zip(entries, sizes):
+            if total + incoming <= self.max_bytes:
+                break
+            if self._pins[entry.name]:
+                continue
+            print(f'Evicting cached source: {entry}')
+            remove_path(entry, missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        if self.directory.exists():
+            remove_path(self.directory)
+
+    def _fetch(self, path: str | Path) -> tuple[str | Path, Path | None]:
+        # The local path and the cache entry holding it, to be called with the lock held
+        source = Path(path)
+        if str(path).startswith('/vsi') or not source.exists():
+            return path, None
+
+        entry = self.directory / self.key(source)
+        if entry.exists():
+            # The modification time of an entry records its last use
+            os.utime(entry)
+            return entry / source.name, entry
+
+        files = [source] if source.is_dir() else _source_files(source)
+        size = sum(_size(file) for file in files)
+        if size > self.max_bytes:
+            return path, None
+
+        self.evict(size)
+
+        print(f'Caching source: {source} -> {entry}')
+        temp = self.directory / f'.{entry.name}.{uuid.uuid4().hex}'
+        temp.mkdir(parents=True)
+        try:
+            for file in files:
+                if file.is_dir():
+                    shutil.copytree(file, temp / file.name)
+                else:
+                    shutil.copy2(file, temp / file.name)
+            os.rename(temp, entry)
+        except BaseException:
+            remove_path(temp, missing_ok=True)
+            # Another process cached the source first
+            if not entry.exists():
+                raise
+
+        return entry / source.name, entry
+
+    def get(self, path: str | Path) -> str | Path:
+        """Local copy of the source at `path`, copied on first use, or `path` itself if it is not cached.
+
+        The copy may be evicted as soon as other sources are cached; use `use` to keep it while reading it.
+        """
+        with _LOCK:
+            return self._fetch(path)[0]
+
+    @contextmanager
+    def use(self, path: str | Path) -> Iterator[str | Path]:
+        """Like `get`, but the copy is not evicted by this process until the block exits."""
+        with _LOCK:
+            local, entry = self._fetch(path)
+            if entry is not None:
+                self._pins[entry.name] += 1
+
+        try:
+            yield local
+        finally:
+            if entry is not None:
+                with _LOCK:
+                    self._pins[entry.name] -= 1
+                    if not self._pins[entry.name]:
+                        del self._pins[entry.name]
+                        # Sources kept while in use may have left the cache too large
+                        self.evict()
+
+
+@contextmanager
+def cached_source(path: str | Path) -> Iterator[str | Path]:
+    """Path to read the source at `path` from within the block, through the `source_cache` of the config if set."""
+    cache = get_config().source_cache
+    if cache is None:
+        yield path
+        return
+    with cache.use(path) as local:
+        yield local
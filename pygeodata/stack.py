@@ -0,0 +1,124 @@
+import math
+from collections.abc import Sequence
+from dataclasses import replace
+from typing import TYPE_CHECKING
+
+import rasterio as rio
+
+from pygeodata.config import get_config
+from pygeodata.drivers.rioxarray import RioXArrayDriver
+from pygeodata.env import gdal_env
+from pygeodata.graph import process_graph
+from pygeodata.loader import DataLoader
+from pygeodata.types import SpatialSpec
+
+if TYPE_CHECKING:
+    import xarray as xr
+
+# Smallest chunk size in both dimensions of the default chunks
+MIN_CHUNK_SIZE = 1024
+
+
+def aligned_chunks(paths: Sequence, min_size: int = MIN_CHUNK_SIZE) -> tuple[int, int]:
+    """Chunk shape ``(rows, cols)`` that is a whole number of blocks of every raster in `paths`.
+
+    Starting from the least common multiple of the block shapes, the chunks are grown to at least `min_size` in
+    both dimensions, but not beyond the raster.
+    """
+    shapes = []
+    block_shapes = []
+    for path in paths:
+        with rio.open(path) as src:
+            shapes.append(src.shape)
+            block_shapes.append(src.block_shapes[0])
+
+    chunks = []
+    for axis in range(2):
+        size = max(shape[axis] for shape in shapes)
+        block = math.lcm(*(block_shape[axis] for block_shape in block_shapes))
+        chunks.append(min(size, block * max(1, math.ceil(min_size / block))))
+    return chunks[0], chunks[1]
+
+
+def _layer_names(loaders: Sequence[DataLoader]) -> list[str]:
+    names = [loader.name for loader in loaders]
+    if len(set(names)) < len(names):
+        # Loaders of the same class are told apart by their parameters
+        names = [repr(loader) for loader in loaders]
+    return names
+
+
+def load_stack(
+    loaders: Sequence[DataLoader],
+    spec: SpatialSpec | None = None,
+    chunks: tuple[int, int] | None = None,
+    dim: str = 'layer',
+    names: Sequence[str] | None = None,
+    dataset: bool = False,
+    max_workers: int | None = None,
+) -> 'xr.DataArray | xr.Dataset':
+    """Load the single band raster products of many loaders for one spec as one lazy, dask-backed cube.
+
+    Products that are missing are processed first, in parallel with `process_graph`. The products are then
+    opened lazily, with the same chunks for every layer, so that reading a chunk of the cube reads the same
+    blocks of every file.
+
+    Parameters
+    ----------
+    loaders : sequence of DataLoader
+        Loaders of the layers, whose drivers are `RioXArrayDriver`s. Their settings, such as masking and
+        scaling, are kept.
+    spec : SpatialSpec, optional
+        Spatial specification. Defaults to the spec in the config.
+    chunks : tuple of int, optional
+        Chunk shape ``(rows, cols)``. By default, a whole number of blocks of every product, see
+        `aligned_chunks`.
+    dim : str, default='layer'
+        Name of the layer dimension
+    names : sequence of str, optional
+        Names of the layers. By default, the names of the loaders, or their representations if these are not
+        unique.
+    dataset : bool, default=False
+        Whether to return a Dataset with one variable per layer instead of a DataArray with a layer dimension.
+    max_workers : int, optional
+        Number of products processed concurrently, see `process_graph`.
+
+    Returns
+    -------
+    xr.DataArray or xr.Dataset
+        DataArray with dimensions ``(dim, 'y', 'x')``, or Dataset with variables of dimensions ``('y', 'x')``
+    """
+    import pandas as pd
+    import xarray as xr
+
+    spec = spec or get_config().spec
+    if spec is None:
+        raise ValueError('No spatial specification (spec) provided or present in config')
+
+    loaders = list(loaders)
+    names = list(names) if names is not None else _layer_names(loaders)
+    if len(names) != len(loaders):
+        raise ValueError(f'Expected {len(loaders)} names, one per loader, got {len(names)}.')
+
+    process_graph([loader for loader in loaders if not loader.is_processed(spec)], spec, max_workers=max_workers)
+
+    paths = [loader.get_processed_path(spec) for loader in loaders]
+    with gdal_env():
+        chunks = chunks or aligned_chunks(paths)
+
+    layers = []
+    for loader, path in zip(loaders, paths):
+        driver = loader.driver
+        if not isinstance(driver, RioXArrayDriver):
+            raise TypeError(f'{loader}: Stacking requires a RioXArrayDriver, got {type(driver).__name__}')
+
+        lazy = replace(driver, flatten=True, open_kw={**driver.open_kw, 'chunks': {'y': chunks[0], 'x': chunks[1]}})
+        da = lazy(path)
+        if da.ndim != 2:
+            raise ValueError(f'{loader}: Stacking requires single band products, got dimensions {da.dims}')
+        layers.append(da)
+
+    if dataset:
+        return xr.Dataset(dict(zip(names, layers)))
+
+    return xr.concat(layers, dim=pd.Index(names, name=dim), join='exact', combine_attrs='drop_conflicts')
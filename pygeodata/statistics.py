@@ -0,0 +1,199 @@
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import rasterio as rio
+
+from pygeodata.aggregation import valid_mask
+
+
+@dataclass
+class BandStatistics:
+    """Statistics of the valid pixels of a band, as stored in the GDAL ``STATISTICS_*`` metadata of the band.
+
+    Parameters
+    ----------
+    minimum, maximum, mean, std : float, optional
+        Statistics of the valid values, None if the band has none
+    valid_percent : float
+        Percentage of the pixels that hold data
+    histogram : tuple of int, optional
+        Number of valid values in each bin, if a histogram was computed
+    bin_edges : tuple of float, optional
+        Edges of the histogram bins. Values outside of them are not counted.
+    """
+
+    minimum: float | None
+    maximum: float | None
+    mean: float | None
+    std: float | None
+    valid_percent: float
+    histogram: tuple[int, ...] | None = None
+    bin_edges: tuple[float, ...] | None = None
+
+    def scaled(self, scale: float, offset: float) -> 'BandStatistics':
+        """The statistics of the values after applying `scale` and `offset`."""
+        if self.minimum is None:
+            return self
+
+        bounds = sorted((self.minimum * scale + offset, self.maximum * scale + offset))
+        return replace(
+            self,
+            minimum=bounds[0],
+            maximum=bounds[1],
+            mean=self.mean * scale + offset,
+            std=self.std * abs(scale),
+            bin_edges=tuple(edge * scale + offset for edge in self.bin_edges) if self.bin_edges is not None else None,
+        )
+
+    def to_tags(self) -> dict[str, str]:
+        tags = {'STATISTICS_VALID_PERCENT': repr(float(self.valid_percent))}
+        if self.minimum is not None:
+            tags.update(
+                STATISTICS_MINIMUM=repr(float(self.minimum)),
+                STATISTICS_MAXIMUM=repr(float(self.maximum)),
+                STATISTICS_MEAN=repr(float(self.mean)),
+                STATISTICS_STDDEV=repr(float(self.std)),
+            )
+        if self.histogram is not None:
+            tags.update(
+                STATISTICS_HISTOGRAM=json.dumps(list(self.histogram)),
+                STATISTICS_HISTOGRAM_EDGES=json.dumps(list(self.bin_edges)),
+            )
+        return tags
+
+    @classmethod
+    def from_tags(cls, tags: dict[str, str]) -> 'BandStatistics | None':
+        if 'STATISTICS_VALID_PERCENT' not in tags and 'STATISTICS_MINIMUM' not in tags:
+            return None
+
+        def number(key: str, default: float | None = None) -> float | None:
+            return float(tags[key]) if key in tags else default
+
+        histogram = tags.get('STATISTICS_HISTOGRAM')
+        edges = tags.get('STATISTICS_HISTOGRAM_EDGES')
+        return cls(
+            minimum=number('STATISTICS_MINIMUM'),
+            maximum=number('STATISTICS_MAXIMUM'),
+            mean=number('STATISTICS_MEAN'),
+            std=number('STATISTICS_STDDEV'),
+            # Missing in statistics computed by GDAL versions before 3.2
+            valid_percent=number('STATISTICS_VALID_PERCENT', 100.0),
+            histogram=tuple(json.loads(histogram)) if histogram is not None else None,
+            bin_edges=tuple(json.loads(edges)) if edges is not None else None,
+        )
+
+
+class StatisticsAccumulator:
+    """Running statistics of the bands of a raster that is written window by window.
+
+    The mean and variance of the windows are merged with the parallel algorithm of Chan et al., so that they stay
+    accurate for large rasters.
+
+    Parameters
+    ----------
+    count : int
+        Number of bands
+    bin_edges : sequence of float, optional
+        Edges of the histogram bins. If None, no histogram is computed.
+    """
+
+    def __init__(self, count: int, bin_edges: Sequence[float] | None = None):
+        self.bin_edges = np.asarray(bin_edges, dtype=np.float64) if bin_edges is not None else None
+        self.pixels = np.zeros(count, dtype=np.int64)
+        self.n = np.zeros(count, dtype=np.int64)
+        self.mean = np.zeros(count)
+        self.m2 = np.zeros(count)
+        self.min = np.full(count, np.inf)
+        self.max = np.full(count, -np.inf)
+        self.histogram = None
+        if self.bin_edges is not None:
+            self.histogram = np.zeros((count, len(self.bin_edges) - 1), dtype=np.int64)
+
+    def add(self, data: np.ndarray, nodata: float | None) -> None:
+        """Add a window of all bands, shaped ``(count, height, width)``."""
+        for band, values in enumerate(data):
+            self.add_band(band, values, nodata)
+
+    def add_band(self, band: int, data: np.ndarray, nodata: float | None) -> None:
+        """Add a window of the band with zero-based index `band`."""
+        self.pixels[band] += data.size
+        values = data[valid_mask(data, nodata)].astype(np.float64, copy=False)
+        if values.size == 0:
+            return
+
+        n = values.size
+        mean = values.mean()
+        m2 = np.square(values - mean).sum()
+
+        total = self.n[band] + n
+        delta = mean - self.mean[band]
+        self.m2[band] += m2 + delta**2 * self.n[band] * n / total
+        self.mean[band] += delta * n / total
+        self.n[band] = total
+
+        self.min[band] = min(self.min[band], values.min())
+        self.max[band] = max(self.max[band], values.max())
+
+        if self.histogram is not None:
+            self.histogram[band] += np.histogram(values, bins=self.bin_edges)[0]
+
+    def result(self) -> list[BandStatistics]:
+        stats = []
+        for band, (n, pixels) in enumerate(zip(self.n, self.pixels)):
+            valid_percent = 100 * n.item() / pixels.item() if pixels else 0.0
+            histogram = None
+            bin_edges = None
+            if self.histogram is not None:
+                histogram = tuple(self.histogram[band].tolist())
+                bin_edges = tuple(self.bin_edges.tolist())
+            if n == 0:
+                stats.append(BandStatistics(None, None, None, None, valid_percent, histogram, bin_edges))
+                continue
+            stats.append(
+                BandStatistics(
+                    minimum=self.min[band].item(),
+                    maximum=self.max[band].item(),
+                    mean=self.mean[band].item(),
+                    std=np.sqrt(self.m2[band] / n).item(),
+                    valid_percent=valid_percent,
+                    histogram=histogram,
+                    bin_edges=bin_edges,
+                )
+            )
+        return stats
+
+
+def write_statistics(dst: Any, stats: Sequence[BandStatistics]) -> None:
+    """Store statistics in the band metadata of a rasterio dataset opened for writing."""
+    for band, band_stats in enumerate(stats, start=1):
+        dst.update_tags(band, **band_stats.to_tags())
+
+
+def read_statistics(path: str | Path, scaled: bool = True) -> list[BandStatistics | None]:
+    """Read the stored statistics of the bands of a raster, without reading any pixels.
+
+    Parameters
+    ----------
+    path : str | Path
+        Path to the raster
+    scaled : bool, default=True
+        Whether to apply the scales and offsets of the bands, giving the statistics of the values as loaded with
+        masking and scaling. Otherwise the statistics are of the stored values.
+
+    Returns
+    -------
+    list of BandStatistics or None
+        Statistics of each band, None for bands without stored statistics
+    """
+    with rio.open(path) as src:
+        stats = [BandStatistics.from_tags(src.tags(band)) for band in src.indexes]
+        if scaled:
+            stats = [
+                s.scaled(scale, offset) if s is not None else None
+                for s, scale, offset in zip(stats, src.scales, src.offsets)
+            ]
+    return stats
@@ -0,0 +1,93 @@
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import rasterio as rio
+from numpy.typing import DTypeLike
+from rasterio import CRS
+from rasterio.warp import transform_bounds
+from rasterio.windows import Window
+
+from pygeodata.types import SpatialSpec
+from pygeodata.utils import available_memory
+
+MB = 2**20
+
+
+@dataclass
+class WarpSettings:
+    """Warp settings chosen by `auto_warp_settings`, with the estimates they are based on.
+
+    Parameters
+    ----------
+    warp_mem_limit : int
+        Warp memory limit in MB
+    num_threads : int
+        Number of warp threads
+    dst_bytes : int
+        Size of the destination raster in bytes
+    src_bytes : int
+        Size of the source window covering the destination in bytes
+    """
+
+    warp_mem_limit: int
+    num_threads: int
+    dst_bytes: int
+    src_bytes: int
+
+    def __str__(self) -> str:
+        return (
+            f'warp_mem_limit={self.warp_mem_limit} MB, num_threads={self.num_threads} '
+            f'(destination {self.dst_bytes / MB:.0f} MB, source window {self.src_bytes / MB:.0f} MB)'
+        )
+
+
+def source_window(src: rio.DatasetReader, src_crs: CRS, spec: SpatialSpec) -> Window:
+    """Window of `src` covering the bounds of `spec`, rounded outwards and clipped to `src`."""
+    left, bottom, right, top = transform_bounds(spec.crs, src_crs, *spec.bounds, densify_pts=21)
+    # Corners in pixel coordinates, which also holds for grids that are not north-up
+    cols, rows = ~src.transform * (np.array([left, left, right, right]), np.array([bottom, top, bottom, top]))
+    col_start, col_stop = np.clip([np.floor(cols.min()), np.ceil(cols.max())], 0, src.width).astype(int)
+    row_start, row_stop = np.clip([np.floor(rows.min()), np.ceil(rows.max())], 0, src.height).astype(int)
+    return Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+
+
+def source_window_bytes(src: rio.DatasetReader, src_crs: CRS, spec: SpatialSpec, count: int) -> int:
+    """Size in bytes of the window of `src` covering the bounds of `spec`."""
+    window = source_window(src, src_crs, spec)
+    return int(window.width * window.height) * count * np.dtype(src.dtypes[0]).itemsize
+
+
+def auto_warp_settings(
+    src: rio.DatasetReader,
+    src_crs: CRS,
+    spec: SpatialSpec,
+    count: int,
+    dst_dtype: DTypeLike,
+    memory_fraction: float = 0.25,
+    pixels_per_thread: int = 2**20,
+) -> WarpSettings:
+    """Choose the warp memory limit and thread count for warping `src` to `spec`.
+
+    The memory limit is sized to warp the whole product in one chunk, capped at `memory_fraction` of the
+    available memory, and never below the GDAL default of 64 MB. One thread is used per `pixels_per_thread`
+    destination pixels, up to the number of cores.
+    """
+    height, width = spec.shape
+    dst_bytes = height * width * count * np.dtype(dst_dtype).itemsize
+    try:
+        src_bytes = source_window_bytes(src, src_crs, spec, count)
+    except (ValueError, rio.errors.CRSError):
+        src_bytes = dst_bytes
+
+    # GDAL keeps masks and densities next to the pixel buffers
+    needed = 2 * (dst_bytes + src_bytes)
+
+    available = available_memory()
+    if available is not None:
+        needed = min(needed, int(available * memory_fraction))
+
+    warp_mem_limit = max(64, needed // MB)
+    num_threads = int(min(os.cpu_count() or 1, max(1, height * width // pixels_per_thread)))
+
+    return WarpSettings(warp_mem_limit, num_threads, dst_bytes, src_bytes)
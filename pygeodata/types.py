@@ -1,17 +1,19 @@
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Protocol
+from typing import TYPE_CHECKING, Any, Protocol
 
 from affine import Affine
-from pyproj import CRS
-from rasterio.coords import BoundingBox
+
+if TYPE_CHECKING:
+    from pyproj import CRS
+    from rasterio.coords import BoundingBox
 
 RasterShape = tuple[int, int]
 
 
 @dataclass
 class SpatialSpec:
-    crs: CRS
+    crs: 'CRS'
     transform: Affine
     shape: RasterShape
 
@@ -20,7 +22,9 @@ class SpatialSpec:
         return (abs(self.transform.a), abs(self.transform.e))
 
     @property
-    def bounds(self) -> BoundingBox:
+    def bounds(self) -> 'BoundingBox':
+        from rasterio.coords import BoundingBox
+
         height, width = self.shape
         x0, y0 = self.transform * (0, 0)
         x1, y1 = self.transform * (width, height)
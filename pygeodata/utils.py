@@ -1,5 +1,92 @@
+import os
+import shutil
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
 from affine import Affine
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 
 def transform_to_str(t: Affine) -> str:
     return f'affine_{t.a:.4f}_{t.b:.4f}_{t.c:.4f}_{t.d:.4f}_{t.e:.4f}_{t.f:.4f}'
+
+
+def total_memory() -> int | None:
+    """Physical memory of the machine in bytes, or None if it cannot be determined."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def available_memory() -> int | None:
+    """Memory available for new allocations in bytes, or None if it cannot be determined."""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def is_vsimem(path: str | Path) -> bool:
+    """Whether `path` is a GDAL in-memory file."""
+    return Path(path).as_posix().startswith('/vsimem/')
+
+
+def remove_path(path: Path, missing_ok: bool = False) -> None:
+    """Remove a file, symlink or directory tree, or a GDAL in-memory file."""
+    if is_vsimem(path):
+        import rasterio.shutil
+
+        if not missing_ok or rasterio.shutil.exists(path):
+            rasterio.shutil.delete(path)
+        return
+
+    if missing_ok and not (path.exists() or path.is_symlink()):
+        return
+
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    else:
+        path.unlink()
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on the file at `path`, waiting for other processes and threads holding it.
+
+    The lock is released by the operating system when its holder dies, so a crashed run never blocks the next.
+    The lock file itself is left in place, as removing it would race with the processes waiting for it.
+    """
+    with open(path, 'a+b') as file:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    # Gives up after 10 seconds
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
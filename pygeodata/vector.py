@@ -0,0 +1,115 @@
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+import geopandas as gpd
+import pandas as pd
+import pyarrow as pa
+import pyogrio
+import shapely
+from rasterio.warp import transform_bounds
+
+from pygeodata.types import SpatialSpec
+
+
+def _bbox(path: str | Path, spec: SpatialSpec, layer: str | int | None) -> tuple[float, ...] | None:
+    """Bounds of `spec` in the CRS of the dataset, or None if the dataset has no CRS."""
+    src_crs = pyogrio.read_info(path, layer=layer)['crs']
+    if src_crs is None:
+        return None
+    return transform_bounds(spec.crs, src_crs, *spec.bounds, densify_pts=21)
+
+
+def read_vector(
+    path: str | Path,
+    spec: SpatialSpec,
+    columns: Sequence[str] | None = None,
+    **kwargs: Any,
+) -> gpd.GeoDataFrame:
+    """Read the features of a vector dataset that intersect a spatial specification.
+
+    The bounds of `spec` are reprojected to the CRS of the dataset and pushed down to the reader as a bounding
+    box filter, so that only the intersecting features are read, through the Arrow interface of pyogrio. Only
+    the surviving geometries are reprojected to `spec.crs`. The feature ids are used as index.
+
+    Parameters
+    ----------
+    path : str | Path
+        Path to the vector dataset (e.g., shapefile, GeoPackage).
+    spec : SpatialSpec
+        Target spatial specification.
+    columns : sequence of str, optional
+        Attribute columns to read. If None, reads all columns.
+    **kwargs
+        Additional keyword arguments passed to `geopandas.read_file`.
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Features intersecting the bounds of `spec`, in `spec.crs`.
+    """
+    df = gpd.read_file(
+        path,
+        engine='pyogrio',
+        bbox=_bbox(path, spec, kwargs.get('layer')),
+        columns=columns,
+        use_arrow=True,
+        fid_as_index=True,
+        **kwargs,
+    )
+    return df.to_crs(spec.crs)
+
+
+def iter_vector(
+    path: str | Path,
+    spec: SpatialSpec,
+    columns: Sequence[str] | None = None,
+    batch_size: int = 65_536,
+    **kwargs: Any,
+) -> Iterator[gpd.GeoDataFrame]:
+    """Read the features of a vector dataset that intersect a spatial specification, in batches.
+
+    Like `read_vector`, but the dataset is opened once and streamed as Arrow record batches, so that every feature
+    is read once whatever the number of batches and only one batch is held in memory.
+
+    Parameters
+    ----------
+    path : str | Path
+        Path to the vector dataset (e.g., shapefile, GeoPackage).
+    spec : SpatialSpec
+        Target spatial specification.
+    columns : sequence of str, optional
+        Attribute columns to read. If None, reads all columns.
+    batch_size : int, default=65_536
+        Maximum number of features per batch.
+    **kwargs
+        Additional keyword arguments passed to `pyogrio.open_arrow`.
+
+    Yields
+    ------
+    gpd.GeoDataFrame
+        Batches of the features intersecting the bounds of `spec`, in `spec.crs`, with the feature ids as index.
+    """
+    with pyogrio.open_arrow(
+        path,
+        bbox=_bbox(path, spec, kwargs.get('layer')),
+        columns=columns,
+        batch_size=batch_size,
+        return_fids=True,
+        use_pyarrow=True,
+        **kwargs,
+    ) as (meta, reader):
+        geometry_name = meta['geometry_name'] or 'wkb_geometry'
+        fid_column = meta['fid_column'] or 'OGC_FID'
+
+        for batch in reader:
+            wkb = batch.column(geometry_name)
+            if isinstance(wkb, pa.ExtensionArray):
+                wkb = wkb.storage
+            df = gpd.GeoDataFrame(
+                batch.drop_columns([geometry_name, fid_column]).to_pandas(),
+                geometry=shapely.from_wkb(wkb.to_numpy(zero_copy_only=False)),
+                crs=meta['crs'],
+            )
+            df.index = pd.Index(batch.column(fid_column).to_numpy(), name='fid')
+            yield df.to_crs(spec.crs)
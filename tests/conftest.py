@@ -1,11 +1,14 @@
 from dataclasses import dataclass
 from pathlib import Path
 
+import geopandas as gpd
 import numpy as np
 import pytest
+import rioxarray  # noqa: F401 (registers the .rio accessor)
 import xarray as xr
 from affine import Affine
 from pyproj import CRS
+from shapely.geometry import box
 
 from pygeodata.drivers import RioXArrayDriver
 from pygeodata.loader import DataLoader
@@ -73,3 +76,22 @@ def sample_loader_class_complex(sample_spatial_spec, sample_geotiff):
         __slots__ = dict(processor=Reprojector(sample_geotiff), driver=RioXArrayDriver())
 
     return ComplexSampleLoader
+
+
+@pytest.fixture
+def sample_vector(tmp_path):
+    """Create a GeoPackage with a 10x10 grid of one degree squares around the origin."""
+    cells = [(x, y) for y in range(-5, 5) for x in range(-5, 5)]
+    df = gpd.GeoDataFrame(
+        {
+            'value': np.arange(len(cells), dtype='int32'),
+            'weight': np.linspace(0, 1, len(cells)),
+        },
+        geometry=[box(x, y, x + 1, y + 1) for x, y in cells],
+        crs='EPSG:4326',
+    )
+
+    output_path = tmp_path / 'test_vector.gpkg'
+    df.to_file(output_path, driver='GPKG')
+
+    return output_path
@@ -0,0 +1,37 @@
+import geopandas as gpd
+import numpy as np
+from shapely.geometry import box
+
+from pygeodata.drivers import GeoParquetDriver
+
+
+def write_cells(path):
+    cells = [(x, y) for y in range(10) for x in range(10)]
+    df = gpd.GeoDataFrame(
+        {'value': np.arange(100), 'name': [f'cell {i}' for i in range(100)]},
+        geometry=[box(x, y, x + 1, y + 1) for x, y in cells],
+        crs='EPSG:4326',
+    )
+    df.to_parquet(path, write_covering_bbox=True, row_group_size=10)
+
+
+def test_geoparquet_driver_reads_all(tmp_path):
+    write_cells(tmp_path / 'cells.parquet')
+
+    df = GeoParquetDriver()(tmp_path / 'cells.parquet')
+    assert len(df) == 100
+    assert list(df.columns) == ['value', 'name', 'geometry']
+
+
+def test_geoparquet_driver_columns(tmp_path):
+    write_cells(tmp_path / 'cells.parquet')
+
+    df = GeoParquetDriver(columns=['value'])(tmp_path / 'cells.parquet')
+    assert list(df.columns) == ['value', 'geometry']
+
+
+def test_geoparquet_driver_bbox(tmp_path):
+    write_cells(tmp_path / 'cells.parquet')
+
+    df = GeoParquetDriver(bbox=(2.5, 2.5, 3.5, 3.5))(tmp_path / 'cells.parquet')
+    assert sorted(df['value']) == [22, 23, 32, 33]
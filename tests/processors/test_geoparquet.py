@@ -0,0 +1,76 @@
+import numpy as np
+import pyarrow.parquet as pq
+from affine import Affine
+from pyproj import CRS
+
+from pygeodata.config import set_config
+from pygeodata.loader import DataLoader
+from pygeodata.processors import VectorClipper
+from pygeodata.types import SpatialSpec
+
+# Covering x from -2 to 2 and y from -1 to 2
+SPEC = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.5, 0.0, -2.0, 0.0, -0.5, 2.0), shape=(6, 8))
+
+
+def test_vector_clipper_clips(tmp_path, sample_vector):
+    VectorClipper(sample_vector)(tmp_path / 'clipped.parquet', SPEC)
+
+    df = VectorClipper.default_driver(tmp_path / 'clipped.parquet')
+    assert len(df) == 12
+    np.testing.assert_allclose(df.total_bounds, [-2, -1, 2, 2])
+    assert df.crs.to_epsg() == 4326
+    assert sum(geometry.area for geometry in df.geometry) == 12
+
+
+def test_vector_clipper_keeps_whole_features(tmp_path, sample_vector):
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.5, 0.0, -1.5, 0.0, -0.5, 1.5), shape=(6, 6))
+
+    VectorClipper(sample_vector, columns=['value'], clip=False)(tmp_path / 'whole.parquet', spec)
+
+    df = VectorClipper.default_driver(tmp_path / 'whole.parquet')
+    assert list(df.columns) == ['value', 'geometry']
+    assert len(df) == 16
+    np.testing.assert_allclose(df.total_bounds, [-2, -2, 2, 2])
+
+
+def test_vector_clipper_reprojects_and_sorts(tmp_path, sample_vector):
+    spec = SpatialSpec(
+        crs=CRS.from_epsg(3857),
+        transform=Affine(1000.0, 0.0, -6e5, 0.0, -1000.0, 6e5),
+        shape=(1200, 1200),
+    )
+
+    VectorClipper(sample_vector, row_group_size=10)(tmp_path / 'sorted.parquet', spec)
+
+    metadata = pq.read_metadata(tmp_path / 'sorted.parquet')
+    assert metadata.num_rows == 100
+    assert metadata.num_row_groups == 10
+    assert 'bbox' in metadata.schema.to_arrow_schema().names
+
+    # Consecutive features of the Hilbert order are close, unlike those of the rows of the grid
+    df = VectorClipper.default_driver(tmp_path / 'sorted.parquet')
+    assert df.crs.to_epsg() == 3857
+    x, y = df.centroid.x.values, df.centroid.y.values
+    steps = np.hypot(np.diff(x), np.diff(y)) / 111_319.49
+    assert steps.max() < 2.5
+    assert steps.mean() < 1.2
+
+
+def test_vector_clipper_empty(tmp_path, sample_vector):
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.5, 0.0, 100.0, 0.0, -0.5, 50.0), shape=(4, 4))
+
+    VectorClipper(sample_vector)(tmp_path / 'empty.parquet', spec)
+
+    assert len(VectorClipper.default_driver(tmp_path / 'empty.parquet')) == 0
+
+
+def test_vector_clipper_loader(tmp_path, sample_vector):
+    class CellsLoader(DataLoader):
+        processor = VectorClipper(sample_vector)
+
+    with set_config(path_data_processed=tmp_path):
+        df = CellsLoader()(SPEC)
+        path = CellsLoader().get_processed_path(SPEC)
+
+    assert path.suffix == '.parquet'
+    assert len(df) == 12
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+import rasterio as rio
+from affine import Affine
+from pyproj import CRS
+
+from pygeodata.config import set_config
+from pygeodata.drivers import MemmapDriver, RioXArrayDriver
+from pygeodata.drivers.memmap import read_sidecar
+from pygeodata.loader import DataLoader
+from pygeodata.processors import MemmapConverter, Reprojector
+from pygeodata.types import SpatialSpec
+
+
+@pytest.fixture
+def memmap_spec():
+    return SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(10.0, 0.0, -180.0, 0.0, -10.0, 90.0), shape=(18, 36))
+
+
+@pytest.fixture
+def int_geotiff(tmp_path, memmap_spec):
+    path = tmp_path / 'ints.tif'
+    data = np.arange(2 * 18 * 36, dtype='int16').reshape(2, 18, 36)
+    data[:, 0, :] = -1
+
+    with rio.open(
+        path,
+        'w',
+        driver='GTiff',
+        height=18,
+        width=36,
+        count=2,
+        dtype='int16',
+        nodata=-1,
+        crs=memmap_spec.crs,
+        transform=memmap_spec.transform,
+    ) as dst:
+        dst.write(data)
+        dst.scales = (0.5, 0.5)
+        dst.offsets = (1.0, 1.0)
+
+    return path
+
+
+def test_memmap_converter(tmp_path, int_geotiff, memmap_spec):
+    class IntsLoader(DataLoader):
+        processor = MemmapConverter(Reprojector(int_geotiff), strip_rows=5)
+
+    class IntsTiffLoader(DataLoader):
+        processor = Reprojector(int_geotiff)
+        driver = RioXArrayDriver(mask_and_scale=False)
+
+    with set_config(path_data_processed=tmp_path / 'processed'):
+        da = IntsLoader()(memmap_spec)
+        path = IntsLoader().get_processed_path(memmap_spec)
+        expected = IntsTiffLoader()(memmap_spec)
+
+    assert path.suffix == '.npy'
+    assert read_sidecar(path)['nodata'] == -1
+    assert sorted(p.name for p in path.parent.iterdir()) == ['ints.npy', 'ints.npy.json']
+
+    # Mapped, not copied
+    assert isinstance(da.data, np.memmap)
+    assert not da.data.flags.writeable
+
+    np.testing.assert_array_equal(da.values, expected.values)
+    np.testing.assert_allclose(da.x, expected.x)
+    np.testing.assert_allclose(da.y, expected.y)
+    assert da.rio.crs == expected.rio.crs
+    assert da.rio.transform() == expected.rio.transform()
+    assert da.rio.nodata == expected.rio.nodata
+    assert da.attrs['scale_factor'] == (0.5, 0.5)
+
+
+def test_memmap_driver_mask_and_scale(tmp_path, int_geotiff, memmap_spec):
+    path = tmp_path / 'ints.npy'
+    MemmapConverter(Reprojector(int_geotiff))(path, memmap_spec)
+
+    da = MemmapDriver(mask_and_scale=True)(path)
+    expected = RioXArrayDriver(mask_and_scale=True)(int_geotiff)
+
+    np.testing.assert_allclose(da.values, expected.values)
+    assert np.isnan(da.values[:, 0]).all()
@@ -1,8 +1,15 @@
+import geopandas as gpd
 import numpy as np
+import pytest
 import rasterio as rio
+from affine import Affine
 from numpy import dtype
+from pyproj import CRS
+from shapely.geometry import box
 
 from pygeodata.processors.rasterizer import Rasterizer
+from pygeodata.statistics import read_statistics
+from pygeodata.types import SpatialSpec
 from tests.conftest import COUNTRIES_SHP
 
 
@@ -30,3 +37,222 @@ def test_rasterizer_int(tmp_path, sample_spatial_spec):
         assert src.count == 1
         assert dtype(src.dtypes[0]) == np.int32
         assert src.read(1)[0, 0] == -1
+
+
+def test_rasterizer_subset_spec(tmp_path, sample_vector):
+    output_path = tmp_path / 'output.tif'
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.5, 0.0, 0.0, 0.0, -0.5, 2.0), shape=(4, 4))
+
+    Rasterizer(sample_vector, column='value', fill_value=-1, all_touched=False)(output_path, spec)
+
+    with rio.open(output_path) as src:
+        data = src.read(1)
+
+    # Cells with their lower left corner at (0, 1), (1, 1), (0, 0) and (1, 0)
+    np.testing.assert_array_equal(np.unique(data), [55, 56, 65, 66])
+    assert data[0, 0] == 65
+
+
+def test_rasterizer_multiple_columns(tmp_path, sample_vector):
+    output_path = tmp_path / 'output.tif'
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.5, 0.0, -6.0, 0.0, -0.5, 6.0), shape=(24, 24))
+
+    Rasterizer(
+        sample_vector,
+        column=['value', 'weight'],
+        dtype=[np.int16, np.float32],
+        fill_value=[-1, np.nan],
+        all_touched=False,
+    )(output_path, spec)
+
+    with rio.open(output_path) as src:
+        assert src.count == 2
+        assert src.descriptions == ('value', 'weight')
+        assert dtype(src.dtypes[0]) == np.float32
+        # The fill values differ, so both are stored as NaN
+        assert np.isnan(src.nodata)
+        value, weight = src.read()
+
+    assert np.isnan(value[0, 0])
+    assert np.isnan(weight[0, 0])
+    assert value[2, 2] == 90
+    assert weight[2, 2] == np.float32(90 / 99)
+
+
+def test_rasterizer_multiple_columns_mismatched_dtypes(tmp_path, sample_vector, sample_spatial_spec):
+    with pytest.raises(ValueError):
+        Rasterizer(sample_vector, column=['value', 'weight'], dtype=[np.int16])(tmp_path / 'o.tif', sample_spatial_spec)
+
+
+@pytest.fixture
+def sample_points(tmp_path):
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 4, 1000)
+    y = rng.uniform(0, 4, 1000)
+    df = gpd.GeoDataFrame({'value': rng.normal(size=1000)}, geometry=gpd.points_from_xy(x, y), crs='EPSG:4326')
+
+    output_path = tmp_path / 'points.gpkg'
+    df.to_file(output_path, driver='GPKG')
+
+    return output_path, df
+
+
+@pytest.mark.parametrize('statistic', ['count', 'sum', 'mean', 'min', 'max'])
+def test_rasterizer_points(tmp_path, sample_points, statistic):
+    path, df = sample_points
+    output_path = tmp_path / 'output.tif'
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(1.0, 0.0, 0.0, 0.0, -1.0, 3.0), shape=(3, 4))
+
+    Rasterizer(path, column='value', point_statistic=statistic, chunk_size=128)(output_path, spec)
+
+    with rio.open(output_path) as src:
+        data = src.read(1)
+
+    # Points in the top left pixel of the spec
+    values = df['value'][(df.geometry.x < 1) & (df.geometry.y >= 2) & (df.geometry.y < 3)]
+    expected = len(values) if statistic == 'count' else getattr(values, statistic)()
+    assert data[0, 0] == pytest.approx(expected)
+
+    # Points above y = 3 fall outside of the spec
+    if statistic == 'count':
+        assert data.sum() == ((df.geometry.y < 3).sum())
+
+
+def test_rasterizer_points_sum_narrow_integers(tmp_path):
+    df = gpd.GeoDataFrame(
+        {'value': np.full(1000, 100, dtype='int16')},
+        geometry=gpd.points_from_xy(np.full(1000, 0.5), np.full(1000, 0.5)),
+        crs='EPSG:4326',
+    )
+    df.to_file(tmp_path / 'points.gpkg', driver='GPKG')
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(1.0, 0.0, 0.0, 0.0, -1.0, 1.0), shape=(1, 1))
+
+    Rasterizer(tmp_path / 'points.gpkg', column='value', point_statistic='sum')(tmp_path / 'sum.tif', spec)
+
+    with rio.open(tmp_path / 'sum.tif') as src:
+        assert src.dtypes[0] == 'int64'
+        assert src.read(1)[0, 0] == 100_000
+
+def test_rasterizer_points_rejects_polygons(tmp_path, sample_vector, sample_spatial_spec):
+    with pytest.raises(TypeError):
+        Rasterizer(sample_vector, column='value', point_statistic='mean')(tmp_path / 'o.tif', sample_spatial_spec)
+
+
+def test_rasterizer_downcast(tmp_path, sample_vector):
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.5, 0.0, -6.0, 0.0, -0.5, 6.0), shape=(24, 24))
+
+    kwargs = {'column': 'value', 'dtype': np.int64, 'fill_value': 100, 'all_touched': False}
+    Rasterizer(sample_vector, downcast=True, **kwargs)(tmp_path / 'downcast.tif', spec)
+    Rasterizer(sample_vector, **kwargs)(tmp_path / 'plain.tif', spec)
+
+    with rio.open(tmp_path / 'downcast.tif') as downcast, rio.open(tmp_path / 'plain.tif') as plain:
+        assert downcast.dtypes[0] == 'uint8'
+        assert downcast.tags(1, 'IMAGE_STRUCTURE')['NBITS'] == '7'
+        np.testing.assert_array_equal(downcast.read(1), plain.read(1))
+
+
+def test_rasterizer_statistics(tmp_path, sample_vector):
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.5, 0.0, -6.0, 0.0, -0.5, 6.0), shape=(24, 24))
+
+    Rasterizer(sample_vector, column=['value', 'weight'], fill_value=[-1, np.nan], all_touched=False)(
+        tmp_path / 'output.tif', spec
+    )
+
+    with rio.open(tmp_path / 'output.tif') as src:
+        value, weight = src.read(masked=True)
+    stats = read_statistics(tmp_path / 'output.tif')
+
+    # The fill values are nodata, so they are not counted
+    assert (stats[0].minimum, stats[0].maximum) == (value.min(), value.max())
+    assert stats[0].minimum >= 0
+    assert stats[0].valid_percent == pytest.approx(100 * value.count() / value.size)
+    assert stats[0].valid_percent < 100
+    assert stats[1].mean == pytest.approx(weight.mean())
+    assert stats[1].valid_percent == pytest.approx(100 * weight.count() / weight.size)
+
+
+@pytest.mark.parametrize('block_bytes', [None, 1])
+def test_rasterizer_coverage(tmp_path, sample_vector, monkeypatch, block_bytes):
+    if block_bytes is not None:
+        # One row per block
+        monkeypatch.setattr('pygeodata.processors.rasterizer.COVERAGE_BLOCK_BYTES', block_bytes)
+    # Pixels centred on the corners of the cells, each covering a quarter of four cells
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(1.0, 0.0, -5.5, 0.0, -1.0, 5.5), shape=(11, 11))
+
+    for coverage in ('fraction', 'mean', 'sum'):
+        Rasterizer(sample_vector, column='value', coverage=coverage)(tmp_path / f'{coverage}.tif', spec)
+
+    with rio.open(tmp_path / 'fraction.tif') as src:
+        assert src.dtypes[0] == 'float64'
+        fraction = src.read(1)
+    with rio.open(tmp_path / 'mean.tif') as src:
+        mean = src.read(1)
+    with rio.open(tmp_path / 'sum.tif') as src:
+        total = src.read(1)
+
+    np.testing.assert_allclose(fraction[[0, 0, 5, 10], [0, 5, 0, 10]], [0.25, 0.5, 0.5, 0.25])
+    np.testing.assert_allclose(fraction[1:-1, 1:-1], 1)
+    # The cells with values 90, 91, 80 and 81
+    assert mean[1, 1] == pytest.approx(85.5)
+    assert mean[0, 0] == pytest.approx(90)
+    # Every cell is split over four pixels
+    assert total[1, 1] == pytest.approx(85.5)
+    assert total[0, 0] == pytest.approx(90 / 4)
+    assert total.sum() == pytest.approx(np.arange(100).sum())
+
+
+def test_rasterizer_coverage_overlapping(tmp_path):
+    df = gpd.GeoDataFrame({'value': [10, 20]}, geometry=[box(0, 0, 1, 1), box(0.6, 0, 1.6, 1)], crs='EPSG:4326')
+    df.to_file(tmp_path / 'overlapping.gpkg', driver='GPKG')
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(2.0, 0.0, 0.0, 0.0, -1.0, 1.0), shape=(1, 1))
+
+    results = {}
+    for coverage in ('fraction', 'mean', 'sum'):
+        Rasterizer(tmp_path / 'overlapping.gpkg', column='value', coverage=coverage)(tmp_path / 'out.tif', spec)
+        with rio.open(tmp_path / 'out.tif') as src:
+            results[coverage] = src.read(1)[0, 0]
+
+    assert results['fraction'] == pytest.approx(0.8)
+    # Both features cover the same area, whichever is burned last
+    assert results['mean'] == pytest.approx(15)
+    assert results['sum'] == pytest.approx(15)
+
+
+def test_rasterizer_coverage_outside(tmp_path, sample_vector):
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(1.0, 0.0, 10.0, 0.0, -1.0, 5.0), shape=(2, 2))
+
+    Rasterizer(sample_vector, column='value', coverage='mean')(tmp_path / 'mean.tif', spec)
+    Rasterizer(sample_vector, column='value', coverage='fraction')(tmp_path / 'fraction.tif', spec)
+
+    with rio.open(tmp_path / 'mean.tif') as mean, rio.open(tmp_path / 'fraction.tif') as fraction:
+        assert np.isnan(mean.read(1)).all()
+        assert (fraction.read(1) == 0).all()
+
+
+def test_rasterizer_coverage_invalid(tmp_path, sample_vector, sample_spatial_spec):
+    with pytest.raises(ValueError, match='Unknown coverage mode'):
+        Rasterizer(sample_vector, column='value', coverage='area')(tmp_path / 'o.tif', sample_spatial_spec)
+    with pytest.raises(TypeError, match='requires a floating point dtype'):
+        Rasterizer(sample_vector, column='value', coverage='fraction', dtype=np.uint8)(
+            tmp_path / 'o.tif', sample_spatial_spec
+        )
+    with pytest.raises(ValueError, match='cannot be combined'):
+        Rasterizer(sample_vector, column='value', coverage='sum', point_statistic='sum')(
+            tmp_path / 'o.tif', sample_spatial_spec
+        )
+
+
+def test_rasterizer_nodata(tmp_path, sample_vector):
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.5, 0.0, -6.0, 0.0, -0.5, 6.0), shape=(24, 24))
+    kwargs = {'column': ['value', 'value'], 'dtype': np.int32, 'all_touched': False}
+
+    Rasterizer(sample_vector, fill_value=-1, **kwargs)(tmp_path / 'shared.tif', spec)
+    Rasterizer(sample_vector, fill_value=[-1, -2], **kwargs)(tmp_path / 'different.tif', spec)
+
+    with rio.open(tmp_path / 'shared.tif') as shared, rio.open(tmp_path / 'different.tif') as different:
+        assert shared.nodata == -1
+        # Replaced by the value above the data
+        assert different.nodata == 100
+        assert different.dtypes[0] == 'int32'
+        np.testing.assert_array_equal(shared.read(masked=True).mask, different.read(masked=True).mask)
+        np.testing.assert_array_equal(shared.read(masked=True), different.read(masked=True))
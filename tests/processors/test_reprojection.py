@@ -1,12 +1,19 @@
+import os
+
+import numpy as np
 import pytest
 import rasterio as rio
+import rasterio.warp
 from affine import Affine
+from pygeodata.config import set_config
+from pygeodata.drivers import RioXArrayDriver
 from pygeodata.options import RasterCreationOptions
 from pygeodata.processors.reprojection import Reprojector
+from pygeodata.statistics import read_statistics
 from pygeodata.types import SpatialSpec
 from pyproj import CRS
 from rasterio import RasterioIOError
-from rasterio.enums import Compression
+from rasterio.enums import Compression, Resampling
 from rasterio.errors import CRSError
 from rasterio.warp import calculate_default_transform
 from tests.conftest import LUH2_NC, WTD_TIF
@@ -148,3 +155,279 @@ def test_reprojection_nc_single_variable(tmp_path):
         assert dst.crs.to_epsg() == 4326
         assert dst.shape == (spec.shape[0], spec.shape[1])
         assert dst.count == 86
+
+
+@pytest.fixture
+def categorical_geotiff(tmp_path):
+    path = tmp_path / 'categorical.tif'
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 6, size=(60, 80)).astype('int16')
+    data[:7, :9] = -1
+
+    with rio.open(
+        path,
+        'w',
+        driver='GTiff',
+        height=60,
+        width=80,
+        count=1,
+        dtype='int16',
+        nodata=-1,
+        crs='EPSG:4326',
+        transform=Affine(0.5, 0.0, -20.0, 0.0, -0.5, 15.0),
+    ) as dst:
+        dst.write(data, 1)
+
+    return path
+
+
+@pytest.mark.parametrize('resampling', [Resampling.average, Resampling.min, Resampling.max])
+def test_reprojection_aggregation_matches_warp(categorical_geotiff, tmp_path, resampling):
+    spec = SpatialSpec(
+        crs=CRS.from_epsg(4326),
+        transform=Affine(2.0, 0.0, -18.0, 0.0, -2.0, 13.0),
+        shape=(14, 18),
+    )
+
+    Reprojector(categorical_geotiff, resampling=resampling, dst_dtype='float32')(tmp_path / 'fast.tif', spec)
+    Reprojector(categorical_geotiff, resampling=resampling, dst_dtype='float32', aggregate=False)(
+        tmp_path / 'warp.tif',
+        spec,
+    )
+
+    with rio.open(tmp_path / 'fast.tif') as fast, rio.open(tmp_path / 'warp.tif') as warp:
+        np.testing.assert_allclose(fast.read(1), warp.read(1), rtol=1e-6)
+
+
+def test_reprojection_aggregation_mode(categorical_geotiff, tmp_path):
+    spec = SpatialSpec(
+        crs=CRS.from_epsg(4326),
+        transform=Affine(2.0, 0.0, -20.0, 0.0, -2.0, 15.0),
+        shape=(15, 20),
+    )
+
+    Reprojector(categorical_geotiff, resampling=Resampling.mode)(tmp_path / 'fast.tif', spec)
+    Reprojector(categorical_geotiff, resampling=Resampling.mode, aggregate=False)(tmp_path / 'warp.tif', spec)
+
+    with rio.open(categorical_geotiff) as src:
+        blocks = src.read(1).reshape(15, 4, 20, 4).transpose(0, 2, 1, 3).reshape(15, 20, 16)
+
+    # GDAL breaks ties between equally frequent values differently, so only compare blocks with a single mode
+    counts = np.stack([(blocks == v).sum(axis=-1) for v in range(6)], axis=-1)
+    unique_mode = (counts == counts.max(axis=-1, keepdims=True)).sum(axis=-1) == 1
+
+    with rio.open(tmp_path / 'fast.tif') as fast, rio.open(tmp_path / 'warp.tif') as warp:
+        np.testing.assert_array_equal(fast.read(1)[unique_mode], warp.read(1)[unique_mode])
+
+
+def test_reprojection_aggregation_outside_source_is_nodata(categorical_geotiff, tmp_path):
+    spec = SpatialSpec(
+        crs=CRS.from_epsg(4326),
+        transform=Affine(2.0, 0.0, -22.0, 0.0, -2.0, 17.0),
+        shape=(18, 22),
+    )
+
+    Reprojector(categorical_geotiff, resampling=Resampling.average, dst_dtype='float32')(tmp_path / 'out.tif', spec)
+
+    with rio.open(tmp_path / 'out.tif') as dst:
+        data = dst.read(1)
+        assert (data[0] == -1).all()
+        assert (data[:, 0] == -1).all()
+        assert (data[1:, 1:] != -1).any()
+
+
+def test_reprojection_aggregation_sum_is_exact(categorical_geotiff, tmp_path):
+    spec = SpatialSpec(
+        crs=CRS.from_epsg(4326),
+        transform=Affine(5.0, 0.0, -20.0, 0.0, -5.0, 15.0),
+        shape=(6, 8),
+    )
+
+    Reprojector(categorical_geotiff, resampling=Resampling.sum, dst_dtype='float64')(tmp_path / 'sum.tif', spec)
+
+    with rio.open(categorical_geotiff) as src:
+        data = src.read(1, masked=True)
+    with rio.open(tmp_path / 'sum.tif') as dst:
+        assert dst.read(1).sum() == data.sum()
+
+
+def test_reprojection_auto_warp_settings(sample_geotiff, sample_spatial_spec, tmp_path, capsys):
+    output_path = tmp_path / 'output.tif'
+
+    Reprojector(sample_geotiff, warp_mem_limit='auto', num_threads='auto')(output_path, sample_spatial_spec)
+
+    assert 'Auto warp settings: warp_mem_limit=' in capsys.readouterr().out
+    with rio.open(output_path) as src:
+        assert src.shape == sample_spatial_spec.shape
+
+
+def test_reprojection_resumes_after_interruption(sample_geotiff, sample_spatial_spec, tmp_path, mocker):
+    output_path = tmp_path / 'output.tif'
+    processor = Reprojector(sample_geotiff, warp_mem_limit=8)
+
+    reproject = rasterio.warp.reproject
+    calls = []
+
+    def interrupted(*args, **kwargs):
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        calls.append(1)
+        return reproject(*args, **kwargs)
+
+    mocker.patch('rasterio.warp.reproject', side_effect=interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        processor(output_path, sample_spatial_spec)
+    assert not output_path.exists()
+
+    spy = mocker.patch('rasterio.warp.reproject', side_effect=reproject)
+    processor(output_path, sample_spatial_spec)
+    assert output_path.exists()
+    resumed_calls = spy.call_count
+
+    reference_path = tmp_path / 'reference.tif'
+    Reprojector(sample_geotiff, warp_mem_limit=8)(reference_path, sample_spatial_spec)
+    n_windows = spy.call_count - resumed_calls
+
+    # The second run skipped the windows written before the interruption
+    assert n_windows > 3
+    assert resumed_calls == n_windows - 3
+    with rio.open(output_path) as result, rio.open(reference_path) as reference:
+        np.testing.assert_array_equal(result.read(), reference.read())
+
+
+def test_reprojection_resumes_with_other_windows(sample_geotiff, sample_spatial_spec, tmp_path, mocker):
+    output_path = tmp_path / 'output.tif'
+    processor = Reprojector(sample_geotiff)
+
+    reproject = rasterio.warp.reproject
+    calls = []
+
+    def interrupted(*args, **kwargs):
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        calls.append(1)
+        return reproject(*args, **kwargs)
+
+    mocker.patch('rasterio.warp.reproject', side_effect=interrupted)
+    with set_config(warp_mem_limit=1), pytest.raises(KeyboardInterrupt):
+        processor(output_path, sample_spatial_spec)
+
+    # Larger windows, which do not line up with those written before the interruption
+    mocker.patch('rasterio.warp.reproject', side_effect=reproject)
+    with set_config(warp_mem_limit=3):
+        processor(output_path, sample_spatial_spec)
+        Reprojector(sample_geotiff)(tmp_path / 'reference.tif', sample_spatial_spec)
+
+    with rio.open(output_path) as result, rio.open(tmp_path / 'reference.tif') as reference:
+        np.testing.assert_array_equal(result.read(), reference.read())
+
+
+def test_reprojection_restarts_after_source_change(sample_geotiff, sample_spatial_spec, tmp_path, mocker):
+    output_path = tmp_path / 'output.tif'
+    processor = Reprojector(sample_geotiff, warp_mem_limit=8)
+
+    reproject = rasterio.warp.reproject
+    calls = []
+
+    def interrupted(*args, **kwargs):
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        calls.append(1)
+        return reproject(*args, **kwargs)
+
+    mocker.patch('rasterio.warp.reproject', side_effect=interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        processor(output_path, sample_spatial_spec)
+
+    stat = os.stat(sample_geotiff)
+    os.utime(sample_geotiff, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    spy = mocker.patch('rasterio.warp.reproject', side_effect=reproject)
+    processor(output_path, sample_spatial_spec)
+    restarted_calls = spy.call_count
+
+    Reprojector(sample_geotiff, warp_mem_limit=8)(tmp_path / 'reference.tif', sample_spatial_spec)
+
+    # No window written from the previous version of the source is kept
+    assert restarted_calls == spy.call_count - restarted_calls
+
+def test_reprojection_downcast(categorical_geotiff, tmp_path):
+    spec = SpatialSpec(
+        crs=CRS.from_epsg(4326),
+        transform=Affine(1.0, 0.0, -22.0, 0.0, -1.0, 17.0),
+        shape=(34, 44),
+    )
+
+    Reprojector(categorical_geotiff, downcast=True)(tmp_path / 'downcast.tif', spec)
+    Reprojector(categorical_geotiff)(tmp_path / 'plain.tif', spec)
+
+    with rio.open(tmp_path / 'downcast.tif') as downcast, rio.open(tmp_path / 'plain.tif') as plain:
+        assert downcast.dtypes[0] == 'int8'
+        assert downcast.nodata == -1
+        np.testing.assert_array_equal(downcast.read(1), plain.read(1))
+
+
+def test_reprojection_quantize(sample_geotiff, tmp_path):
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(10.0, 0.0, -180.0, 0.0, -10.0, 90.0), shape=(18, 36))
+
+    Reprojector(sample_geotiff, quantize=0.001)(tmp_path / 'quantized.tif', spec)
+    Reprojector(sample_geotiff)(tmp_path / 'plain.tif', spec)
+
+    with rio.open(tmp_path / 'quantized.tif') as quantized:
+        assert quantized.dtypes[0] == 'uint16'
+        assert quantized.tags(1, 'IMAGE_STRUCTURE')['NBITS'] == '9'
+
+    driver = RioXArrayDriver()
+    np.testing.assert_allclose(
+        driver(tmp_path / 'quantized.tif').values,
+        driver(tmp_path / 'plain.tif').values,
+        atol=0.001 + 1e-9,
+    )
+
+
+def test_reprojection_statistics(categorical_geotiff, tmp_path):
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(1.0, 0.0, -22.0, 0.0, -1.0, 17.0), shape=(34, 44))
+
+    Reprojector(categorical_geotiff, warp_mem_limit=1, histogram_bins=range(7))(tmp_path / 'output.tif', spec)
+
+    with rio.open(tmp_path / 'output.tif') as src:
+        data = src.read(1)
+    values = data[data != -1]
+
+    [stats] = read_statistics(tmp_path / 'output.tif')
+    assert (stats.minimum, stats.maximum) == (values.min(), values.max())
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.std == pytest.approx(values.std())
+    assert stats.valid_percent == pytest.approx(100 * values.size / data.size)
+    assert stats.histogram == tuple(np.bincount(values, minlength=6))
+
+
+def test_reprojection_statistics_quantized(sample_geotiff, tmp_path):
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(10.0, 0.0, -180.0, 0.0, -10.0, 90.0), shape=(18, 36))
+
+    Reprojector(sample_geotiff, quantize=0.001)(tmp_path / 'quantized.tif', spec)
+    values = RioXArrayDriver()(tmp_path / 'quantized.tif').values
+
+    [stats] = read_statistics(tmp_path / 'quantized.tif')
+    assert stats.minimum == pytest.approx(np.nanmin(values))
+    assert stats.maximum == pytest.approx(np.nanmax(values))
+    assert stats.mean == pytest.approx(np.nanmean(values))
+
+
+def test_reprojection_downcast_kernel_reach(tmp_path):
+    # The column just east of the spec is only read by the bilinear kernel of the easternmost pixels
+    data = np.full((10, 10), 10, dtype='uint16')
+    data[:, 8] = 60000
+    src_path = tmp_path / 'edge.tif'
+    profile = {'driver': 'GTiff', 'count': 1, 'dtype': 'uint16', 'crs': 'EPSG:4326'}
+    with rio.open(src_path, 'w', height=10, width=10, transform=Affine(1, 0, 0, 0, -1, 10), **profile) as dst:
+        dst.write(data, 1)
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.25, 0, 0, 0, -0.25, 10), shape=(40, 32))
+
+    Reprojector(src_path, resampling=Resampling.bilinear, downcast=True)(tmp_path / 'downcast.tif', spec)
+    Reprojector(src_path, resampling=Resampling.bilinear)(tmp_path / 'plain.tif', spec)
+
+    with rio.open(tmp_path / 'downcast.tif') as downcast, rio.open(tmp_path / 'plain.tif') as plain:
+        assert plain.read(1).max() > 255
+        assert downcast.dtypes[0] == 'uint16'
+        np.testing.assert_array_equal(downcast.read(1), plain.read(1))
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+import rasterio as rio
+import rasterio.shutil
+from affine import Affine
+from pyproj import CRS
+from rasterio.io import MemoryFile
+
+from pygeodata.config import set_config
+from pygeodata.loader import DataLoader
+from pygeodata.processors import SubdatasetReprojector
+from pygeodata.types import SpatialSpec
+
+
+@pytest.fixture
+def multi_variable_nc(tmp_path):
+    """NetCDF file with the variables Band1, Band2 and Band3, holding 1, 2 and 3."""
+    path = tmp_path / 'multi.nc'
+    data = np.stack([np.full((20, 40), i, dtype='float32') for i in (1, 2, 3)])
+
+    with MemoryFile() as memfile:
+        with memfile.open(
+            driver='GTiff',
+            height=20,
+            width=40,
+            count=3,
+            dtype='float32',
+            nodata=-9999,
+            crs='EPSG:4326',
+            transform=Affine(9.0, 0.0, -180.0, 0.0, -9.0, 90.0),
+        ) as dst:
+            dst.write(data)
+        # The netCDF driver writes every band as a variable
+        rasterio.shutil.copy(memfile.name, path, driver='netCDF')
+
+    return path
+
+
+@pytest.fixture
+def subdataset_spec():
+    return SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(18.0, 0.0, -180.0, 0.0, -18.0, 90.0), shape=(10, 20))
+
+
+@pytest.mark.parametrize('combine', [False, True])
+def test_subdataset_reprojector(tmp_path, multi_variable_nc, subdataset_spec, combine):
+    class ClimateLoader(DataLoader):
+        processor = SubdatasetReprojector(
+            multi_variable_nc,
+            variables=['Band1', 'Band3'],
+            reprojector_kw={'resampling': rio.enums.Resampling.average},
+            combine=combine,
+        )
+
+    with set_config(path_data_processed=tmp_path / 'processed'):
+        ds = ClimateLoader()(subdataset_spec)
+        path = ClimateLoader().get_processed_path(subdataset_spec)
+
+    assert path.suffix == ('.zarr' if combine else '.dir')
+    assert set(ds.data_vars) == {'Band1', 'Band3'}
+    assert ds['Band1'].chunks is not None
+    assert ds['Band1'].shape == subdataset_spec.shape
+    np.testing.assert_array_equal(ds['Band1'].values, 1)
+    np.testing.assert_array_equal(ds['Band3'].values, 3)
+    assert ds.rio.crs == subdataset_spec.crs
+
+
+def test_subdataset_reprojector_missing_variable(tmp_path, multi_variable_nc, subdataset_spec):
+    with pytest.raises(ValueError, match='Band4'):
+        SubdatasetReprojector(multi_variable_nc, variables=['Band1', 'Band4'])(tmp_path / 'out.dir', subdataset_spec)
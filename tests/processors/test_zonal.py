@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+import rasterio as rio
+from affine import Affine
+from pyproj import CRS
+
+from pygeodata.config import set_config
+from pygeodata.loader import DataLoader
+from pygeodata.processors import Rasterizer, ZonalStatistics
+from pygeodata.types import SpatialSpec
+
+
+@pytest.fixture
+def zonal_spec():
+    return SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.25, 0.0, -6.0, 0.0, -0.25, 6.0), shape=(48, 48))
+
+
+@pytest.fixture
+def value_geotiff(tmp_path, zonal_spec):
+    path = tmp_path / 'values.tif'
+    data = np.random.default_rng(0).normal(size=zonal_spec.shape).astype('float32')
+    data[:, :3] = -9999
+
+    with rio.open(
+        path,
+        'w',
+        driver='GTiff',
+        height=zonal_spec.shape[0],
+        width=zonal_spec.shape[1],
+        count=1,
+        dtype='float32',
+        nodata=-9999,
+        crs=zonal_spec.crs,
+        transform=zonal_spec.transform,
+    ) as dst:
+        dst.write(data, 1)
+
+    return path
+
+
+def test_zonal_statistics(tmp_path, sample_vector, value_geotiff, zonal_spec):
+    class ZonesLoader(DataLoader):
+        processor = Rasterizer(sample_vector, column='value', fill_value=-1, all_touched=False)
+
+    class StatsLoader(DataLoader):
+        processor = ZonalStatistics(ZonesLoader(), value_geotiff, zone_nodata=-1, bins=[-1, 0, 1], strip_rows=5)
+
+    with set_config(path_data_processed=tmp_path):
+        df = StatsLoader()(zonal_spec)
+        zones_path = ZonesLoader().get_processed_path(zonal_spec)
+
+    with rio.open(zones_path) as src:
+        zones = src.read(1).ravel()
+    with rio.open(value_geotiff) as src:
+        values = src.read(1).ravel().astype(np.float64)
+
+    valid = (zones != -1) & (values != -9999)
+    expected = pd.Series(values[valid]).groupby(zones[valid]).agg(['count', 'sum', 'mean', 'min', 'max'])
+
+    assert isinstance(df, pd.DataFrame)
+    np.testing.assert_array_equal(df.index, expected.index)
+    for column in expected.columns:
+        np.testing.assert_allclose(df[column], expected[column])
+
+    hist = df[['hist_0', 'hist_1']].sum(axis=1)
+    assert (hist <= df['count']).all()
+    assert hist.sum() == ((values[valid] >= -1) & (values[valid] <= 1)).sum()
+
+
+def test_zonal_statistics_grid_mismatch(tmp_path, value_geotiff, sample_geotiff, zonal_spec):
+    with pytest.raises(ValueError):
+        ZonalStatistics(sample_geotiff, value_geotiff)(tmp_path / 'stats.parquet', zonal_spec)
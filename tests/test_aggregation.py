@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from affine import Affine
+
+from pygeodata.aggregation import PointAccumulator, aggregation_factors, block_reduce, valid_mask
+
+
+def test_aggregation_factors_aligned():
+    src = Affine(0.1, 0.0, -180.0, 0.0, -0.1, 90.0)
+    dst = Affine(0.5, 0.0, -179.0, 0.0, -0.5, 89.0)
+    assert aggregation_factors(src, dst) == (5, 5, 10, 10)
+
+
+def test_aggregation_factors_identity():
+    t = Affine(0.1, 0.0, -180.0, 0.0, -0.1, 90.0)
+    assert aggregation_factors(t, t) == (1, 1, 0, 0)
+
+
+def test_aggregation_factors_misaligned():
+    src = Affine(0.1, 0.0, -180.0, 0.0, -0.1, 90.0)
+    assert aggregation_factors(src, Affine(0.5, 0.0, -179.95, 0.0, -0.5, 90.0)) is None
+    assert aggregation_factors(src, Affine(0.25, 0.0, -180.0, 0.0, -0.25, 90.0)) is None
+    assert aggregation_factors(src, Affine(0.05, 0.0, -180.0, 0.0, -0.05, 90.0)) is None
+
+
+@pytest.mark.parametrize(
+    'method, expected',
+    [
+        ('mean', [[2.5, 5.0]]),
+        ('sum', [[10.0, 5.0]]),
+        ('min', [[1, 5]]),
+        ('max', [[4, 5]]),
+    ],
+)
+def test_block_reduce_nodata_aware(method, expected):
+    data = np.array([[1, 2, 5, -1], [3, 4, -1, -1]])
+    result = block_reduce(data, valid_mask(data, -1), (2, 2), method, fill=-1)
+    np.testing.assert_allclose(result, expected)
+
+
+def test_block_reduce_mode():
+    data = np.array([[1, 2, 7, 7], [2, 2, 7, 0], [0, 0, 0, 0], [0, 0, 0, 3]])
+    result = block_reduce(data, valid_mask(data, 0), (2, 2), 'mode', fill=0)
+    np.testing.assert_array_equal(result, [[2, 7], [0, 3]])
+
+
+def test_block_reduce_empty_block_is_filled():
+    data = np.array([[np.nan, np.nan], [np.nan, np.nan]])
+    result = block_reduce(data, valid_mask(data, None), (2, 2), 'mean', fill=np.nan)
+    assert np.isnan(result).all()
+
+
+@pytest.mark.parametrize(
+    'statistic, expected',
+    [
+        ('count', [[2, 0], [0, 1]]),
+        ('sum', [[4.0, -9], [-9, 5.0]]),
+        ('mean', [[2.0, -9], [-9, 5.0]]),
+        ('min', [[1.0, -9], [-9, 5.0]]),
+        ('max', [[3.0, -9], [-9, 5.0]]),
+    ],
+)
+def test_point_accumulator(statistic, expected):
+    accumulator = PointAccumulator((2, 2), statistic)
+    accumulator.add(np.array([0, 0, 5]), np.array([0, 0, 0]), np.array([1.0, 3.0, 7.0]))
+    accumulator.add(np.array([1, 1]), np.array([1, -1]), np.array([5.0, 2.0]))
+    accumulator.add(np.array([1]), np.array([1]), np.array([np.nan]))
+
+    np.testing.assert_array_equal(accumulator.result(fill=-9), expected)
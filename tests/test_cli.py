@@ -0,0 +1,95 @@
+import json
+import textwrap
+
+import pytest
+
+from pygeodata.cli import import_loaders, main, read_specs
+
+LOADERS_MODULE = '''
+from pathlib import Path
+
+from pygeodata import DataLoader
+
+
+class TextLoader(DataLoader):
+    ext = 'txt'
+
+    def __init__(self, text):
+        self.text = text
+
+    @property
+    def processor(self):
+        def processor(path, spec):
+            if self.text == 'fail':
+                raise RuntimeError('Failing on purpose')
+            Path(path).write_text(self.text)
+
+        return processor
+
+
+a = TextLoader('a')
+b = TextLoader('b')
+'''
+
+SPEC_ARGS = ['--crs', 'EPSG:4326', '--transform', '1', '0', '-180', '0', '-1', '90', '--shape', '180', '360']
+
+
+@pytest.fixture
+def loaders_module(tmp_path):
+    path = tmp_path / 'loaders.py'
+    path.write_text(textwrap.dedent(LOADERS_MODULE))
+    return path
+
+
+def test_import_loaders(loaders_module):
+    assert [loader.text for loader in import_loaders(str(loaders_module))] == ['a', 'b']
+    assert [loader.text for loader in import_loaders(f'{loaders_module}:b')] == ['b']
+
+
+def test_read_specs(tmp_path):
+    path = tmp_path / 'specs.json'
+    spec = {'crs': 'EPSG:4326', 'transform': [1, 0, -180, 0, -1, 90], 'shape': [180, 360]}
+    path.write_text(json.dumps([spec, {**spec, 'shape': [90, 180]}]))
+
+    specs = read_specs(path)
+    assert [s.shape for s in specs] == [(180, 360), (90, 180)]
+    assert specs[0].crs.to_epsg() == 4326
+
+
+def test_main(loaders_module, tmp_path, capsys):
+    argv = [str(loaders_module), *SPEC_ARGS, '--data-dir', str(tmp_path / 'processed'), '-j', '2']
+
+    assert main(argv) == 0
+    out = capsys.readouterr().out
+    assert out.count('Done: ') == 2
+    assert 'Mpixel/s' in out
+    assert sorted(p.read_text() for p in (tmp_path / 'processed').rglob('*.txt')) == ['a', 'b']
+
+    assert main(argv) == 0
+    out = capsys.readouterr().out
+    assert out.count('Skipping: ') == 2
+    assert 'Processing 0 tasks' in out
+
+
+def test_main_failure(loaders_module, tmp_path, capsys):
+    with open(loaders_module, 'a') as f:
+        f.write("c = TextLoader('fail')\n")
+
+    assert main([str(loaders_module), *SPEC_ARGS, '--data-dir', str(tmp_path / 'processed')]) == 1
+    out = capsys.readouterr().out
+    assert 'Failed: ' in out
+    assert 'Failing on purpose' in out
+
+
+def test_main_requires_spec(loaders_module):
+    with pytest.raises(SystemExit):
+        main([str(loaders_module), '--crs', 'EPSG:4326'])
+
+
+def test_main_local_cluster(loaders_module, tmp_path, capsys):
+    pytest.importorskip('distributed')
+    argv = [str(loaders_module), *SPEC_ARGS, '--data-dir', str(tmp_path / 'processed'), '--scheduler', 'local']
+
+    assert main(argv) == 0
+    assert capsys.readouterr().out.count('Done: ') == 2
+    assert sorted(p.read_text() for p in (tmp_path / 'processed').rglob('*.txt')) == ['a', 'b']
@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import pytest
+
+distributed = pytest.importorskip('distributed')
+
+from pygeodata import process_distributed  # noqa: E402
+from pygeodata.cluster import product_key, submit_graph  # noqa: E402
+from pygeodata.config import set_config  # noqa: E402
+from pygeodata.loader import DataLoader  # noqa: E402
+
+
+# Module level, as the loaders are serialized even when the workers run in this process
+CALLS = []
+
+
+class TextLoader(DataLoader):
+    ext = 'txt'
+
+    def __init__(self, text, inputs=()):
+        self.text = text
+        self._inputs = inputs
+
+    @property
+    def processor(self):
+        def processor(path, spec):
+            if self.text == 'Failing':
+                raise RuntimeError('Failing on purpose')
+            CALLS.append(self.text)
+            Path(path).write_text(self.text)
+
+        return processor
+
+    @property
+    def inputs(self):
+        return self._inputs
+
+
+@pytest.fixture(scope='module')
+def client():
+    with distributed.Client(processes=False, n_workers=2, threads_per_worker=1, dashboard_address=None) as client:
+        yield client
+
+
+def test_process_distributed(client, sample_spatial_spec, tmp_path):
+    dem = TextLoader('Dem')
+    slope = TextLoader('Slope', inputs=(dem,))
+    aspect = TextLoader('Aspect', inputs=(dem,))
+
+    with set_config(path_data_processed=tmp_path):
+        finished = [loader.text for loader in process_distributed([slope, aspect], sample_spatial_spec, client)]
+
+        assert finished[0] == 'Dem'
+        assert sorted(finished) == ['Aspect', 'Dem', 'Slope']
+        assert slope.get_processed_path(sample_spatial_spec).read_text() == 'Slope'
+
+
+def test_submit_graph_deduplicates_products(client, sample_spatial_spec, tmp_path):
+    CALLS.clear()
+    dem = TextLoader('Dem')
+
+    with set_config(path_data_processed=tmp_path):
+        first = submit_graph(client, [dem], sample_spatial_spec)
+        second = submit_graph(client, [dem], sample_spatial_spec)
+        key = product_key(dem, sample_spatial_spec)
+
+    [path] = first
+    assert first[path].key == second[path].key == key
+    assert first[path].result() == path
+    assert CALLS == ['Dem']
+
+
+def test_process_distributed_raises(client, sample_spatial_spec, tmp_path):
+    with set_config(path_data_processed=tmp_path), pytest.raises(RuntimeError, match='on purpose'):
+        list(process_distributed([TextLoader('Failing')], sample_spatial_spec, client))
@@ -1,8 +1,11 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 
-from pygeodata.config import Config, get_config, set_config
+from pygeodata.config import Config, bind_config, get_config, set_config
 
 
 def test_default_config():
@@ -27,3 +30,42 @@ def test_config_invalid_key():
     with pytest.raises(ValueError):
         with set_config(invalid_key='value'):
             pass
+
+
+def test_set_config_is_thread_local():
+    barrier = threading.Barrier(2)
+    seen = {}
+
+    def worker(name):
+        with set_config(path_data_processed=Path(name)):
+            barrier.wait()
+            seen[name] = get_config().path_data_processed
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in ('a', 'b')]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert seen == {'a': Path('a'), 'b': Path('b')}
+    assert get_config().path_data_processed == Path('data_processed')
+
+
+def test_set_config_is_task_local():
+    async def worker(name):
+        with set_config(num_threads=name):
+            await asyncio.sleep(0.01)
+            return get_config().num_threads
+
+    async def main():
+        return await asyncio.gather(worker(2), worker(3))
+
+    assert asyncio.run(main()) == [2, 3]
+
+
+def test_bind_config():
+    with set_config(num_threads=4):
+        bound = bind_config(lambda: get_config().num_threads)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert list(executor.map(lambda _: bound(), range(4))) == [4, 4, 4, 4]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from pygeodata.encoding import ValueRange, choose_encoding
+
+
+def value_range(*values, nodata=None):
+    r = ValueRange()
+    r.add(np.array(values), nodata)
+    return r
+
+
+def test_value_range():
+    r = value_range(3.0, -1.0, np.nan, 7.0, nodata=-1.0)
+    assert (r.min, r.max) == (3.0, 7.0)
+    assert r.integral
+    assert r.float32_exact
+
+    r.add(np.array([0.1]), None)
+    assert r.min == 0.1
+    assert not r.integral
+    assert not r.float32_exact
+
+
+@pytest.mark.parametrize(
+    'values, dtype, nodata, expected',
+    [
+        ((0, 5, 200), 'int64', None, ('uint8', None, None)),
+        ((0, 5, 100), 'int64', None, ('uint8', None, 7)),
+        ((-3, 100), 'int64', -9999, ('int16', -9999, None)),
+        ((0, 5), 'float64', np.nan, ('uint8', 6, 3)),
+        ((0, 1), 'uint8', None, ('uint8', None, 1)),
+        ((0, 70000), 'int32', None, ('uint32', None, 17)),
+    ],
+)
+def test_choose_encoding_integers(values, dtype, nodata, expected):
+    encoding = choose_encoding([value_range(*values)], dtype, nodata)
+    assert (encoding.dtype, encoding.nodata, encoding.nbits) == (np.dtype(expected[0]), *expected[1:])
+    assert encoding.scales is None
+
+
+def test_choose_encoding_keeps_dtype_without_gain():
+    encoding = choose_encoding([value_range(-100, 100)], 'int8', None)
+    assert encoding.dtype == np.int8
+
+
+def test_choose_encoding_float32():
+    assert choose_encoding([value_range(0.5, 0.25)], 'float64', np.nan).dtype == np.float32
+    assert choose_encoding([value_range(0.1)], 'float64', np.nan).dtype == np.float64
+
+
+def test_choose_encoding_quantize():
+    rng = np.random.default_rng(0)
+    data = rng.uniform(-5, 5, size=(2, 20, 20))
+    data[0, 0, 0] = np.nan
+    ranges = [value_range(*band.ravel()) for band in data]
+
+    encoding = choose_encoding(ranges, 'float64', np.nan, quantize=0.01)
+    assert encoding.dtype == np.uint16
+    assert encoding.nbits == 9
+
+    encoded = encoding.encode(data, np.nan)
+    assert encoded[0, 0, 0] == encoding.nodata
+    decoded = encoded * np.array(encoding.scales)[:, None, None] + np.array(encoding.offsets)[:, None, None]
+    decoded[encoded == encoding.nodata] = np.nan
+    np.testing.assert_allclose(decoded, data, atol=0.01 + 1e-12)
+    assert np.isnan(decoded[0, 0, 0])
+
+
+def test_encode_clips_to_valid_range():
+    encoding = choose_encoding([value_range(0, 200)], 'float64', np.nan)
+    assert (encoding.dtype, encoding.nodata) == (np.uint8, 201)
+
+    encoded = encoding.encode(np.array([-5.0, 100.0, 300.0, np.nan]), np.nan)
+    np.testing.assert_array_equal(encoded, [0, 100, 200, 201])
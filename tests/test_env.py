@@ -0,0 +1,50 @@
+from rasterio.env import get_gdal_config
+
+from pygeodata.config import set_config
+from pygeodata.env import gdal_env, with_gdal_env
+from pygeodata.loader import DataLoader
+from pygeodata.options import GDALOptions
+
+
+def test_gdal_options_to_dict():
+    options = GDALOptions(cachemax=512, vsi_cache=True, extra={'CPL_DEBUG': 'ON'})
+    assert options.to_dict() == {'GDAL_CACHEMAX': 512, 'VSI_CACHE': True, 'CPL_DEBUG': 'ON'}
+
+
+def test_gdal_options_auto():
+    options = GDALOptions.auto(num_threads=2)
+    assert options.num_threads == 2
+    assert options.cachemax > 0
+    assert options.vsi_cache
+
+
+def test_gdal_env():
+    with set_config(gdal_options=GDALOptions(cachemax=123, swath_size=2**20)):
+        with gdal_env():
+            assert get_gdal_config('GDAL_CACHEMAX') == 123
+            assert get_gdal_config('GDAL_SWATH_SIZE') == 2**20
+    assert get_gdal_config('GDAL_SWATH_SIZE') is None
+
+
+def test_gdal_env_applied_to_processor(tmp_path, sample_spatial_spec):
+    seen = {}
+
+    class EnvLoader(DataLoader):
+        ext = 'txt'
+
+        @property
+        def processor(self):
+            def processor(path, spec):
+                seen['process'] = get_gdal_config('GDAL_NUM_THREADS')
+
+            return processor
+
+        @property
+        def driver(self):
+            return with_gdal_env(lambda path: get_gdal_config('GDAL_NUM_THREADS'))
+
+    with set_config(path_data_processed=tmp_path, gdal_options=GDALOptions(num_threads='ALL_CPUS')):
+        loader = EnvLoader()
+        loader.process(sample_spatial_spec)
+        assert seen['process'] == 'ALL_CPUS'
+        assert loader.load(sample_spatial_spec) == 'ALL_CPUS'
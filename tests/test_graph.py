@@ -0,0 +1,115 @@
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from pygeodata import process_graph
+from pygeodata.config import set_config
+from pygeodata.graph import resolve_graph
+from pygeodata.loader import DataLoader
+
+
+def make_loader(name, inputs=(), log=None, barrier=None):
+    class Loader(DataLoader):
+        ext = 'txt'
+
+        @property
+        def processor(self):
+            def processor(path, spec):
+                if barrier is not None:
+                    barrier.wait(timeout=5)
+                if log is not None:
+                    log.append(name)
+                Path(path).write_text(name)
+
+            return processor
+
+        @property
+        def inputs(self):
+            return inputs
+
+    Loader.__name__ = f'{name}Loader'
+    return Loader()
+
+
+@pytest.fixture
+def pipeline():
+    log = []
+    dem = make_loader('Dem', log=log)
+    slope = make_loader('Slope', inputs=(dem,), log=log)
+    aspect = make_loader('Aspect', inputs=(dem,), log=log)
+    mask = make_loader('Mask', inputs=(slope, aspect), log=log)
+    return log, dem, slope, aspect, mask
+
+
+def test_resolve_graph_order(pipeline, sample_spatial_spec, tmp_path):
+    _, dem, slope, aspect, mask = pipeline
+    with set_config(path_data_processed=tmp_path):
+        graph = resolve_graph([mask], sample_spatial_spec)
+        order = [node.loader.class_name for node in graph.values()]
+
+    assert order == ['Dem', 'Slope', 'Aspect', 'Mask']
+
+
+def test_resolve_graph_cycle(sample_spatial_spec, tmp_path):
+    inputs = []
+    a = make_loader('A', inputs=inputs)
+    b = make_loader('B', inputs=(a,))
+    inputs.append(b)
+
+    with set_config(path_data_processed=tmp_path), pytest.raises(ValueError):
+        resolve_graph([a], sample_spatial_spec)
+
+
+def test_process_graph(pipeline, sample_spatial_spec, tmp_path):
+    log, dem, slope, aspect, mask = pipeline
+    with set_config(path_data_processed=tmp_path):
+        processed = process_graph([mask], sample_spatial_spec)
+
+        # Slope and Aspect run concurrently, so only the order of the other loaders is fixed
+        assert {loader.class_name for loader in processed} == set(log)
+        assert processed[0].class_name == 'Dem'
+        assert processed[-1].class_name == 'Mask'
+        assert log[0] == 'Dem'
+        assert log[-1] == 'Mask'
+        assert set(log) == {'Dem', 'Slope', 'Aspect', 'Mask'}
+
+        log.clear()
+        assert process_graph([mask], sample_spatial_spec) == []
+        assert log == []
+
+
+def test_process_graph_rebuilds_downstream(pipeline, sample_spatial_spec, tmp_path):
+    log, dem, slope, aspect, mask = pipeline
+    with set_config(path_data_processed=tmp_path):
+        process_graph([mask], sample_spatial_spec)
+
+        # Slope changed, so the mask depending on it must follow, but the DEM and aspect not
+        slope_path = slope.get_processed_path(sample_spatial_spec)
+        mtime = slope_path.stat().st_mtime + 10
+        os.utime(slope_path, (mtime, mtime))
+
+        log.clear()
+        process_graph([mask], sample_spatial_spec)
+        assert log == ['Mask']
+
+        # A missing DEM is rebuilt together with everything downstream
+        dem.get_processed_path(sample_spatial_spec).unlink()
+        log.clear()
+        process_graph([mask], sample_spatial_spec)
+        assert log[0] == 'Dem'
+        assert sorted(log[1:3]) == ['Aspect', 'Slope']
+        assert log[3] == 'Mask'
+
+
+def test_process_graph_parallel_branches(sample_spatial_spec, tmp_path):
+    # Both branches must be running at the same time to pass the barrier
+    barrier = threading.Barrier(2)
+    a = make_loader('A', barrier=barrier)
+    b = make_loader('B', barrier=barrier)
+
+    with set_config(path_data_processed=tmp_path):
+        processed = process_graph([a, b], sample_spatial_spec, max_workers=2)
+
+    assert len(processed) == 2
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+import pytest
+
+import pygeodata
+
+
+def _imported_modules(statement: str, modules: list[str]) -> set[str]:
+    script = f'import sys\n{statement}\nprint(",".join(m for m in {modules!r} if m in sys.modules))'
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    return set(filter(None, out.strip().split(',')))
+
+
+def test_import_pygeodata_is_lazy():
+    heavy = ['rasterio', 'pyproj', 'numpy', 'xarray', 'rioxarray', 'geopandas']
+    assert _imported_modules('import pygeodata', heavy) == set()
+
+
+def test_import_reprojector_skips_vector_and_xarray():
+    heavy = ['xarray', 'rioxarray', 'geopandas']
+    assert _imported_modules('from pygeodata.processors import Reprojector', heavy) == set()
+
+
+def test_lazy_attributes():
+    from pygeodata.loader import DataLoader
+
+    assert pygeodata.DataLoader is DataLoader
+    assert 'DataLoader' in dir(pygeodata)
+
+    with pytest.raises(AttributeError):
+        pygeodata.does_not_exist
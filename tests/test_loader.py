@@ -1,7 +1,11 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
 
+import pytest
+
 from pygeodata import load
-from pygeodata.config import set_config
+from pygeodata.config import bind_config, set_config
 from pygeodata.loader import DataLoader
 from pygeodata.types import SpatialSpec
 
@@ -280,3 +284,100 @@ def test_load(sample_loader_class, sample_spatial_spec, tmp_path):
     with set_config(path_data_processed=tmp_path):
         data = load(sample_loader_class(), spec=sample_spatial_spec)
         assert data.rio.crs == sample_spatial_spec.crs
+
+
+def test_interrupted_process_is_not_processed(sample_spatial_spec, tmp_path):
+    """Test that a product left behind by an interrupted processor is not taken as done."""
+    fail = [True]
+
+    class PartialLoader(DataLoader):
+        ext = 'txt'
+
+        @property
+        def processor(self):
+            def processor(path, spec):
+                path.write_text('partial')
+                if fail[0]:
+                    raise KeyboardInterrupt
+                path.write_text('complete')
+
+            return processor
+
+    loader = PartialLoader()
+    with set_config(path_data_processed=tmp_path):
+        with pytest.raises(KeyboardInterrupt):
+            loader.process(sample_spatial_spec)
+
+        assert loader.get_processed_path(sample_spatial_spec).exists()
+        assert not loader.is_processed(sample_spatial_spec)
+
+        fail[0] = False
+        loader.process(sample_spatial_spec)
+
+        assert loader.is_processed(sample_spatial_spec)
+        assert loader.get_processed_path(sample_spatial_spec).read_text() == 'complete'
+
+
+def test_concurrent_process_builds_product_once(sample_spatial_spec, tmp_path):
+    calls = []
+
+    class SlowLoader(DataLoader):
+        ext = 'txt'
+
+        @property
+        def processor(self):
+            def processor(path, spec):
+                calls.append(path)
+                path.write_text('partial')
+                time.sleep(0.2)
+                path.write_text('complete')
+
+            return processor
+
+    loader = SlowLoader()
+    with set_config(path_data_processed=tmp_path):
+        process = bind_config(loader.process)
+        with ThreadPoolExecutor(2) as executor:
+            list(executor.map(process, [sample_spatial_spec] * 2))
+
+        # The second waited for the first, instead of rebuilding the product or removing its marker
+        assert len(calls) == 1
+        assert loader.is_processed(sample_spatial_spec)
+        assert loader.get_processed_path(sample_spatial_spec).read_text() == 'complete'
+
+
+def test_load_ephemeral_in_memory(sample_loader_class, sample_spatial_spec, tmp_path):
+    loader = sample_loader_class()
+    with set_config(path_data_processed=tmp_path / 'ephemeral', ephemeral=True):
+        da = load(loader, sample_spatial_spec)
+        assert not loader.is_processed(sample_spatial_spec)
+
+    assert not (tmp_path / 'ephemeral').exists()
+
+    with set_config(path_data_processed=tmp_path / 'cached'):
+        expected = load(loader, sample_spatial_spec)
+
+    assert da.equals(expected)
+
+
+def test_load_ephemeral_temporary_directory(sample_spatial_spec, tmp_path):
+    paths = []
+
+    class TextProcessor:
+        def __call__(self, dst_path, spec):
+            paths.append(dst_path)
+            dst_path.write_text('done')
+
+        ext = 'txt'
+
+    class TextLoader(DataLoader):
+        processor = TextProcessor()
+
+        def driver(self, path):
+            return path.read_text()
+
+    with set_config(path_data_processed=tmp_path, ephemeral=True):
+        assert TextLoader()(sample_spatial_spec) == 'done'
+
+    assert not paths[0].exists()
+    assert not any(tmp_path.iterdir())
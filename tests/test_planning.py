@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+from pygeodata import DataLoader, plan
+from pygeodata.config import set_config
+from pygeodata.planning import Estimate, Plan, Task, schedule_tasks
+
+
+def make_task(name, cost, memory):
+    return Task(None, None, Path(name), False, 0, Estimate(read_bytes=cost, write_bytes=0, memory_bytes=memory))
+
+
+def test_schedule_tasks_largest_first():
+    tasks = [make_task(str(cost), cost, 1) for cost in (3, 9, 5, 1, 7)]
+    schedule = schedule_tasks(tasks, workers=2)
+
+    assert [s.task.cost for s in schedule] == [9, 7, 5, 3, 1]
+    assert [(s.worker, s.start) for s in schedule[:2]] == [(0, 0), (1, 0)]
+    # Each task starts on the worker that is free first
+    assert (schedule[2].worker, schedule[2].start) == (1, 7)
+
+
+def test_schedule_tasks_memory_budget():
+    tasks = [make_task('a', 10, 6), make_task('b', 8, 6), make_task('c', 5, 3), make_task('d', 4, 12)]
+    schedule = schedule_tasks(tasks, workers=3, memory_budget=10)
+    starts = {s.task.path.name: s.start for s in schedule}
+
+    # 'b' does not fit next to 'a', but the smaller 'c' does
+    assert starts == {'a': 0, 'c': 0, 'b': 10, 'd': 18}
+
+    result = Plan(tasks, schedule, workers=3, memory_budget=10)
+    assert result.over_budget == [tasks[3]]
+    assert result.peak_memory == 12
+
+
+def test_plan(sample_loader_class, sample_spatial_spec, tmp_path):
+    loader = sample_loader_class()
+    with set_config(path_data_processed=tmp_path / 'processed'):
+        result = plan([(loader, sample_spatial_spec), (loader, sample_spatial_spec)], workers=2)
+        assert not (tmp_path / 'processed').exists()
+
+        assert len(result.tasks) == 1
+        task = result.pending[0]
+        assert task.path == loader.get_processed_path(sample_spatial_spec)
+        assert task.pixels == 1800 * 3600
+        assert task.estimate.write_bytes == 1800 * 3600 * 8
+        assert task.estimate.read_bytes == 10 * 10 * 8
+        assert '1 tasks: 0 processed, 1 to process' in str(result)
+
+        loader.process(sample_spatial_spec)
+        result = plan([(loader, sample_spatial_spec)])
+        assert result.cached == result.tasks
+        assert result.schedule == []
+
+
+def test_plan_default_estimate(sample_spatial_spec, tmp_path):
+    class TextLoader(DataLoader):
+        ext = 'txt'
+
+        def processor(self, path, spec):
+            Path(path).write_text('done')
+
+    with set_config(path_data_processed=tmp_path):
+        result = plan([(TextLoader(), sample_spatial_spec)])
+
+    assert result.pending[0].estimate == Estimate(0, 1800 * 3600 * 8, 1800 * 3600 * 8)
+
+
+def test_schedule_tasks_requires_workers():
+    with pytest.raises(ValueError, match='at least one worker'):
+        schedule_tasks([make_task('a', 1, 1)], workers=0)
@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+import rasterio as rio
+from affine import Affine
+from pyproj import CRS
+from rasterio.enums import Resampling
+
+from pygeodata.aggregation import block_reduce
+from pygeodata.config import set_config
+from pygeodata.drivers import RioXArrayDriver
+from pygeodata.loader import DataLoader
+from pygeodata.processors import Reprojector
+from pygeodata.pyramid import Pyramid
+from pygeodata.statistics import read_statistics
+from pygeodata.types import SpatialSpec
+
+BASE = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.5, 0, -10, 0, -0.5, 10), shape=(40, 30))
+
+
+class GridLoader(DataLoader):
+    """Writes the row-major index of every pixel, counting how often it is processed."""
+
+    def __init__(self):
+        self._calls = []
+
+    @property
+    def processor(self):
+        def processor(path, spec):
+            self._calls.append(spec)
+            data = np.arange(spec.shape[0] * spec.shape[1], dtype='float32').reshape(spec.shape)
+            profile = {
+                'driver': 'GTiff',
+                'height': spec.shape[0],
+                'width': spec.shape[1],
+                'count': 1,
+                'dtype': 'float32',
+                'nodata': np.nan,
+                'crs': spec.crs,
+                'transform': spec.transform,
+            }
+            with rio.open(path, 'w', **profile) as dst:
+                dst.write(data, 1)
+
+        return processor
+
+    @property
+    def driver(self):
+        return RioXArrayDriver()
+
+
+def test_pyramid_levels():
+    pyramid = Pyramid(BASE, factors=(4, 2, 1))
+
+    assert pyramid.factors == (2, 4)
+    assert [level.shape for level in pyramid.levels] == [(40, 30), (20, 15), (10, 8)]
+    assert pyramid.level(4).transform == Affine(2, 0, -10, 0, -2, 10)
+
+    assert BASE in pyramid
+    assert pyramid.factor(pyramid.level(4)) == 4
+    assert SpatialSpec(BASE.crs, BASE.transform * Affine.scale(3), (14, 10)) not in pyramid
+    assert SpatialSpec(BASE.crs, BASE.transform * Affine.translation(1, 0), BASE.shape) not in pyramid
+    assert SpatialSpec(CRS.from_epsg(3857), BASE.transform, BASE.shape) not in pyramid
+
+
+def test_pyramid_invalid_method():
+    with pytest.raises(ValueError, match='Unknown aggregation method'):
+        Pyramid(BASE, factors=(2,), method='median')
+
+
+def test_pyramid_serves_all_levels(tmp_path, monkeypatch):
+    # One block of the coarsest level at a time
+    monkeypatch.setattr('pygeodata.pyramid.STRIP_BYTES', 1)
+    pyramid = Pyramid(BASE, factors=(2, 4), method='mean')
+    loader = GridLoader()
+
+    with set_config(path_data_processed=tmp_path, pyramid=pyramid):
+        coarse = loader(pyramid.level(4)).values
+        assert loader._calls == [BASE]
+        assert all(loader.is_processed(level) for level in pyramid.levels)
+
+        mid = loader(pyramid.level(2)).values
+        base = loader(BASE).values
+        assert loader._calls == [BASE]
+
+    expected = block_reduce(base, np.ones(base.shape, dtype=bool), (2, 2), 'mean', np.nan)
+    np.testing.assert_allclose(mid, expected)
+
+    # The last column of the coarsest level only covers two of its four base columns
+    padded = np.pad(base, ((0, 0), (0, 2)), constant_values=np.nan)
+    expected = block_reduce(padded, ~np.isnan(padded), (4, 4), 'mean', np.nan)
+    np.testing.assert_allclose(coarse, expected)
+
+
+def test_pyramid_ignores_other_specs(tmp_path):
+    other = SpatialSpec(BASE.crs, BASE.transform * Affine.scale(3), (14, 10))
+    loader = GridLoader()
+
+    with set_config(path_data_processed=tmp_path, pyramid=Pyramid(BASE, factors=(2,))):
+        loader(other)
+        assert not loader.is_processed(BASE)
+
+    assert loader._calls == [other]
+
+
+def test_pyramid_categorical(tmp_path):
+    classes = np.random.default_rng(0).choice(np.array([1, 2, 7], dtype='uint8'), size=BASE.shape)
+    src_path = tmp_path / 'classes.tif'
+    profile = {'driver': 'GTiff', 'count': 1, 'dtype': 'uint8', 'nodata': 0, 'crs': BASE.crs}
+    with rio.open(src_path, 'w', height=BASE.shape[0], width=BASE.shape[1], transform=BASE.transform, **profile) as dst:
+        dst.write(classes, 1)
+
+    class ClassesLoader(DataLoader):
+        driver = RioXArrayDriver(mask_and_scale=False)
+        processor = Reprojector(src_path)
+
+    pyramid = Pyramid(BASE, factors=(2,))
+    with set_config(path_data_processed=tmp_path / 'processed', pyramid=pyramid):
+        coarse = ClassesLoader()(pyramid.level(2)).values
+
+    # Nearest resampling aggregates to the most common class, not to a mean of class values
+    np.testing.assert_array_equal(coarse, block_reduce(classes, classes != 0, (2, 2), 'mode', 0))
+    assert set(np.unique(coarse)) <= {1, 2, 7}
+
+
+def test_pyramid_requires_method(tmp_path):
+    pyramid = Pyramid(BASE, factors=(2,))
+
+    with set_config(path_data_processed=tmp_path, pyramid=pyramid):
+        with pytest.raises(ValueError, match='Set Pyramid.method'):
+            GridLoader()(pyramid.level(2))
+
+
+@pytest.mark.parametrize('statistics', [True, False])
+def test_pyramid_statistics_follow_processor(tmp_path, statistics):
+    data = np.arange(BASE.shape[0] * BASE.shape[1], dtype='float32').reshape(BASE.shape)
+    src_path = tmp_path / 'grid.tif'
+    profile = {'driver': 'GTiff', 'count': 1, 'dtype': 'float32', 'nodata': np.nan, 'crs': BASE.crs}
+    with rio.open(src_path, 'w', height=BASE.shape[0], width=BASE.shape[1], transform=BASE.transform, **profile) as dst:
+        dst.write(data, 1)
+
+    class AveragedLoader(DataLoader):
+        driver = RioXArrayDriver()
+        processor = Reprojector(
+            src_path, resampling=Resampling.average, statistics=statistics, histogram_bins=[0, 600, 1200]
+        )
+
+    pyramid = Pyramid(BASE, factors=(2,))
+    loader = AveragedLoader()
+    with set_config(path_data_processed=tmp_path / 'processed', pyramid=pyramid):
+        loader(pyramid.level(2))
+        stats = read_statistics(loader.get_processed_path(pyramid.level(2)))[0]
+
+    if statistics:
+        assert stats.bin_edges == (0, 600, 1200)
+        assert sum(stats.histogram) == 20 * 15
+    else:
+        assert stats is None
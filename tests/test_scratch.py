@@ -0,0 +1,77 @@
+import pytest
+
+from pygeodata.config import set_config
+from pygeodata.scratch import Checkpoint, atomic_output, checkpoint_record_path, scratch_path
+
+
+def test_atomic_output_publishes(tmp_path):
+    dst_path = tmp_path / 'product.txt'
+    with atomic_output(dst_path) as temp_path:
+        temp_path.write_text('done')
+        assert not dst_path.exists()
+
+    assert dst_path.read_text() == 'done'
+    assert not temp_path.exists()
+
+
+@pytest.mark.parametrize('resumable', [False, True])
+@pytest.mark.parametrize('error', [RuntimeError, KeyboardInterrupt])
+def test_atomic_output_error(tmp_path, resumable, error):
+    dst_path = tmp_path / 'product.txt'
+    with pytest.raises(error), atomic_output(dst_path, resumable=resumable) as temp_path:
+        temp_path.write_text('partial')
+        Checkpoint(temp_path, key='a').add(0, 1)
+        raise error
+
+    # Only interrupted runs are resumed
+    kept = resumable and error is KeyboardInterrupt
+    assert not dst_path.exists()
+    assert temp_path.exists() == kept
+    assert Checkpoint(temp_path, key='a').resume() == kept
+    temp_path.unlink(missing_ok=True)
+    checkpoint_record_path(temp_path).unlink(missing_ok=True)
+
+
+def test_scratch_path_is_deterministic(tmp_path):
+    assert scratch_path(tmp_path / 'a' / 'b.tif') == scratch_path(tmp_path / 'a' / 'b.tif')
+    assert scratch_path(tmp_path / 'a' / 'b.tif') != scratch_path(tmp_path / 'c' / 'b.tif')
+
+
+def test_scratch_dir_sibling(tmp_path):
+    dst_path = tmp_path / 'a' / 'b.tif'
+    with set_config(scratch_dir='sibling'):
+        assert scratch_path(dst_path).parent == tmp_path / 'a' / '.scratch'
+
+        with atomic_output(dst_path) as temp_path:
+            assert temp_path.parent.is_dir()
+            temp_path.write_text('done')
+
+    assert dst_path.read_text() == 'done'
+
+
+def test_scratch_dir_path(tmp_path):
+    with set_config(scratch_dir=tmp_path / 'scratch'):
+        assert scratch_path(tmp_path / 'b.tif').parent == tmp_path / 'scratch'
+
+
+def test_checkpoint(tmp_path):
+    path = tmp_path / 'partial.tif'
+    path.touch()
+
+    checkpoint = Checkpoint(path, key='a')
+    assert not checkpoint.resume()
+    checkpoint.add(0, 10)
+    checkpoint.add(20, 30)
+    checkpoint.add(10, 15)
+
+    resumed = Checkpoint(path, key='a')
+    assert resumed.resume()
+    assert resumed.done == [(0, 15), (20, 30)]
+    assert (5, 15) in resumed and (20, 30) in resumed
+    # Partially written ranges are written again
+    assert (10, 20) not in resumed and (15, 20) not in resumed
+
+    assert not Checkpoint(path, key='b').resume()
+
+    resumed.remove()
+    assert not Checkpoint(path, key='a').resume()
@@ -0,0 +1,129 @@
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import rasterio as rio
+
+from pygeodata.config import set_config
+from pygeodata.processors import Reprojector
+from pygeodata.source_cache import SourceCache, cached_source
+
+
+def make_source(directory, name, size):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / name
+    path.write_bytes(b'x' * size)
+    return path
+
+
+def test_cached_source_without_cache(tmp_path):
+    path = make_source(tmp_path, 'source.bin', 10)
+    with cached_source(path) as local:
+        assert local == path
+
+
+def test_source_cache_copies_once(tmp_path, mocker):
+    # Stand-in for a slow filesystem, on which every copied byte counts
+    remote = tmp_path / 'remote'
+    source = make_source(remote, 'roads.shp', 100)
+    make_source(remote, 'roads.dbf', 10)
+    make_source(remote, 'rivers.shp', 10)
+    cache = SourceCache(tmp_path / 'cache', max_bytes=1000)
+    copy = mocker.spy(shutil, 'copy2')
+
+    first = cache.get(source)
+    second = cache.get(str(source))
+
+    assert first == second
+    assert first.parent.parent == tmp_path / 'cache'
+    assert sorted(p.name for p in first.parent.iterdir()) == ['roads.dbf', 'roads.shp']
+    assert copy.call_count == 2
+    assert cache.size == 110
+
+
+def test_source_cache_copies_sidecars_only(tmp_path):
+    remote = tmp_path / 'remote'
+    source = make_source(remote, 'wtd.tif', 100)
+    make_source(remote, 'wtd.tif.aux.xml', 10)
+    make_source(remote, 'wtd.tif.ovr', 10)
+    make_source(remote, 'wtd.nc', 10)
+    make_source(remote, 'wtd.csv', 10)
+    cache = SourceCache(tmp_path / 'cache', max_bytes=1000)
+
+    cached = cache.get(source)
+
+    assert sorted(p.name for p in cached.parent.iterdir()) == ['wtd.tif', 'wtd.tif.aux.xml', 'wtd.tif.ovr']
+
+def test_source_cache_recopies_modified_source(tmp_path):
+    source = make_source(tmp_path / 'remote', 'source.bin', 10)
+    cache = SourceCache(tmp_path / 'cache', max_bytes=1000)
+
+    first = cache.get(source)
+    source.write_bytes(b'y' * 20)
+
+    second = cache.get(source)
+    assert second != first
+    assert second.read_bytes() == b'y' * 20
+
+
+def test_source_cache_evicts_least_recently_used(tmp_path):
+    remote = tmp_path / 'remote'
+    a, b, c = (make_source(remote, f'{name}.bin', 40) for name in 'abc')
+    cache = SourceCache(tmp_path / 'cache', max_bytes=100)
+
+    cached_a = cache.get(a)
+    cached_b = cache.get(b)
+    # Used before b, so that b is evicted first
+    os.utime(cached_b.parent, (0, 0))
+    cache.get(a)
+
+    cached_c = cache.get(c)
+    assert cached_a.exists() and cached_c.exists()
+    assert not cached_b.exists()
+    assert cache.size == 80
+
+
+def test_source_cache_skips_large_and_virtual_sources(tmp_path):
+    source = make_source(tmp_path / 'remote', 'large.bin', 200)
+    cache = SourceCache(tmp_path / 'cache', max_bytes=100)
+
+    assert cache.get(source) == source
+    assert cache.get('/vsis3/bucket/source.tif') == '/vsis3/bucket/source.tif'
+    assert cache.size == 0
+
+
+def test_reprojector_reads_through_cache(sample_geotiff, sample_spatial_spec, tmp_path):
+    cache = SourceCache(tmp_path / 'cache', max_bytes=2**30)
+
+    with set_config(source_cache=cache):
+        Reprojector(sample_geotiff)(tmp_path / 'cached.tif', sample_spatial_spec)
+    Reprojector(sample_geotiff)(tmp_path / 'direct.tif', sample_spatial_spec)
+
+    [entry] = cache.entries()
+    assert (entry / sample_geotiff.name).exists()
+    with rio.open(tmp_path / 'cached.tif') as cached, rio.open(tmp_path / 'direct.tif') as direct:
+        np.testing.assert_array_equal(cached.read(), direct.read())
+
+
+def test_source_cache_keeps_sources_in_use(tmp_path):
+    # With room for a single source, every thread evicts the copies the others are reading
+    remote = tmp_path / 'remote'
+    remote.mkdir()
+    sources = [remote / f'{i}.bin' for i in range(8)]
+    for i, source in enumerate(sources):
+        source.write_bytes(str(i).encode())
+    cache = SourceCache(tmp_path / 'cache', max_bytes=1)
+
+    def read(source):
+        with cache.use(source) as local:
+            time.sleep(0.01)
+            return Path(local).read_bytes()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        contents = list(executor.map(read, sources * 4))
+
+    assert contents == [str(i).encode() for i in range(8)] * 4
+    assert cache.size <= 1
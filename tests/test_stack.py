@@ -0,0 +1,76 @@
+import dask.array
+import numpy as np
+import pytest
+import rasterio as rio
+from affine import Affine
+from pyproj import CRS
+from rasterio.enums import Resampling
+
+from pygeodata import load_stack
+from pygeodata.config import set_config
+from pygeodata.drivers import RioXArrayDriver
+from pygeodata.loader import DataLoader
+from pygeodata.options import RasterCreationOptions
+from pygeodata.processors import Reprojector
+from pygeodata.stack import aligned_chunks
+from pygeodata.types import SpatialSpec
+
+SPEC = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.25, 0.0, -180.0, 0.0, -0.25, 90.0), shape=(720, 1440))
+
+
+@pytest.fixture
+def loaders(sample_geotiff):
+    class ResampledLoader(DataLoader):
+        driver = RioXArrayDriver()
+
+        def __init__(self, resampling):
+            self.resampling = resampling
+
+        @property
+        def processor(self):
+            return Reprojector(sample_geotiff, resampling=self.resampling)
+
+    return [ResampledLoader(Resampling.nearest), ResampledLoader(Resampling.bilinear)]
+
+
+def test_load_stack(loaders, tmp_path):
+    options = RasterCreationOptions(tiled=True, blockxsize=256, blockysize=256)
+
+    with set_config(path_data_processed=tmp_path, raster_creation_options=options):
+        cube = load_stack(loaders, SPEC, max_workers=2)
+        assert all(loader.is_processed(SPEC) for loader in loaders)
+        expected = [loader(SPEC).values for loader in loaders]
+
+    assert cube.dims == ('layer', 'y', 'x')
+    assert cube.sizes['layer'] == 2
+    assert isinstance(cube.data, dask.array.Array)
+    # Tiles of 256 grown to at least 1024 and bounded by the raster
+    assert cube.chunks == ((1, 1), (720,), (1024, 416))
+    np.testing.assert_array_equal(cube.values, np.stack(expected))
+
+
+def test_load_stack_dataset(loaders, tmp_path):
+    with set_config(path_data_processed=tmp_path):
+        ds = load_stack(loaders, SPEC, names=['nearest', 'bilinear'], dataset=True, chunks=(100, 200))
+
+    assert list(ds.data_vars) == ['nearest', 'bilinear']
+    assert ds['nearest'].chunks == ((100,) * 7 + (20,), (200,) * 7 + (40,))
+
+
+def test_load_stack_names(loaders, tmp_path):
+    with set_config(path_data_processed=tmp_path):
+        cube = load_stack(loaders, SPEC)
+        with pytest.raises(ValueError, match='Expected 2 names'):
+            load_stack(loaders, SPEC, names=['a'])
+
+    assert list(cube['layer'].values) == [repr(loader) for loader in loaders]
+
+
+def test_aligned_chunks(tmp_path):
+    for name, block in (('a.tif', 48), ('b.tif', 64)):
+        profile = dict(driver='GTiff', height=2000, width=300, count=1, dtype='uint8', tiled=True, crs='EPSG:4326')
+        profile['transform'] = Affine(0.1, 0.0, 0.0, 0.0, -0.1, 0.0)
+        with rio.open(tmp_path / name, 'w', blockxsize=block, blockysize=block, **profile):
+            pass
+
+    assert aligned_chunks([tmp_path / 'a.tif', tmp_path / 'b.tif']) == (1152, 300)
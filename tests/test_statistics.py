@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+import rasterio as rio
+from affine import Affine
+
+from pygeodata.config import set_config
+from pygeodata.statistics import BandStatistics, StatisticsAccumulator, read_statistics, write_statistics
+
+
+def test_accumulator_matches_numpy():
+    rng = np.random.default_rng(0)
+    data = rng.normal(1e6, 3, size=(2, 100, 50))
+    data[0, :10] = np.nan
+    data[1, :, :5] = -9999
+
+    stats = StatisticsAccumulator(2, bin_edges=[1e6 - 10, 1e6, 1e6 + 10])
+    for rows in np.array_split(np.arange(100), 7):
+        stats.add(data[:, rows], nodata=-9999)
+    first, second = stats.result()
+
+    values = data[0, 10:]
+    assert (first.minimum, first.maximum) == (values.min(), values.max())
+    assert first.mean == pytest.approx(values.mean())
+    assert first.std == pytest.approx(values.std())
+    assert first.valid_percent == pytest.approx(90)
+    assert first.histogram == tuple(np.histogram(values, bins=first.bin_edges)[0])
+
+    assert second.valid_percent == pytest.approx(90)
+    assert second.std == pytest.approx(data[1, :, 5:].std())
+
+
+def test_accumulator_without_valid_values():
+    stats = StatisticsAccumulator(1)
+    stats.add(np.full((1, 4, 4), np.nan), nodata=None)
+
+    [result] = stats.result()
+    assert result.minimum is None
+    assert result.valid_percent == 0
+    assert BandStatistics.from_tags(result.to_tags()) == result
+
+
+def test_write_and_read_statistics(tmp_path):
+    path = tmp_path / 'raster.tif'
+    stats = BandStatistics(0.0, 10.0, 4.0, 2.0, 75.0, histogram=(3, 1), bin_edges=(0.0, 5.0, 10.0))
+
+    profile = dict(driver='GTiff', height=2, width=2, count=1, dtype='int16', crs='EPSG:4326', transform=Affine(1, 0, 0, 0, -1, 2))
+    with rio.open(path, 'w', **profile) as dst:
+        dst.scales = (-0.5,)
+        dst.offsets = (1.0,)
+        write_statistics(dst, [stats])
+
+    assert read_statistics(path, scaled=False) == [stats]
+
+    [scaled] = read_statistics(path)
+    assert (scaled.minimum, scaled.maximum, scaled.mean, scaled.std) == (-4.0, 1.0, -1.0, 1.0)
+    assert scaled.bin_edges == (1.0, -1.5, -4.0)
+
+
+def test_read_statistics_missing(sample_geotiff):
+    assert read_statistics(sample_geotiff) == [None]
+
+
+def test_loader_statistics(sample_loader_class, sample_spatial_spec, tmp_path):
+    loader = sample_loader_class()
+
+    with set_config(path_data_processed=tmp_path):
+        [stats] = loader.statistics(sample_spatial_spec)
+        data = loader(sample_spatial_spec).values
+
+    assert stats.minimum == np.nanmin(data)
+    assert stats.maximum == np.nanmax(data)
+    assert stats.valid_percent == pytest.approx(100 * np.mean(~np.isnan(data)))
@@ -0,0 +1,20 @@
+import rasterio as rio
+
+from pygeodata.tuning import auto_warp_settings
+from pygeodata.utils import available_memory
+
+
+def test_available_memory():
+    memory = available_memory()
+    assert memory is None or memory > 0
+
+
+def test_auto_warp_settings(sample_geotiff, sample_spatial_spec):
+    with rio.open(sample_geotiff) as src:
+        settings = auto_warp_settings(src, src.crs, sample_spatial_spec, count=1, dst_dtype='float64')
+
+    assert settings.dst_bytes == 1800 * 3600 * 8
+    # The sample raster extends 20 degrees beyond the spec on every side, into its outer pixels
+    assert settings.src_bytes == 10 * 10 * 8
+    assert settings.warp_mem_limit >= 64
+    assert settings.num_threads >= 1
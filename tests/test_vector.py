@@ -0,0 +1,44 @@
+import pandas as pd
+from affine import Affine
+from pyproj import CRS
+
+from pygeodata.types import SpatialSpec
+from pygeodata.vector import iter_vector, read_vector
+
+
+def test_read_vector_filters_bbox(sample_vector):
+    spec = SpatialSpec(crs=CRS.from_epsg(4326), transform=Affine(0.1, 0.0, 0.0, 0.0, -0.1, 2.0), shape=(20, 20))
+
+    df = read_vector(sample_vector, spec)
+
+    assert 0 < len(df) < 100
+    assert df.total_bounds[0] >= -1
+    assert df.total_bounds[3] <= 3
+
+
+def test_read_vector_columns(sample_vector, sample_spatial_spec):
+    df = read_vector(sample_vector, sample_spatial_spec, columns=['value'])
+
+    assert len(df) == 100
+    assert list(df.columns) == ['value', 'geometry']
+
+
+def test_read_vector_reprojects(sample_vector):
+    crs = CRS.from_epsg(3857)
+    spec = SpatialSpec(crs=crs, transform=Affine(1000.0, 0.0, -2e5, 0.0, -1000.0, 2e5), shape=(400, 400))
+
+    df = read_vector(sample_vector, spec)
+
+    assert df.crs == crs
+    assert len(df) == 16
+
+
+def test_iter_vector_matches_read_vector(sample_vector):
+    crs = CRS.from_epsg(3857)
+    spec = SpatialSpec(crs=crs, transform=Affine(1000.0, 0.0, -2e5, 0.0, -1000.0, 2e5), shape=(400, 400))
+
+    batches = list(iter_vector(sample_vector, spec, columns=['value'], batch_size=5))
+
+    assert [len(batch) for batch in batches] == [5, 5, 5, 1]
+    assert all(batch.crs == crs for batch in batches)
+    pd.testing.assert_frame_equal(pd.concat(batches), read_vector(sample_vector, spec, columns=['value']))